@@ -0,0 +1,75 @@
+'''
+Times a cold start of the family cache from the database rows against one from the
+cache file written by CustomBot.save_family_cache
+
+Run from the bot directory:
+    python -m benchmarks.cold_start 1000000 10000000
+
+The database round trip itself isn't included, so "load" is only the part of the old
+startup that builds the graph and its indexes out of rows that have already been
+fetched - the real thing was slower again. "read" is mapping the file in and restoring
+the graph from it, and "replay" is putting 1000 changed users' rows over the top, as
+load_family_cache does with the family_changes table.
+
+Measured on a slow VM (about a third of the speed of a typical desktop):
+    1M users     load 23.2s    write 0.27s   read 0.19s   replay 1.83s   111MB
+    10M users    load 332.9s   write 2.94s   read 2.17s   replay 15.1s   1.2GB
+The rows from make_rows tie almost everyone into one giant family, so every divorce
+in the replay walks the whole of it to relabel the components - real families are
+far smaller, and replay is linear in how many users have changed rather than in
+the size of the graph.
+'''
+
+from os import remove
+from os.path import getsize
+from random import Random
+from sys import argv
+from tempfile import mkstemp
+from time import perf_counter
+
+from benchmarks.family_graph_memory import make_rows
+from cogs.utils.family_tree.cache_file import read_cache_file, write_cache_file
+from cogs.utils.family_tree.family_graph import FamilyGraph
+
+
+def main(user_counts:list):
+    for user_count in user_counts:
+        partnerships, parents = make_rows(user_count)
+        graph = FamilyGraph()
+        started = perf_counter()
+        graph.load(partnerships, parents)
+        loaded = perf_counter() - started
+        del partnerships, parents
+
+        _, path = mkstemp(suffix='.bin')
+        started = perf_counter()
+        write_cache_file(path, 0, graph.dump(), {})
+        written = perf_counter() - started
+        del graph
+
+        started = perf_counter()
+        _, graph_data, _ = read_cache_file(path)
+        graph = FamilyGraph()
+        graph.restore(graph_data)
+        read = perf_counter() - started
+        del graph_data
+
+        # Some marriages and adoptions made after the file was written
+        rng = Random(1)
+        user_ids = [graph.user_id(i) for i in rng.sample(range(len(graph)), 1000)]
+        started = perf_counter()
+        graph.replace_links(
+            user_ids,
+            [(user_ids[i], user_ids[i + 1]) for i in range(0, 500, 2)] + [(user_ids[i + 1], user_ids[i]) for i in range(0, 500, 2)],
+            [(user_ids[i], user_ids[i - 1]) for i in range(501, 1000)],
+        )
+        replayed = perf_counter() - started
+
+        print(f"{user_count:,} users\tload {loaded:7.1f}s   write {written:6.2f}s   read {read:6.2f}s   replay {replayed:6.2f}s   {getsize(path) / 1024 / 1024:,.0f}MB")
+        remove(path)
+        del graph
+
+
+if __name__ == '__main__':
+    user_counts = [int(i) for i in argv[1:] if i.isdigit()]
+    main(user_counts or [1_000_000, 10_000_000])
@@ -0,0 +1,118 @@
+'''
+Compares the memory and build time of the old dict-of-FamilyTreeMember cache
+against the array-backed FamilyGraph
+
+Run from the bot directory:
+    python -m benchmarks.family_graph_memory 1000000 10000000
+
+Pass --graph-only to skip the old model, which needs over 6GB of RAM to trace at 10M users
+'''
+
+from random import Random
+from sys import argv
+from time import perf_counter
+from tracemalloc import start, stop, get_traced_memory
+
+from cogs.utils.family_tree.family_graph import FamilyGraph
+
+
+class LegacyFamilyTreeMember(object):
+    '''
+    A copy of the pre-FamilyGraph cache object, kept here only to measure it
+    '''
+
+    all_users = {None: None}
+
+    def __init__(self, discord_id:int, children:list, parent_id:int, partner_id:int):
+        self.id = discord_id
+        self._children = children
+        self._parent = parent_id
+        self._partner = partner_id
+        self.all_users[self.id] = self
+
+    @classmethod
+    def get(cls, user_id:int):
+        try:
+            return cls.all_users[user_id]
+        except KeyError:
+            return cls(user_id, [], None, None)
+
+
+def make_rows(user_count:int, seed:int=0):
+    '''
+    Makes a plausible set of marriage/parent rows for the given number of users
+    Roughly half of everyone is married and half of everyone has a parent
+    '''
+
+    rng = Random(seed)
+    base = 100_000_000_000_000_000
+    ids = [base + i * 7919 for i in range(user_count)]
+    rng.shuffle(ids)
+    partnerships = []
+    for i in range(0, user_count // 2, 2):
+        partnerships.append((ids[i], ids[i + 1]))
+        partnerships.append((ids[i + 1], ids[i]))
+    parents = []
+    for i in range(user_count // 2, user_count):
+        parents.append((ids[i], ids[rng.randrange(0, i)]))
+    return partnerships, parents
+
+
+def measure(label:str, user_count:int, build, reset=None, size=None):
+    '''
+    Builds the cache and prints its memory and build time
+    If a size function is given it's used for the memory, otherwise the cache
+    is built a second time under tracemalloc, which is very slow for arrays
+    '''
+
+    started = perf_counter()
+    kept = build()
+    elapsed = perf_counter() - started
+    if size:
+        used = size(kept)
+    else:
+        del kept
+        if reset:
+            reset()
+        start()
+        before = get_traced_memory()[0]
+        kept = build()
+        used = get_traced_memory()[0] - before
+        stop()
+    del kept
+    if reset:
+        reset()
+    print(f"\t{label:<20} {used / user_count:8.1f} bytes/user   {elapsed:8.2f}s build")
+
+
+def reset_legacy():
+    LegacyFamilyTreeMember.all_users = {None: None}
+
+
+def build_legacy(partnerships, parents):
+    for user_id, partner_id in partnerships:
+        LegacyFamilyTreeMember(discord_id=user_id, children=[], parent_id=None, partner_id=partner_id)
+    for child_id, parent_id in parents:
+        LegacyFamilyTreeMember.get(parent_id)._children.append(child_id)
+        LegacyFamilyTreeMember.get(child_id)._parent = parent_id
+    return LegacyFamilyTreeMember.all_users
+
+
+def build_graph(partnerships, parents):
+    graph = FamilyGraph()
+    graph.load(partnerships, parents)
+    return graph
+
+
+def main(user_counts:list, graph_only:bool=False):
+    for user_count in user_counts:
+        print(f"{user_count:,} users")
+        partnerships, parents = make_rows(user_count)
+        if not graph_only:
+            measure("dict of objects", user_count, lambda: build_legacy(partnerships, parents), reset_legacy)
+        measure("FamilyGraph", user_count, lambda: build_graph(partnerships, parents), size=FamilyGraph.memory_usage)
+
+
+if __name__ == '__main__':
+    user_counts = [int(i) for i in argv[1:] if i.isdigit()]
+    main(user_counts or [1_000_000, 10_000_000], graph_only='--graph-only' in argv)
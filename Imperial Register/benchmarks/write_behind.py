@@ -0,0 +1,167 @@
+'''
+Compares the throughput of family changes committed one per command against the same
+changes going through the WriteJournal's group commits
+
+Run from the bot directory, with the database in config/config.json running:
+    python -m benchmarks.write_behind 10000 100
+
+That's 10,000 changes (a mix of marriages, divorces, adoptions and disowns) made by
+100 commands at once. Everything's written into a scratch schema that's dropped at
+the end, with copies of the tables but not their triggers, so the real tables would
+be slower again for both. "per command" is what the cogs do without the journal,
+each change waiting on its own commit; "write behind" waits only on the journal's
+fsync, and the time includes the journal then being emptied into the database.
+
+Measured on a slow VM (about a third of the speed of a typical desktop), PostgreSQL 16
+on the same machine over a unix socket, 10,000 changes:
+    1 at once       per command     264/s    write behind     857/s    3.3x
+    10 at once      per command   1,366/s    write behind   4,232/s    3.1x
+    100 at once     per command   1,095/s    write behind  10,980/s   10.0x
+    1,000 at once   per command     939/s    write behind  10,460/s   11.1x
+Per command tops out at the pool's max_size commits in flight; write behind is one
+fsync of the journal per group however many commands are waiting on it.
+'''
+
+from asyncio import ensure_future, gather, get_event_loop, sleep
+from json import load
+from os import remove
+from random import Random
+from sys import argv
+from tempfile import mkstemp
+from time import perf_counter
+
+from cogs.utils.database import DatabaseConnection
+from cogs.utils.write_journal import WriteJournal
+
+
+SCHEMA = 'write_behind_benchmark'
+
+
+class BenchmarkBot(object):
+    '''
+    Just enough of CustomBot for a WriteJournal
+    '''
+
+    def __init__(self):
+        self.loop = get_event_loop()
+        self.database = DatabaseConnection
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+
+def make_changes(change_count:int) -> list:
+    '''
+    Makes a list of changes in the WriteJournal format, valid in order
+    '''
+
+    rng = Random(1)
+    partners = {}
+    parents = {}
+    changes = []
+    while len(changes) < change_count:
+        user_id, other_id = rng.randrange(10 ** 17, 10 ** 17 + change_count * 2), rng.randrange(10 ** 17, 10 ** 17 + change_count * 2)
+        kind = rng.random()
+        if user_id == other_id:
+            continue
+        if kind < 0.4 and user_id not in partners and other_id not in partners:
+            partners[user_id], partners[other_id] = other_id, user_id
+            changes.append(['marry', DatabaseConnection.make_id(), user_id, other_id])
+        elif kind < 0.5 and user_id in partners:
+            other_id = partners.pop(user_id)
+            partners.pop(other_id)
+            changes.append(['divorce', user_id, other_id])
+        elif kind < 0.9 and other_id not in parents:
+            parents[other_id] = user_id
+            changes.append(['add_child', other_id, user_id])
+        elif other_id in parents:
+            changes.append(['remove_child', other_id, parents.pop(other_id)])
+    return changes
+
+
+async def commit_singly(change:list):
+    kind, *args = change
+    async with DatabaseConnection() as db:
+        if kind == 'marry':
+            await db('INSERT INTO marriages VALUES ($1, $2, $3, TRUE), ($1, $3, $2, TRUE)', *args)
+        elif kind == 'divorce':
+            await db('UPDATE marriages SET valid=FALSE WHERE valid=TRUE AND (user_id=$1 OR user_id=$2)', *args)
+        elif kind == 'add_child':
+            # Commands running at once can finish out of order, so a disown and re-adoption could clash
+            await db('INSERT INTO parents (child_id, parent_id) VALUES ($1, $2) ON CONFLICT (child_id) DO UPDATE SET parent_id=excluded.parent_id', *args)
+        else:
+            await db('DELETE FROM parents WHERE child_id=$1 AND parent_id=$2', *args)
+
+
+async def run_commands(changes:list, concurrency:int, write):
+    '''
+    Makes every change through `write`, `concurrency` at a time
+    '''
+
+    queue = iter(changes)
+
+    async def command_runner():
+        for change in queue:
+            await write(change)
+
+    await gather(*[command_runner() for _ in range(concurrency)])
+
+
+async def reset_tables():
+    async with DatabaseConnection() as db:
+        await db('TRUNCATE marriages, parents')
+
+
+async def main(change_count:int, concurrency:int):
+    with open('config/config.json') as a:
+        config = load(a)['database']
+    async with DatabaseConnection() as db:
+        await db(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE')
+        await db(f'CREATE SCHEMA {SCHEMA}')
+        await db(f'CREATE TABLE {SCHEMA}.marriages (LIKE public.marriages INCLUDING ALL)')
+        await db(f'CREATE TABLE {SCHEMA}.parents (LIKE public.parents INCLUDING ALL)')
+    await DatabaseConnection.close_pool()
+    DatabaseConnection.config = dict(config, server_settings={'search_path': SCHEMA})
+
+    try:
+        changes = make_changes(change_count)
+
+        # One commit per change
+        await reset_tables()
+        started = perf_counter()
+        await run_commands(changes, concurrency, commit_singly)
+        singly = perf_counter() - started
+
+        # Through the journal
+        await reset_tables()
+        _, path = mkstemp(suffix='.log')
+        bot = BenchmarkBot()
+        journal = WriteJournal(bot, path)
+        journal.open()
+        flusher = ensure_future(journal.flush_loop())
+        started = perf_counter()
+        await run_commands(changes, concurrency, lambda change: journal.append(*change))
+        while journal.unsaved or journal.appended:
+            await sleep(journal.interval)
+        journaled = perf_counter() - started
+        bot.closed = True
+        await flusher
+        await journal.close()
+        remove(path)
+
+        print(f"{change_count:,} changes, {concurrency:,} at once\tper command {change_count / singly:9,.0f}/s    write behind {change_count / journaled:9,.0f}/s    {singly / journaled:.1f}x")
+    finally:
+        await DatabaseConnection.close_pool()
+        DatabaseConnection.config = config
+        async with DatabaseConnection() as db:
+            await db(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE')
+        await DatabaseConnection.close_pool()
+
+
+if __name__ == '__main__':
+    numbers = [int(i) for i in argv[1:] if i.isdigit()]
+    change_count, concurrency = (numbers + [10000, 100][len(numbers):])[:2]
+    with open('config/config.json') as a:
+        DatabaseConnection.config = load(a)['database']
+    get_event_loop().run_until_complete(main(change_count, concurrency))
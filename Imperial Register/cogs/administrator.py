@@ -1,42 +1,163 @@
-from discord.ext.commands import command, Context, MissingPermissions, cooldown, BucketType
-
-from cogs.utils.custom_bot import CustomBot
-
-
-class Administrator(object): 
-
-    def __init__(self,bot:CustomBot):
-        self.bot = bot 
-
-
-    def __local_check(self, ctx:Context):
-        if ctx.author.permissions_in(ctx.channel).manage_guild:
-            return True
-        raise MissingPermissions(["manage_guild"])
-
-
-    @command(hidden=True)
-    @cooldown(1, 5, BucketType.guild)
-    async def prefix(self, ctx:Context, prefix:str=None):
-        '''
-        Changes the prefix for your guild
-        '''
-
-        if not prefix:
-            prefix = self.bot.config['deafult_prefix']
-        if len(prefix) > 30:
-            await ctx.send("Your prefix can't be longer than 30 characters, I'm afraid.")
-            return
-
-        async with self.bot.database() as db:
-            try:
-                await db('INSERT INTO guid_settings VALUES ($1, $2)', ctx.guild.id, prefix)
-            except Exception as e:
-                await db('UPDATE guild_settings SET prefix=$1 WHERE guild_id=$2', prefix, ctx.guild.id)
-        self.bot.guild_prefixes[ctx.guild.id] = prefix
-        await ctx.send(f"Your guild's prefix has been udpated to `{prefix}`.")
-
-
-def setup(bot:CustomBot):
-    x = Administrator(bot)
-    bot.add_cog(x)
+from io import BytesIO, TextIOWrapper
+from gzip import GzipFile
+
+from discord.ext.commands import command, Context, MissingPermissions, cooldown, BucketType
+
+from cogs.utils.custom_bot import CustomBot
+from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+from cogs.utils.family_tree.gedcom_import import read_gedcom, read_mapping, map_links, find_problems, families_changed
+from cogs.utils.name_cache import NameCache
+
+
+class Administrator(object): 
+
+    def __init__(self,bot:CustomBot):
+        self.bot = bot 
+
+
+    def __local_check(self, ctx:Context):
+        if ctx.author.permissions_in(ctx.channel).manage_guild:
+            return True
+        raise MissingPermissions(["manage_guild"])
+
+
+    @command(hidden=True)
+    @cooldown(1, 5, BucketType.guild)
+    async def prefix(self, ctx:Context, prefix:str=None):
+        '''
+        Changes the prefix for your guild
+        '''
+
+        if not prefix:
+            prefix = self.bot.config['deafult_prefix']
+        if len(prefix) > 30:
+            await ctx.send("Your prefix can't be longer than 30 characters, I'm afraid.")
+            return
+
+        async with self.bot.database() as db:
+            try:
+                await db('INSERT INTO guid_settings VALUES ($1, $2)', ctx.guild.id, prefix)
+            except Exception as e:
+                await db('UPDATE guild_settings SET prefix=$1 WHERE guild_id=$2', prefix, ctx.guild.id)
+        self.bot.guild_prefixes[ctx.guild.id] = prefix
+        await ctx.send(f"Your guild's prefix has been udpated to `{prefix}`.")
+
+
+    @command(aliases=['importgedcom'])
+    @cooldown(1, 60, BucketType.guild)
+    async def importtree(self, ctx:Context):
+        '''
+        Imports a GEDCOM file (.ged or .ged.gz) as a family - attach a .csv of "xref or name,discord ID" rows to say who's who
+        '''
+
+        gedcom_file = mapping_file = None
+        for attachment in ctx.message.attachments:
+            filename = attachment.filename.lower()
+            if filename.endswith('.csv'):
+                mapping_file = attachment
+            elif filename.endswith('.ged') or filename.endswith('.ged.gz'):
+                gedcom_file = attachment
+        if gedcom_file == None:
+            await ctx.send("You need to attach a `.ged` file for me to import.")
+            return
+        await ctx.trigger_typing()
+
+        # Anyone not in the mapping table is matched to a member of the guild by name
+        mapping = {}
+        for member in ctx.guild.members:
+            mapping[str(member)] = member.id
+            mapping[NameCache.sanitise(str(member))] = member.id
+        if mapping_file != None:
+            data = BytesIO()
+            await mapping_file.save(data)
+            mapping.update(read_mapping(data.getvalue().decode('utf-8-sig', 'replace').splitlines()))
+        data = BytesIO()
+        await gedcom_file.save(data)
+        data.seek(0)
+        if gedcom_file.filename.lower().endswith('.gz'):
+            data = GzipFile(fileobj=data)
+
+        # Read it off of the event loop
+        def prepare():
+            individuals, families = read_gedcom(TextIOWrapper(data, encoding='utf-8-sig', errors='replace'))
+            return map_links(individuals, families, mapping)
+        try:
+            partnerships, parents, unmapped = await self.bot.loop.run_in_executor(None, prepare)
+        except (OSError, EOFError):
+            await ctx.send("I couldn't read that file - is it really a GEDCOM file?")
+            return
+
+        # Only members of the guild can be put into a family from here
+        user_ids = {i for link in partnerships + parents for i in link}
+        outsiders = sorted(i for i in user_ids if ctx.guild.get_member(i) == None)
+        if outsiders:
+            text = [f"I can only import people who are in this server, and `{len(outsiders)}` of the people in that file aren't:"]
+            text.append(', '.join(f'`{i}`' for i in outsiders[:20]) + (', ...' if len(outsiders) > 20 else ''))
+            await ctx.send('\n'.join(text))
+            return
+
+        # Check the links against a pinned version of the graph, off of the event loop
+        # Anything still in the journal has to reach the database first, and the graph
+        # may have changed while all that was going on - if any of the families being
+        # imported into have, the check is done again against a newer version until
+        # one finishes with nothing new to catch up on
+        await self.bot.load_families(user_ids, required=True)
+        graph = FamilyTreeMember.graph
+        links = partnerships, parents
+        while True:
+            pinned, base_version = graph.pin(), graph.base_version
+            partnerships, parents, problems = await self.bot.loop.run_in_executor(None, find_problems, pinned, *links)
+            if problems or not (partnerships or parents):
+                break
+            if self.bot.write_journal != None:
+                await self.bot.write_journal.flush()
+            if not families_changed(graph, user_ids, pinned.version, base_version):
+                break
+        if problems:
+            text = [f"I can't import that family, since it breaks `{len(problems)}` rule(s):"] + problems[:10]
+            if len(problems) > 10:
+                text.append('...')
+            await ctx.send('\n'.join(text))
+            return
+        if not partnerships and not parents:
+            await ctx.send(f"There was nothing new for me to import (`{unmapped}` people weren't matched to a Discord user).")
+            return
+        graph.add_links(partnerships, parents)
+
+        # Write it all in one go, so a failure doesn't leave half a family behind - the
+        # journal can't commit in the meantime, so nothing it has can go in before this
+        marriage_ids = self.bot.database.make_ids(len(partnerships))
+        marriage_rows = []
+        for marriage_id, (user_id, partner_id) in zip(marriage_ids, partnerships):
+            marriage_rows.append((marriage_id, user_id, partner_id, True))
+            marriage_rows.append((marriage_id, partner_id, user_id, True))
+
+        async def save():
+            async with self.bot.database() as db:
+                async with db.transaction():
+                    await db.copy_records('marriages', ['marriage_id', 'user_id', 'partner_id', 'valid'], marriage_rows)
+                    await db.copy_records('parents', ['child_id', 'parent_id'], parents)
+
+        try:
+            async with self.bot.family_write():
+                if self.bot.write_journal == None:
+                    await save()
+                else:
+                    async with self.bot.write_journal.commit_lock:
+                        await save()
+        except Exception as e:
+            # Only whatever nobody's changed since is taken back out of the graph
+            for user_id, partner_id in partnerships:
+                if graph.partner_of(user_id) == partner_id:
+                    graph.divorce(user_id)
+            for child_id, parent_id in parents:
+                if graph.parent_of(child_id) == parent_id:
+                    graph.remove_child(parent_id, child_id)
+            await ctx.send("I couldn't save that family, so nothing has been imported. Please try again in a moment.")
+            return
+        await ctx.send(f"Imported `{len(partnerships)}` marriage(s) and `{len(parents)}` child(ren) (`{unmapped}` people weren't matched to a Discord user).")
+
+
+def setup(bot:CustomBot):
+    x = Administrator(bot)
+    bot.add_cog(x)
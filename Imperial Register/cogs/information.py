@@ -1,194 +1,394 @@
-from os import remove
-from re import compile
-from io import BytesIO
-from asyncio import sleep, create_subprocess_exec, wait_for
-
-from discord import Member, File, User
-from discord.ext.commands import command, Context, cooldown
-from discord.ext.commands.cooldowns import BucketType
-
-from cogs.utils.custom_bot import CustomBot
-from cogs.utils.checks.can_send_files import can_send_files
-from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
-
-
-class Information(object):
-    '''
-    The information cog
-    Handles all marriage/divorce/etc commands
-    '''
-
-    def __init__(self, bot:CustomBot):
-        self.bot = bot
-        self.substitution = compile(r'[^\x00-\x7F\x80-\xFF\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]')
-        self.fam = None
-
-
-    @command(aliases=['spouse', 'husband', 'wife'])
-    @cooldown(1, 5, BucketType.user)
-    async def partner(self, ctx:Context, user:User=None):
-        '''
-        Shows you the partner of a given user
-        '''
-
-        if not user:
-            user = ctx.author
-
-        # Get the user's info
-        user_info = FamilyTreeMember.get(user.id)
-        if user_info.partner == None:
-            await ctx.send(f"`{user!s}` is not currently married.")
-            return
-
-        partner = self.bot.get_user(user_info.partner.id)
-        await ctx.send(f"`{user!s}` is currently married to `{partner!s}` (`{partner.id}`).")
-
-
-    @command(aliases=['child'])
-    @cooldown(1, 5, BucketType.user)
-    async def children(self, ctx:Context, user:User=None):
-        '''
-        Gives you a list of all of your children
-        '''
-
-        if user == None:
-            user = ctx.author
-
-        # Get the user's info
-        user_info = FamilyTreeMember.get(user.id)
-        if len(user_info.children) == 0:
-            await ctx.send(f"`{user!s}` has no children right now.")
-            return
-        await ctx.send(
-            f"`{user!s}` has `{len(user_info.children)}` child" + 
-            {False:"ren",True:""}.get(len(user_info.children)==1) + ": " + 
-            ", ".join([f"`{self.bot.get_user(i.id)!s}` (`{i.id}`)" for i in user_info.children])
-        )
-
-    @command()
-    @cooldown(1, 5, BucketType.user)
-    async def parent(self, ctx:Context, user:User=None):
-        '''
-        Tells you who your parent is
-        '''
-
-        if user == None:
-            user = ctx.author
-
-        user_info = FamilyTreeMember.get(user.id)
-        if user_info.parent == None:
-            await ctx.send(f"`{user!s}` has no parent.")
-            return
-        await ctx.send(f"`{user!s}`'s parent is `{self.bot.get_user(user_info.parent.id)!s}` (`{user_info.parent.id}`).")
-
-
-    @command()
-    @can_send_files()
-    @cooldown(1, 5, BucketType.user)
-    async def treefile(self, ctx:Context, root:Member=None):
-        '''
-        Gives you the full family tree of a user
-        '''
-
-        if root == None:
-            root = ctx.author
-
-        text = FamilyTreeMember.get(root.id).generate_gedcom_script(self.bot)
-        file = BytesIO(text.encode())
-        await ctx.send(file=File(file, filename=f'Tree of {root.id}.ged'))
-
-
-    @command(aliases=['familytree'])
-    @can_send_files()
-    @cooldown(1, 5, BucketType.user)
-    async def tree(self, ctx:Context, root:Member=None):
-        '''
-        Gets the family tree of a given user
-        '''
-
-        if ctx.guild == None:
-            await ctx.send("This command cannot be used in private messages. Please use the `fulltree` command in its place.")
-            return
-
-        try:
-            return await self.treemaker(ctx, root, False)
-        except Exception as e:
-            # await ctx.send("I encountered an error while trying to generate your family tree. Could you inform `Caleb#2831`, so he can fix this in future for you?")
-            raise e
-
-
-    @command(aliases=['fulltree', 'ft', 'gt'])
-    @can_send_files()
-    @cooldown(1, 5, BucketType.user)
-    async def globaltree(self, ctx:Context, root:User=None):
-        '''
-        Gets the global family tree of a given user
-        '''
-
-        try:
-            return await self.treemaker(ctx, root, True)
-        except Exception as e:
-            # await ctx.send("I encountered an error while trying to generate your family tree. Could you inform `Caleb#2831`, so he can fix this in future for you?")
-            raise e
-
-
-    async def treemaker(self, ctx:Context, root:User, all_guilds:bool):
-
-        # if ctx.author.id not in self.bot.config['owners']: 
-        #     return await ctx.send("This command is temporarily disabled. Apologies.")
-
-        if root == None:
-            root = ctx.author
-        root_user = root
-
-        # Get their family tree
-        await ctx.trigger_typing()
-        tree = FamilyTreeMember.get(root_user.id)
-
-        # Make sure they have one
-        if tree.is_empty:
-            await ctx.send(f"`{root_user!s}` has no family to put into a tree .-.")
-            return
-
-        # Write their treemaker code to a file
-        # dot_code = tree.to_dot_script(ctx.bot, guild=None if all_guilds else ctx.guild)
-        awaitable_dot_code = self.bot.loop.run_in_executor(None, tree.to_dot_script, self.bot, None if all_guilds else ctx.guild)
-        try:
-            dot_code = await wait_for(awaitable_dot_code, timeout=10.0, loop=self.bot.loop)
-        except TimeoutError:
-            await ctx.send("Your tree generation has timed out. This is usually due to a loop somewhere in your family tree.")
-            return
-        with open(f'{self.bot.config["tree_file_location"]}/{ctx.author.id}.dot', 'w', encoding='utf-8') as a:
-            a.write(dot_code)
-
-        # Convert to an image
-        dot = await create_subprocess_exec(*[
-            'dot', 
-            '-Tpng', 
-            f'{self.bot.config["tree_file_location"]}/{ctx.author.id}.dot', 
-            '-o', 
-            f'{self.bot.config["tree_file_location"]}/{ctx.author.id}.png', 
-            '-Gcharset=UTF-8', 
-            '-Gsize=200\\!', 
-            '-Gdpi=100'
-            ], loop=self.bot.loop
-        )
-        await wait_for(dot.wait(), 10.0, loop=self.bot.loop)
-        try:
-            dot.kill()
-        except Exception: 
-            pass
-
-        # Send file and delete cached
-        try:
-            file = File(fp=f'{self.bot.config["tree_file_location"]}/{ctx.author.id}.png')
-            text = f"{ctx.author.mention}, you can update how your tree looks with `{ctx.prefix}help customise` c:"
-            await ctx.send(text, file=file)
-        except Exception:
-            return 
-        return
-
-
-def setup(bot:CustomBot):
-    x = Information(bot)
-    bot.add_cog(x)
+from re import compile
+from io import BytesIO
+from os import close, remove
+from os.path import getsize
+from tempfile import mkstemp
+from asyncio import sleep, wait_for, wrap_future, CancelledError, TimeoutError
+from threading import Event
+
+from discord import Member, File, User, Guild
+from discord.ext.commands import command, Context, cooldown
+from discord.ext.commands.cooldowns import BucketType
+
+from cogs.utils.custom_bot import CustomBot
+from cogs.utils.checks.can_send_files import can_send_files
+from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+from cogs.utils.family_tree.traversal import TraversalCancelled
+from cogs.utils.family_tree.snapshot import SnapshotPublisher, dot_script_from_snapshot, gedcom_file_from_snapshot
+from cogs.utils.customised_tree_user import CustomisedTreeUser
+from cogs.utils.guild_members import GuildMembers
+from cogs.utils.name_cache import FixedNames
+from cogs.utils.render_pool import RenderFailed, RenderTimedOut
+from cogs.utils.render_scheduler import RenderShed
+
+
+UPLOAD_LIMIT = 8 * 1024 * 1024  # The most bytes Discord lets the bot upload
+
+
+class Information(object):
+    '''
+    The information cog
+    Handles all marriage/divorce/etc commands
+    '''
+
+    def __init__(self, bot:CustomBot):
+        self.bot = bot
+        self.substitution = compile(r'[^\x00-\x7F\x80-\xFF\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]')
+        self.fam = None
+
+
+    @command(aliases=['spouse', 'husband', 'wife'])
+    @cooldown(1, 5, BucketType.user)
+    async def partner(self, ctx:Context, user:User=None):
+        '''
+        Shows you the partner of a given user
+        '''
+
+        if not user:
+            user = ctx.author
+
+        # Get the user's info
+        user_info = FamilyTreeMember.get(user.id)
+        if user_info.partner == None:
+            await ctx.send(f"`{user!s}` is not currently married.")
+            return
+
+        partner_name = (await self.bot.name_cache.names([user_info.partner.id]))[user_info.partner.id]
+        await ctx.send(f"`{user!s}` is currently married to `{partner_name}` (`{user_info.partner.id}`).")
+
+
+    @command(aliases=['child'])
+    @cooldown(1, 5, BucketType.user)
+    async def children(self, ctx:Context, user:User=None):
+        '''
+        Gives you a list of all of your children
+        '''
+
+        if user == None:
+            user = ctx.author
+
+        # Get the user's info
+        user_info = FamilyTreeMember.get(user.id)
+        if len(user_info.children) == 0:
+            await ctx.send(f"`{user!s}` has no children right now.")
+            return
+        names = await self.bot.name_cache.names([i.id for i in user_info.children])
+        await ctx.send(
+            f"`{user!s}` has `{len(user_info.children)}` child" + 
+            {False:"ren",True:""}.get(len(user_info.children)==1) + ": " + 
+            ", ".join([f"`{names[i.id]}` (`{i.id}`)" for i in user_info.children])
+        )
+
+    @command()
+    @cooldown(1, 5, BucketType.user)
+    async def parent(self, ctx:Context, user:User=None):
+        '''
+        Tells you who your parent is
+        '''
+
+        if user == None:
+            user = ctx.author
+
+        user_info = FamilyTreeMember.get(user.id)
+        if user_info.parent == None:
+            await ctx.send(f"`{user!s}` has no parent.")
+            return
+        parent_name = (await self.bot.name_cache.names([user_info.parent.id]))[user_info.parent.id]
+        await ctx.send(f"`{user!s}`'s parent is `{parent_name}` (`{user_info.parent.id}`).")
+
+
+    @command(aliases=['grandchildren'])
+    @cooldown(1, 5, BucketType.user)
+    async def descendants(self, ctx:Context, user:User=None):
+        '''
+        Tells you how many descendants a user has
+        '''
+
+        if user == None:
+            user = ctx.author
+
+        user_info = FamilyTreeMember.get(user.id)
+        count = user_info.descendant_count
+        if count == 0:
+            await ctx.send(f"`{user!s}` has no descendants.")
+            return
+        generations = user_info.descendant_depth
+        await ctx.send(
+            f"`{user!s}` has `{count}` descendant" + {False:"s",True:""}.get(count==1) + 
+            f" over `{generations}` generation" + {False:"s",True:""}.get(generations==1) + "."
+        )
+
+
+    @command(aliases=['treesize'])
+    @cooldown(1, 5, BucketType.user)
+    async def familysize(self, ctx:Context, user:User=None):
+        '''
+        Tells you how many people are in a user's family
+        '''
+
+        if user == None:
+            user = ctx.author
+
+        user_info = FamilyTreeMember.get(user.id)
+        size = user_info.family_size
+        if size == 1:
+            await ctx.send(f"`{user!s}` has no family.")
+            return
+        await ctx.send(f"There are `{size}` people in `{user!s}`'s family, and they're `{user_info.generation}` generation" + {False:"s",True:""}.get(user_info.generation==1) + " from the top of their line.")
+
+
+    @command(aliases=['relation'])
+    @cooldown(1, 5, BucketType.user)
+    async def relationship(self, ctx:Context, user:User, other:User=None):
+        '''
+        Tells you how two people are related
+        '''
+
+        if other == None:
+            user, other = ctx.author, user
+
+        relation = FamilyTreeMember.get(user.id).get_relation(FamilyTreeMember.get(other.id))
+        if relation == None:
+            await ctx.send(f"`{other!s}` isn't related to `{user!s}`.")
+            return
+        if relation == 'themselves':
+            await ctx.send(f"That's the same person, silly.")
+            return
+        await ctx.send(f"`{other!s}` is `{user!s}`'s {relation}.")
+
+
+    @command()
+    @can_send_files()
+    @cooldown(1, 5, BucketType.user)
+    async def treefile(self, ctx:Context, root:Member=None):
+        '''
+        Gives you the full family tree of a user
+        '''
+
+        if root == None:
+            root = ctx.author
+
+        # Big families are gzipped so that they fit under the upload limit
+        tree = FamilyTreeMember.get(root.id)
+        compress = tree.family_size > self.bot.config.get('gedcom_compress_size', 5000)
+        await ctx.trigger_typing()
+        labels = await self.tree_labels(tree)
+        handle = self.bot.graph_snapshots.acquire()
+        descriptor, path = mkstemp(suffix='.ged')
+        close(descriptor)
+        try:
+            try:
+                await self.bot.loop.run_in_executor(
+                    self.bot.dot_pool, gedcom_file_from_snapshot,
+                    SnapshotPublisher.shareable(handle), tree.id, labels, path, compress
+                )
+            finally:
+                self.bot.graph_snapshots.release(handle)
+
+            # The file is sent straight from disk
+            if getsize(path) > UPLOAD_LIMIT:
+                await ctx.send("Your family is too big for me to send as a file :c")
+                return
+            filename = f'Tree of {root.id}.ged' + ('.gz' if compress else '')
+            await ctx.send(file=File(path, filename=filename))
+        finally:
+            remove(path)
+
+
+    @command(aliases=['familytree'])
+    @can_send_files()
+    @cooldown(1, 5, BucketType.user)
+    async def tree(self, ctx:Context, root:Member=None):
+        '''
+        Gets the family tree of a given user
+        '''
+
+        if ctx.guild == None:
+            await ctx.send("This command cannot be used in private messages. Please use the `fulltree` command in its place.")
+            return
+
+        try:
+            return await self.treemaker(ctx, root, False)
+        except Exception as e:
+            # await ctx.send("I encountered an error while trying to generate your family tree. Could you inform `Caleb#2831`, so he can fix this in future for you?")
+            raise e
+
+
+    @command(aliases=['fulltree', 'ft', 'gt'])
+    @can_send_files()
+    @cooldown(1, 5, BucketType.user)
+    async def globaltree(self, ctx:Context, root:User=None):
+        '''
+        Gets the global family tree of a given user
+        '''
+
+        try:
+            return await self.treemaker(ctx, root, True)
+        except Exception as e:
+            # await ctx.send("I encountered an error while trying to generate your family tree. Could you inform `Caleb#2831`, so he can fix this in future for you?")
+            raise e
+
+
+    async def treemaker(self, ctx:Context, root:User, all_guilds:bool):
+
+        # if ctx.author.id not in self.bot.config['owners']: 
+        #     return await ctx.send("This command is temporarily disabled. Apologies.")
+
+        if root == None:
+            root = ctx.author
+        root_user = root
+
+        # Get their family tree
+        await ctx.trigger_typing()
+        tree = FamilyTreeMember.get(root_user.id)
+
+        # Make sure they have one
+        if tree.is_empty:
+            await ctx.send(f"`{root_user!s}` has no family to put into a tree .-.")
+            return
+
+        # See if this exact tree has been rendered since the family last changed
+        guild = None if all_guilds else ctx.guild
+        render_key = self.tree_render_key(tree, guild)
+        cache_key = render_key if guild == None or render_key[3] != None else None
+        image = self.bot.tree_cache.get(cache_key)
+
+        # If not then queue it up to be rendered
+        if image == None:
+            nodes, edges = tree.render_cost_estimate
+            try:
+                image = await self.bot.render_scheduler.submit(
+                    render_key, 
+                    lambda: self.render_tree(tree, guild, cache_key), 
+                    cost=nodes + edges, 
+                    shard_id=ctx.guild.shard_id if ctx.guild else None, 
+                    guild_id=ctx.guild.id if ctx.guild else None
+                )
+            except RenderShed:
+                await ctx.send(f"I'm rendering a lot of trees right now and yours is a big one (about {nodes} people), so I can't fit it in - try again in a few minutes.")
+                return
+            except (TimeoutError, TraversalCancelled):
+                await ctx.send("Your tree generation has timed out. This is usually due to a loop somewhere in your family tree.")
+                return
+            except RenderTimedOut:
+                await ctx.send("Your tree couldn't be rendered in time - try again later.")
+                return
+            except RenderFailed:
+                await ctx.send("I couldn't render your tree - try again later.")
+                return
+
+        # Send file
+        try:
+            file = File(fp=BytesIO(image), filename=f'{root_user.id}.png')
+            text = f"{ctx.author.mention}, you can update how your tree looks with `{ctx.prefix}help customise` c:"
+            await ctx.send(text, file=file)
+        except Exception:
+            return 
+        return
+
+
+    @staticmethod
+    def tree_render_key(tree:FamilyTreeMember, guild:Guild=None) -> tuple:
+        '''
+        Gives the key identifying a render of a user's tree
+        The family's version changes whenever anyone in it does, so any change to the family
+        makes this miss without touching anyone else's trees. The guild's version is None if
+        its members haven't been fully indexed, in which case it can't be cached in memory
+        '''
+
+        theme = tuple(CustomisedTreeUser.get(tree.id).hex.values())
+        if guild == None:
+            return (tree.family_version, theme, None, None, tree.id)
+        return (tree.family_version, theme, guild.id, GuildMembers.version(guild.id), tree.id)
+
+
+    async def tree_labels(self, tree:FamilyTreeMember, guild:Guild=None) -> dict:
+        '''
+        Looks up the labels of everyone who could be drawn in a user's tree, so that
+        generating it doesn't need the member cache
+        '''
+
+        user_ids = await self.bot.loop.run_in_executor(None, tree.pinned(guild).tree_user_ids, guild)
+        return await self.bot.name_cache.labels(user_ids)
+
+
+    async def generate_dot_in_process(self, tree:FamilyTreeMember, guild:Guild, labels:dict, timeout:float) -> str:
+        '''
+        Generates a user's DOT script in the process pool, so that big trees don't hold
+        the GIL and stall the gateway
+        '''
+
+        snapshots = self.bot.graph_snapshots
+        handle = snapshots.acquire(None if guild == None else guild.id)
+        job = self.bot.dot_pool.submit(
+            dot_script_from_snapshot,
+            SnapshotPublisher.shareable(handle), tree.id, CustomisedTreeUser.get(tree.id).colours, labels
+        )
+
+        # The worker carries on after a timeout until it sees the cancel flag, so the
+        # handle's only given back once it's actually stopped
+        job.add_done_callback(lambda _: self.bot.loop.call_soon_threadsafe(snapshots.release, handle))
+        try:
+            return await wait_for(wrap_future(job, loop=self.bot.loop), timeout=timeout)
+        except (TimeoutError, CancelledError):
+            snapshots.cancel(handle)
+            raise
+
+
+    async def generate_dot_in_thread(self, tree:FamilyTreeMember, guild:Guild, labels:dict, timeout:float) -> str:
+        '''
+        Generates a user's DOT script in a thread - this is only used for guilds whose
+        members haven't been indexed yet, since the member cache can't be sent to
+        another process
+        '''
+
+        cancel = Event()
+        awaitable_dot_code = self.bot.loop.run_in_executor(None, tree.pinned(guild).to_dot_script, FixedNames(labels), guild, cancel)
+        try:
+            return await wait_for(awaitable_dot_code, timeout=timeout)
+        except (TimeoutError, TraversalCancelled):
+            # Stop the executor thread rather than leaving it running
+            cancel.set()
+            raise
+
+
+    async def render_tree(self, tree:FamilyTreeMember, guild:Guild, cache_key:tuple) -> bytes:
+        '''
+        Generates and renders a user's tree, using the disk tier of the render cache if the
+        same DOT script has been rendered before
+
+        Raises:
+            TimeoutError, TraversalCancelled
+                If the DOT script took too long to generate
+            RenderTimedOut, RenderFailed
+                If Graphviz took too long or failed
+        '''
+
+        # Give bigger trees a bit longer to generate
+        timeout = min(10.0 + tree.tree_size_estimate / 500, 60.0)
+
+        # Get their DOT script
+        labels = await self.tree_labels(tree, guild)
+        if guild == None or GuildMembers.get(guild.id) != None:
+            dot_code = await self.generate_dot_in_process(tree, guild, labels, timeout)
+        else:
+            dot_code = await self.generate_dot_in_thread(tree, guild, labels, timeout)
+
+        # The same script may have been rendered for someone else already
+        render_args = ['-Tpng', '-Gcharset=UTF-8', '-Gsize=200\\!', '-Gdpi=100']
+        filename = self.bot.tree_cache.content_key(dot_code, *render_args)
+        image = await self.bot.loop.run_in_executor(None, self.bot.tree_cache.get_content, filename)
+        if image != None:
+            self.bot.tree_cache.put(cache_key, image)
+            return image
+
+        # Convert to an image
+        image = await self.bot.render_pool.render(dot_code, *render_args, timeout=timeout)
+        self.bot.tree_cache.put(cache_key, image)
+        self.bot.loop.run_in_executor(None, self.bot.tree_cache.store, filename, image)
+        return image
+
+
+def setup(bot:CustomBot):
+    x = Information(bot)
+    bot.add_cog(x)
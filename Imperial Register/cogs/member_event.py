@@ -0,0 +1,60 @@
+from asyncio import sleep
+
+from cogs.utils.custom_bot import CustomBot
+from cogs.utils.guild_members import GuildMembers
+
+
+class MemberEvent(object):
+    '''
+    Keeps the guild membership index up to date
+    This reads the raw gateway events rather than on_member_join etc, since those
+    rely on the member cache that we might be running without
+    '''
+
+    def __init__(self, bot:CustomBot):
+        self.bot = bot
+
+
+    async def on_socket_response(self, payload:dict):
+        '''
+        Feeds any guild member events from the gateway into GuildMembers
+        '''
+
+        event = payload.get('t')
+        data = payload.get('d')
+        if event == 'GUILD_CREATE':
+            guild_id = int(data['id'])
+            GuildMembers.start(guild_id, data.get('member_count', 0), *[int(i['user']['id']) for i in data.get('members', [])])
+            if data.get('large'):
+                self.bot.loop.create_task(self.request_members(guild_id))
+        elif event == 'GUILD_MEMBERS_CHUNK':
+            GuildMembers.add(int(data['guild_id']), *[int(i['user']['id']) for i in data['members']])
+        elif event == 'GUILD_MEMBER_ADD':
+            GuildMembers.add(int(data['guild_id']), int(data['user']['id']), joined=True)
+        elif event == 'GUILD_MEMBER_REMOVE':
+            GuildMembers.remove(int(data['guild_id']), int(data['user']['id']))
+        elif event == 'GUILD_DELETE' and not data.get('unavailable'):
+            GuildMembers.clear(int(data['id']))
+
+
+    async def request_members(self, guild_id:int):
+        '''
+        Asks for the rest of a large guild's members if the library hasn't already
+        (ie if it was started with fetch_offline_members turned off)
+        '''
+
+        await sleep(60)
+        if GuildMembers.get(guild_id) is not None:
+            return
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        try:
+            await self.bot.request_offline_members(guild)
+        except Exception:
+            pass
+
+
+def setup(bot:CustomBot):
+    x = MemberEvent(bot)
+    bot.add_cog(x)
@@ -0,0 +1,46 @@
+from cogs.utils.custom_bot import CustomBot
+from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+
+
+class UserEvent(object):
+    '''
+    Keeps everyone's stored names up to date
+    This reads the raw gateway events rather than on_user_update, since that relies
+    on the member cache that we might be running without
+    '''
+
+    def __init__(self, bot:CustomBot):
+        self.bot = bot
+
+
+    async def on_socket_response(self, payload:dict):
+        '''
+        Gives the name cache the names of anyone with a family from any gateway event
+        that has them in, redrawing their family's trees when someone's name has changed
+        '''
+
+        event = payload.get('t')
+        data = payload.get('d')
+        if event in ('GUILD_CREATE', 'GUILD_MEMBERS_CHUNK'):
+            users = [i['user'] for i in data.get('members', [])]
+        elif event in ('GUILD_MEMBER_ADD', 'GUILD_MEMBER_UPDATE', 'PRESENCE_UPDATE'):
+            users = [data['user']]
+        elif event == 'MESSAGE_CREATE':
+            users = [data['author']]
+        else:
+            return
+
+        graph = FamilyTreeMember.graph
+        for user in users:
+            if 'username' not in user:
+                continue  # Presence updates only have the whole user when it's changed
+            user_id = int(user['id'])
+            if user_id not in graph:
+                continue
+            if self.bot.name_cache.update(user_id, f"{user['username']}#{user['discriminator']}"):
+                graph.components.touch(user_id)  # Moves the family on from any cached renders
+
+
+def setup(bot:CustomBot):
+    x = UserEvent(bot)
+    bot.add_cog(x)
@@ -0,0 +1,20 @@
+from discord.ext.commands import check, CheckFailure
+
+from cogs.utils.database import DatabaseConnection
+
+
+class DatabaseDown(CheckFailure):
+    pass
+
+
+def database_available(journaled:bool=False):
+    async def predicate(ctx):
+        # The families the command changes have to be loaded, even if that means failing
+        # (see CustomBot.load_families) - checks run before the before_invoke hook does
+        ctx.changes_families = True
+        if DatabaseConnection.available():
+            return True
+        if journaled and ctx.bot.write_journal != None:
+            return True  # The change can wait in the journal until the database is back
+        raise DatabaseDown()
+    return check(predicate)
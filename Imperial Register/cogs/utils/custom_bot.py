@@ -1,235 +1,639 @@
-from datetime import datetime as dt
-from json import load
-from importlib import import_module
-from asyncio import sleep
-from aiohttp import ClientSession
-from aiohttp.web import Application, AppRunner, TCPSite
-
-from discord import Game, Message
-from discord.ext.commands import AutoShardedBot, cooldown, when_mentioned_or
-from discord.ext.commands.cooldowns import BucketType
-
-from cogs.utils.database import DatabaseConnection
-from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
-from cogs.utils.customised_tree_user import CustomisedTreeUser
-from cogs.utils.removal_dict import RemovalDict
-
-
-def get_prefix(bot, message:Message):
-    '''
-    Gives the prefix for the given guild
-    '''
-
-    try:
-        x = bot.guild_prefixes.get(message.guild.id, bot.config['default_prefix'])
-    except AttributeError:
-        x = bot.config['default_prefix']
-    return when_mentioned_or(x)(bot, message)
-
-
-class CustomBot(AutoShardedBot):
-
-    def __init__(self, config_file:str='config/config.json', commandline_args=None, *args, **kwargs):
-        # Things I would need anyway
-        if kwargs.get('command_prefix'):
-            super().__init__(*args, **kwargs)
-        else:
-            super().__init__(command_prefix=get_prefix, *args, **kwargs)
-
-        # Store the config file for later
-        self.config = None
-        self.config_file = config_file
-        self.reload_config()
-        self.commandline_args = commandline_args
-
-        # Add webserver stuff so I can come back to it later
-        self.web_runner = None
-
-        # Allow database connections like this
-        self.database = DatabaseConnection
-        self.database.config = self.config['database']
-
-        # Store the startup method so I can see if it completed successfully
-        self.startup_method = self.loop.create_task(self.startup())
-        self.deletion_method = self.loop.create_task(self.delete_loop())
-
-        # Add a cache for proposing users
-        self.proposal_cache = RemovalDict()
-
-        # Add a list of blacklisted guilds
-        self.blacklisted_guilds = []
-
-        # Dictionary of custom prefixes
-        self.guild_prefixes = {}  # guild_id: prefix
-        
-        # Add a cooldown to help
-        cooldown(1, 5, BucketType.user)(self.get_command('help'))
-
-
-    async def startup(self):
-        '''
-        Resets and fills the FamilyTreeMember cache with objects
-        '''
-
-        # Cache all users for easier tree generation
-        FamilyTreeMember.all_users = {None: None}
-
-        # Get all from database
-        async with self.database() as db:
-            partnerships = await db('SELECT * FROM marriages WHERE valid=TRUE')
-            parents = await db('SELECT * FROM parents')
-            customisations = await db('SELECT * FROM customisation')
-        
-        # Cache all into objects
-        for i in partnerships:
-            FamilyTreeMember(discord_id=i['user_id'], children=[], parent_id=None, partner_id=i['partner_id'])
-        for i in parents:
-            parent = FamilyTreeMember.get(i['parent_id'])
-            parent._children.append(i['child_id'])
-            child = FamilyTreeMember.get(i['child_id'])
-            child._parent = i['parent_id']
-        for i in customisations:
-            CustomisedTreeUser(**i)
-
-        # Pick up the blacklisted guilds from the db
-        async with self.database() as db:
-            blacklisted = await db('SELECT * FROM blacklisted_guilds')
-        self.blacklisted_guilds = [i['guild_id'] for i in blacklisted]
-
-        # Now wait for the stuff you need to actually be online for
-        await self.wait_until_ready()
-        await self.set_default_presence()
-
-        # Grab the command prefixes per guild
-        async with self.database() as db:
-            settings = await db('SELECT * FROM guild_settings')
-        for guild_setting in settings:
-            self.guild_prefixes[guild_setting['guild_id']] = guild_setting['prefix']
-
-        # Remove anyone who's empty or who the bot can't reach
-        async with self.database() as db:
-            for user_id, ftm in FamilyTreeMember.all_users.copy().items():
-                if user_id == None or ftm == None:
-                    continue
-                if self.get_user(user_id) == None:
-                    await db.destroy(user_id)
-                    ftm.destroy()
-
-        # And update DBL
-        await self.post_guild_count()
-
-
-    async def set_default_presence(self):
-        '''
-        Sets the default presence of the bot as appears in the config file
-        '''
-        
-        # Update presence
-        presence_text = self.config['presence_text']
-        if self.shard_count > 1:
-            for i in range(self.shard_count):
-                game = Game(f"{presence_text} (shard {i})")
-                await self.change_presence(activity=game, shard_id=i)
-        else:
-            game = Game(presence_text)
-            await self.change_presence(activity=game)
-
-
-    async def post_guild_count(self):
-        '''
-        The loop of uploading the guild count to the DBL server
-        '''
-
-        # Only post if there's actually a DBL token set
-        if not self.config.get('dbl_token'):
-            return
-
-        async with ClientSession(loop=self.loop) as session:
-            url = f'https://discordbots.org/api/bots/{self.user.id}/stats'
-            json = {
-                'server_count': len(self.guilds),
-            }
-            headers = {
-                'Authorization': self.config['dbl_token']
-            }
-            async with session.post(url, json=json, headers=headers) as r:
-                pass
-
-
-    async def delete_loop(self):
-        '''
-        A loop that runs every hour, deletes all files in the tree storage directory
-        '''
-
-        await self.wait_until_ready()
-        while not self.is_closed: 
-            await create_subprocess_exec('rm', f'{self.config["tree_file_location"]}/*', loop=self.bot.loop)
-            await sleep(60*60)
-
-
-    async def destroy(self, user_id:int):
-        '''
-        Removes a user ID from the database and cache
-        '''
-
-        async with self.database() as db:
-            await db.destroy(user_id)
-        FamilyTreeMember.get(user_id).destroy()
-
-
-    def reload_config(self):
-        try:
-            with open(self.config_file) as a:
-                self.config = load(a)
-        except Exception:
-            pass
-
-
-    def run_all(self):
-        self.run(self.config['token'])
-
-
-    async def start_all(self):
-        await self.start(self.config['token'])
-
-
-    async def logout(self):
-        '''
-        An override of the default logout that also closes the webserver
-        '''
-
-        await self.web_runner.cleanup()
-        await self.close()
-
-
-    async def restart_webserver(self, *imports):
-        '''
-        Stops the current running webserver and starts a new one
-
-        Args:
-            *imports: str
-                A list of modules to import that contain a "routes" attribute
-        '''
-
-        try:
-            await self.web_runner.cleanup()
-        except Exception as e:
-            print("Error with closing previous server: ", e)
-
-        # Make and link all the relevant options
-        app = Application(loop=self.loop)
-        for i in imports:
-            x = import_module(i)
-            app.add_routes(x.routes)
-        app['bot'] = self
-
-        # Run the site
-        self.web_runner = AppRunner(app)
-        await self.web_runner.setup()
-        site = TCPSite(self.web_runner, self.commandline_args.host, self.commandline_args.port)
-        await site.start()
-
-        print(f"Server started: http://{self.commandline_args.host}:{self.commandline_args.port}/")
-
-    
-
+from datetime import datetime as dt
+from json import load
+from traceback import print_exc
+from importlib import import_module
+from asyncio import sleep, wait
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from aiohttp import ClientSession
+from aiohttp.web import Application, AppRunner, TCPSite
+
+from discord import Game, Message, Member, User
+from discord.ext.commands import AutoShardedBot, cooldown, when_mentioned_or
+from discord.ext.commands.cooldowns import BucketType
+
+from cogs.utils.database import DatabaseConnection, DatabaseUnavailable
+from cogs.utils.checks.database_available import DatabaseDown
+from cogs.utils.migrations import run_migrations
+from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+from cogs.utils.family_tree.snapshot import SnapshotPublisher
+from cogs.utils.family_tree.cache_file import CUSTOMISATION_FIELDS, read_cache_file, write_cache_file
+from cogs.utils.family_tree.component_loader import ComponentLoader
+from cogs.utils.customised_tree_user import CustomisedTreeUser
+from cogs.utils.name_cache import NameCache
+from cogs.utils.removal_dict import RemovalDict
+from cogs.utils.render_cache import RenderCache
+from cogs.utils.render_pool import RenderPool
+from cogs.utils.render_scheduler import RenderScheduler
+from cogs.utils.write_journal import WriteJournal
+
+
+def get_prefix(bot, message:Message):
+    '''
+    Gives the prefix for the given guild
+    '''
+
+    try:
+        x = bot.guild_prefixes.get(message.guild.id, bot.config['default_prefix'])
+    except AttributeError:
+        x = bot.config['default_prefix']
+    return when_mentioned_or(x)(bot, message)
+
+
+class CustomBot(AutoShardedBot):
+
+    def __init__(self, config_file:str='config/config.json', commandline_args=None, *args, **kwargs):
+        # Store the config file for later
+        self.config = None
+        self.config_file = config_file
+        self.reload_config()
+        self.commandline_args = commandline_args
+
+        # Names come from the usernames table, so the member cache can be turned off
+        kwargs.setdefault('fetch_offline_members', self.config.get('cache_members', True))
+
+        # Things I would need anyway
+        if kwargs.get('command_prefix'):
+            super().__init__(*args, **kwargs)
+        else:
+            super().__init__(command_prefix=get_prefix, *args, **kwargs)
+
+        # Add webserver stuff so I can come back to it later
+        self.web_runner = None
+
+        # Allow database connections like this
+        self.database = DatabaseConnection
+        self.database.config = self.config['database']
+
+        # Families can be loaded as they're used rather than all at startup
+        self.family_loader = None
+        if self.config.get('lazy_families'):
+            self.family_loader = ComponentLoader(self, FamilyTreeMember.graph, size=self.config.get('lazy_family_cache_size', 1000000))
+        self.before_invoke(self.load_command_families)
+
+        # Family changes can go through a journal and on to the database in batches
+        self.write_journal = None
+        self.write_journal_method = None
+        if self.config.get('write_behind'):
+            self.write_journal = WriteJournal(
+                self,
+                self.config.get('write_behind_file', './write_journal.log'),
+                interval=self.config.get('write_behind_interval', 0.005),
+                batch_size=self.config.get('write_behind_batch_size', 1000),
+            )
+
+        # Store the startup method so I can see if it completed successfully
+        self.family_cache_loaded = False  # The cache file mustn't be written over until the graph's been loaded
+        self.family_cache_method = None
+        self.family_writes = set()  # Futures for the database writes still on their way to the cache (see family_write)
+        self.startup_method = self.loop.create_task(self.startup())
+
+        # Everyone's names, already sanitised for the trees
+        self.name_cache = NameCache(
+            self,
+            size=self.config.get('name_cache_size', 100000),
+            fetch_limit=self.config.get('name_fetch_limit', 20),
+            flush_interval=self.config.get('name_flush_interval', 30),
+        )
+        self.name_flush_method = self.loop.create_task(self.name_cache.flush_loop())
+
+        # DOT scripts are generated in other processes, from a snapshot of the family graph
+        self.graph_snapshots = SnapshotPublisher(FamilyTreeMember.graph)
+        self.dot_pool = ProcessPoolExecutor(max_workers=self.config.get('dot_workers', 2))
+
+        # Rendered trees, so unchanged families don't go back through Graphviz
+        self.tree_cache = RenderCache(
+            self.config['tree_file_location'],
+            memory_size=self.config.get('tree_cache_memory_size', 128),
+            disk_size=self.config.get('tree_cache_disk_size', 512*1024*1024),
+        )
+
+        # And a limited number of Graphviz processes to render the ones that aren't cached
+        self.render_pool = RenderPool(self.loop, max_workers=self.config.get('render_workers', 4))
+        self.render_scheduler = RenderScheduler(
+            self.loop,
+            workers=self.config.get('render_workers', 4),
+            queue_size=self.config.get('render_queue_size', 50),
+            shed_cost=self.config.get('render_shed_cost', 3000),
+        )
+
+        # Add a cache for proposing users
+        self.proposal_cache = RemovalDict()
+
+        # Add a list of blacklisted guilds
+        self.blacklisted_guilds = []
+
+        # Dictionary of custom prefixes
+        self.guild_prefixes = {}  # guild_id: prefix
+        
+        # Add a cooldown to help
+        cooldown(1, 5, BucketType.user)(self.get_command('help'))
+
+
+    async def startup(self):
+        '''
+        Resets and fills the FamilyTreeMember cache with objects
+        '''
+
+        # Bring the database up to date first, since everything else reads from it
+        applied = await run_migrations(self.database, self.config.get('migrations_directory', './config/migrations'))
+        for version, name in applied:
+            print(f"Applied database migration {version} ({name})")
+
+        # Anything left in the write journal from last time goes to the database before anything's read from it
+        if self.write_journal != None:
+            self.write_journal.open()
+            await self.write_journal.flush()
+            self.write_journal_method = self.loop.create_task(self.write_journal.flush_loop())
+
+        # Get all from the cache file, or from the database if there isn't one -
+        # or in lazy mode just the customisations, since families are loaded as they're used
+        if self.family_loader != None:
+            async with self.database() as db:
+                customisations = await db('SELECT * FROM customisation')
+            for i in customisations:
+                CustomisedTreeUser(**i)
+        elif not await self.load_family_cache():
+            async with self.database() as db:
+                partnerships = await db('SELECT * FROM marriages WHERE valid=TRUE')
+                parents = await db('SELECT * FROM parents')
+                customisations = await db('SELECT * FROM customisation')
+
+            # Cache all users for easier tree generation
+            FamilyTreeMember.graph.load(
+                ((i['user_id'], i['partner_id']) for i in partnerships),
+                ((i['child_id'], i['parent_id']) for i in parents),
+            )
+            for i in customisations:
+                CustomisedTreeUser(**i)
+        if self.family_loader == None:
+            self.family_cache_loaded = True
+            self.family_cache_method = self.loop.create_task(self.family_cache_loop())
+
+        # Pick up the blacklisted guilds from the db
+        async with self.database() as db:
+            blacklisted = await db('SELECT * FROM blacklisted_guilds')
+        self.blacklisted_guilds = [i['guild_id'] for i in blacklisted]
+
+        # Now wait for the stuff you need to actually be online for
+        await self.wait_until_ready()
+        await self.set_default_presence()
+
+        # Grab the command prefixes per guild
+        async with self.database() as db:
+            settings = await db('SELECT * FROM guild_settings')
+        for guild_setting in settings:
+            self.guild_prefixes[guild_setting['guild_id']] = guild_setting['prefix']
+
+        # Remove anyone who's empty or who the bot can't reach - which can only be
+        # told from the member cache if every member is in it
+        if self.caching_members:
+            await self.remove_unreachable_users()
+
+        # And update DBL
+        await self.post_guild_count()
+
+
+    @property
+    def caching_members(self) -> bool:
+        '''
+        Whether or not every member of every guild is kept in the cache, ie whether
+        get_user giving None means that the bot can't reach someone any more
+        '''
+
+        return self.config.get('cache_members', True)
+
+
+    async def load_families(self, user_ids, required:bool=False):
+        '''
+        Makes sure the families of the given users are in the cache - this only does
+        anything in lazy mode, since otherwise everyone's loaded at startup
+
+        If the database is down, anything that only reads makes do with whoever's
+        already loaded until it's back. Anything that changes a family has to be
+        `required`, and DatabaseUnavailable is raised instead, since the rules it
+        checks (one partner, one parent) can't be checked against a family that
+        isn't there.
+        '''
+
+        if self.family_loader != None:
+            try:
+                await self.family_loader.ensure(user_ids)
+            except DatabaseUnavailable:
+                if required:
+                    raise
+
+
+    async def load_command_families(self, ctx):
+        '''
+        Loads the families of the author and anyone else a command's been given before
+        it runs, so that the cogs can carry on using FamilyTreeMember.get as they are
+        The database_available check marks the commands that change families
+        '''
+
+        users = [ctx.author, *ctx.args, *ctx.kwargs.values()]
+        try:
+            await self.load_families([i.id for i in users if isinstance(i, (User, Member))], required=getattr(ctx, 'changes_families', False))
+        except DatabaseUnavailable as e:
+            raise DatabaseDown() from e  # Hooks' errors aren't wrapped, so this is what the error handler knows
+
+
+    async def load_family_cache(self) -> bool:
+        '''
+        Fills the family graph and customisations from the cache file, then replays
+        whatever's changed in the database since it was written (see the family_changes
+        table). Gives False, having loaded nothing, if there's no usable cache file or
+        so much has changed since that loading from the database would be quicker.
+        '''
+
+        path = self.config.get('family_cache_file')
+        if not path:
+            return False
+        cached = await self.loop.run_in_executor(None, read_cache_file, path)
+        if cached == None:
+            return False
+        watermark, graph_data, customisations = cached
+
+        # Get the current rows for everyone who's changed
+        async with self.database() as db:
+            changes = await db('SELECT DISTINCT user_id FROM family_changes WHERE txid >= $1', watermark)
+            changed = [i['user_id'] for i in changes]
+            if len(changed) > max(len(graph_data['parents']) // 8, 1000):
+                return False
+            partnerships = await db('SELECT * FROM marriages WHERE valid=TRUE AND user_id=ANY($1::BIGINT[])', changed)
+            parents = await db('SELECT * FROM parents WHERE child_id=ANY($1::BIGINT[])', changed)
+            changed_customisations = await db('SELECT * FROM customisation WHERE user_id=ANY($1::BIGINT[])', changed)
+
+        # And put them over the top of the cache file
+        FamilyTreeMember.graph.restore(graph_data)
+        FamilyTreeMember.graph.replace_links(
+            changed,
+            ((i['user_id'], i['partner_id']) for i in partnerships),
+            ((i['child_id'], i['parent_id']) for i in parents),
+        )
+        for user_id in changed:
+            customisations.pop(user_id, None)
+        for i in changed_customisations:
+            customisations[i['user_id']] = {o: i[o] for o in CUSTOMISATION_FIELDS}
+        for user_id, colours in customisations.items():
+            CustomisedTreeUser(user_id, **colours)
+        return True
+
+
+    @asynccontextmanager
+    async def family_write(self):
+        '''
+        Wraps a database write whose change is put into the cache once it's committed,
+        so that save_family_cache can wait for it to get there
+        '''
+
+        done = self.loop.create_future()
+        self.family_writes.add(done)
+        try:
+            yield
+        finally:
+            self.family_writes.discard(done)
+            done.set_result(None)
+
+
+    async def save_family_cache(self):
+        '''
+        Writes the family graph and customisations out to the cache file, so that the
+        next startup only needs the rows changed since
+
+        The watermark is the oldest database transaction still running, so anything
+        at or after it is replayed. Anything that committed before it was written by
+        a family_write that had started by the time the watermark came back, so once
+        those have all finished the graph has everything before the watermark, and
+        it's pinned (by dumping it) there.
+        '''
+
+        path = self.config.get('family_cache_file')
+        if not path or not self.family_cache_loaded:
+            return
+        async with self.database() as db:
+            rows = await db('SELECT txid_snapshot_xmin(txid_current_snapshot()) AS watermark')
+        watermark = rows[0]['watermark']
+        if self.family_writes:
+            await wait(list(self.family_writes))
+
+        # Fold in whoever's been added since the last compaction every so often, so that
+        # they're not kept in the slower overflow through to the file and the next start
+        graph = FamilyTreeMember.graph
+        if graph.needs_compacting():
+            graph.compact()
+
+        # The graph dump is cheap to take here and safe to write out from another thread
+        graph_data = graph.dump()
+        customisations = {
+            i: o.colours for i, o in CustomisedTreeUser.all_users.items()
+            if any(colour != None for colour in o.colours.values())
+        }
+        await self.loop.run_in_executor(None, write_cache_file, path, watermark, graph_data, customisations)
+
+        # The file covers everything before the watermark now
+        async with self.database() as db:
+            await db('DELETE FROM family_changes WHERE txid < $1', watermark)
+
+
+    async def family_cache_loop(self):
+        '''
+        Saves the family cache file every so often, so that a crash doesn't leave
+        too much to replay from the database
+        '''
+
+        while not self.is_closed():
+            await sleep(self.config.get('family_cache_interval', 1800))
+            try:
+                await self.save_family_cache()
+            except Exception:
+                print("Error with saving the family cache file:")
+                print_exc()
+
+
+    async def set_default_presence(self):
+        '''
+        Sets the default presence of the bot as appears in the config file
+        '''
+        
+        # Update presence
+        presence_text = self.config['presence_text']
+        if self.shard_count > 1:
+            for i in range(self.shard_count):
+                game = Game(f"{presence_text} (shard {i})")
+                await self.change_presence(activity=game, shard_id=i)
+        else:
+            game = Game(presence_text)
+            await self.change_presence(activity=game)
+
+
+    async def post_guild_count(self):
+        '''
+        The loop of uploading the guild count to the DBL server
+        '''
+
+        # Only post if there's actually a DBL token set
+        if not self.config.get('dbl_token'):
+            return
+
+        async with ClientSession(loop=self.loop) as session:
+            url = f'https://discordbots.org/api/bots/{self.user.id}/stats'
+            json = {
+                'server_count': len(self.guilds),
+            }
+            headers = {
+                'Authorization': self.config['dbl_token']
+            }
+            async with session.post(url, json=json, headers=headers) as r:
+                pass
+
+
+    async def destroy(self, user_id:int):
+        '''
+        Removes a user ID from the database and cache
+        '''
+
+        if self.write_journal != None:
+            await self.write_journal.flush()  # So nothing in it puts them back
+        async with self.family_write():
+            async with self.database() as db:
+                await db.destroy(user_id)
+            FamilyTreeMember.get(user_id).destroy()
+
+
+    async def destroy_many(self, user_ids:list):
+        '''
+        Removes a batch of user IDs from the database and cache
+
+        The database goes in one transaction, a chunk of IDs per statement, and the
+        cache in bulk a chunk at a time, sleeping between chunks so that commands
+        are still handled while a big batch goes through
+        '''
+
+        chunk_size = self.config.get('cleanup_chunk_size', 5000)
+        delay = self.config.get('cleanup_chunk_delay', 0.1)
+        chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+        if not chunks:
+            return
+        if self.write_journal != None:
+            await self.write_journal.flush()  # So nothing in it puts these users back
+        async with self.family_write():
+            async with self.database() as db:
+                async with db.transaction():
+                    for chunk in chunks:
+                        await db.destroy_many(chunk)
+            for chunk in chunks:
+                FamilyTreeMember.graph.destroy_many(chunk)
+                await sleep(delay)
+
+
+    async def marry(self, user_id:int, partner_id:int):
+        '''
+        Marries two users, in the database and the cache - with the write journal,
+        the cache is changed first and the database later
+
+        If the journal can't be written the cache change is undone, but only if it's
+        still there, since another command could have built on it in the meantime
+        '''
+
+        graph = FamilyTreeMember.graph
+        if self.write_journal == None:
+            async with self.family_write():
+                async with self.database() as db:
+                    await db.marry(user_id, partner_id)
+                graph.marry(user_id, partner_id)
+            return
+
+        # The journal can't tell that a second marriage is one, so it's turned away here
+        if graph.partner_of(user_id) != None or graph.partner_of(partner_id) != None:
+            raise ValueError("One of those users is already married.")
+        graph.marry(user_id, partner_id)
+        try:
+            await self.write_journal.append('marry', self.database.make_id(), user_id, partner_id)
+        except Exception:
+            if graph.partner_of(user_id) == partner_id:
+                graph.divorce(user_id)
+            raise
+
+
+    async def divorce(self, user_id:int, partner_id:int):
+        '''
+        Divorces two users, in the database and the cache
+        '''
+
+        graph = FamilyTreeMember.graph
+        if self.write_journal == None:
+            async with self.family_write():
+                async with self.database() as db:
+                    await db('UPDATE marriages SET valid=FALSE WHERE valid=TRUE AND (user_id=$1 OR user_id=$2)', user_id, partner_id)
+                graph.divorce(user_id)
+            return
+        graph.divorce(user_id)
+        try:
+            await self.write_journal.append('divorce', user_id, partner_id)
+        except Exception:
+            if graph.partner_of(user_id) == None and graph.partner_of(partner_id) == None:
+                graph.marry(user_id, partner_id)
+            raise
+
+
+    async def add_child(self, parent_id:int, child_id:int):
+        '''
+        Makes one user the parent of another, in the database and the cache
+        '''
+
+        graph = FamilyTreeMember.graph
+        if self.write_journal == None:
+            async with self.family_write():
+                async with self.database() as db:
+                    await db.add_child(parent_id, child_id)
+                graph.add_child(parent_id, child_id)
+            return
+
+        # The journal won't write over a parent, so a second one is turned away here
+        if graph.parent_of(child_id) != None:
+            raise ValueError("That user already has a parent.")
+        graph.add_child(parent_id, child_id)
+        try:
+            await self.write_journal.append('add_child', child_id, parent_id)
+        except Exception:
+            if graph.parent_of(child_id) == parent_id:
+                graph.remove_child(parent_id, child_id)
+            raise
+
+
+    async def remove_child(self, parent_id:int, child_id:int):
+        '''
+        Removes the link between a parent and their child, in the database and the cache
+        '''
+
+        graph = FamilyTreeMember.graph
+        if self.write_journal == None:
+            async with self.family_write():
+                async with self.database() as db:
+                    await db('DELETE FROM parents WHERE child_id=$1 AND parent_id=$2', child_id, parent_id)
+                graph.remove_child(parent_id, child_id)
+            return
+        graph.remove_child(parent_id, child_id)
+        try:
+            await self.write_journal.append('remove_child', child_id, parent_id)
+        except Exception:
+            if graph.parent_of(child_id) == None:
+                graph.add_child(parent_id, child_id)
+            raise
+
+
+    async def remove_unreachable_users(self):
+        '''
+        Removes everyone with a family who the bot can't reach any more
+        The graph is scanned from a pinned version a chunk at a time, sleeping between
+        chunks, and then everyone found goes through destroy_many together. In lazy
+        mode the graph only has whoever's been loaded, so the database is scanned instead.
+        '''
+
+        chunk_size = self.config.get('cleanup_chunk_size', 5000)
+        delay = self.config.get('cleanup_chunk_delay', 0.1)
+        unreachable = []
+        if self.family_loader == None:
+            for position, user_id in enumerate(FamilyTreeMember.graph.pin().users(), start=1):
+                if self.get_user(user_id) == None:
+                    unreachable.append(user_id)
+                if position % chunk_size == 0:
+                    await sleep(delay)
+        else:
+            async for chunk in self.database_family_ids(chunk_size):
+                unreachable.extend(i for i in chunk if self.get_user(i) == None)
+                await sleep(delay)
+            unreachable = list(set(unreachable))
+        await self.destroy_many(unreachable)
+
+
+    async def database_family_ids(self, chunk_size:int):
+        '''
+        Yields lists of the IDs of everyone with a family in the database, a chunk at a
+        time - someone with a partner and a parent can be in more than one chunk
+        '''
+
+        for sql in (
+            'SELECT user_id FROM marriages WHERE valid=TRUE AND user_id>$1 ORDER BY user_id LIMIT $2',
+            'SELECT child_id AS user_id FROM parents WHERE child_id>$1 ORDER BY child_id LIMIT $2',
+            'SELECT DISTINCT parent_id AS user_id FROM parents WHERE parent_id>$1 ORDER BY parent_id LIMIT $2',
+        ):
+            last = -1
+            while True:
+                async with self.database() as db:
+                    rows = await db(sql, last, chunk_size)
+                if not rows:
+                    break
+                chunk = [i['user_id'] for i in rows]
+                yield chunk
+                last = chunk[-1]
+
+
+    def reload_config(self):
+        try:
+            with open(self.config_file) as a:
+                self.config = load(a)
+        except Exception:
+            pass
+
+
+    def run_all(self):
+        self.run(self.config['token'])
+
+
+    async def start_all(self):
+        await self.start(self.config['token'])
+
+
+    async def logout(self):
+        '''
+        An override of the default logout that also saves the family cache
+        file and closes the webserver and database pool
+        '''
+
+        if self.write_journal != None:
+            try:
+                await self.write_journal.close()
+            except Exception as e:
+                print("Error with flushing the write journal: ", e)
+        try:
+            await self.save_family_cache()
+        except Exception as e:
+            print("Error with saving the family cache file: ", e)
+        await self.web_runner.cleanup()
+        await self.database.close_pool()
+        await self.close()
+
+
+    async def restart_webserver(self, *imports):
+        '''
+        Stops the current running webserver and starts a new one
+
+        Args:
+            *imports: str
+                A list of modules to import that contain a "routes" attribute
+        '''
+
+        try:
+            await self.web_runner.cleanup()
+        except Exception as e:
+            print("Error with closing previous server: ", e)
+
+        # Make and link all the relevant options
+        app = Application(loop=self.loop)
+        for i in imports:
+            x = import_module(i)
+            app.add_routes(x.routes)
+        app['bot'] = self
+
+        # Run the site
+        self.web_runner = AppRunner(app)
+        await self.web_runner.setup()
+        site = TCPSite(self.web_runner, self.commandline_args.host, self.commandline_args.port)
+        await site.start()
+
+        print(f"Server started: http://{self.commandline_args.host}:{self.commandline_args.port}/")
+
+    
+
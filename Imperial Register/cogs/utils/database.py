@@ -1,93 +1,288 @@
-from random import choice
-from asyncio import create_subprocess_exec, get_event_loop
-
-from discord import Member
-from asyncpg import connect
-
-
-RANDOM_CHARACTERS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890-_'
-
-
-class DatabaseConnection(object):
-
-    config = None
-    restarting = False
-
-    def __init__(self):
-        self.db = None
-
-    async def __aenter__(self):
-        try:
-            self.db = await connect(**self.config)
-        except Exception as e:
-            # Database connection failed - restart Postgres connection
-            if self.restarting:
-                raise Exception("Database in the process of restarting, please try again in a moment.")
-            self.restarting = True
-            restart_loop = await create_subprocess_exec(*[
-                "systemctl", "restart", "postgresql"
-            ], loop=get_event_loop())
-            await restart_loop.wait()
-            self.restarting = False
-            raise e
-        return self
-
-    async def __aexit__(self, exc_type, exc, tb):
-        await self.db.close()
-        self.db = None
-
-    async def __call__(self, sql:str, *args):
-        '''
-        Runs a line of SQL using the internal database
-        '''
-
-        # Runs the SQL
-        x = await self.db.fetch(sql, *args)
-
-        # If it got something, return the dict, else None
-        if x:
-            return x
-        if 'select' in sql.lower().split(' ') or 'returning' in sql.lower().split(' '):
-            return []
-        return None
-
-    async def destroy(self, user_id:int):
-        '''
-        Removes a given user ID form all parts of the database
-        '''
-
-        await self('UPDATE marriages SET valid=False WHERE user_id=$1 OR partner_id=$1', user_id)
-        await self('DELETE FROM parents WHERE child_id=$1 OR parent_id=$1', user_id)
-
-    async def make_id(self, table:str, id_field:str) -> str:
-        '''
-        Makes a random ID that hasn't appeared in the database before for a given table
-        '''
-
-        while True:
-            idnumber = ''
-            for i in range(11):
-                idnumber += choice(RANDOM_CHARACTERS)
-            x = await self(f'SELECT * FROM {table} WHERE {id_field}=$1', idnumber)
-            if not x:
-                return idnumber
-
-    async def marry(self, instigator:Member, target:Member, marriage_id:str=None):
-        '''
-        Marries two users together
-        Remains in the Database class solely as you need the "idnumber" field.
-        '''
-
-        if marriage_id == None:
-            idnumber = await self.make_id('marriages', 'marriage_id')
-        else:
-            idnumber = marriage_id
-        # marriage_id, user_id, user_name, partner_id, partner_name, valid
-        await self(
-            'INSERT INTO marriages VALUES ($1, $2, $3, TRUE)',
-            idnumber,
-            instigator.id,
-            target.id,
-        )
-        if marriage_id == None:
-            await self.marry(target, instigator, idnumber)  # Run it again with instigator/target flipped
+from asyncio import Lock
+from time import monotonic, time
+
+from asyncpg import create_pool
+from asyncpg.exceptions import ConnectionDoesNotExistError, PostgresConnectionError
+
+
+ID_CHARACTERS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'  # In ASCII order, so IDs sort by time
+ID_EPOCH = 1514764800000  # 2018-01-01, in milliseconds
+CUSTOMISATION_COLUMNS = ('edge', 'node', 'font', 'highlighted_font', 'highlighted_node', 'background')
+LOCAL_OPTIONS = ('health_check_interval', 'backoff_base', 'backoff_max', 'id_node')  # Config that isn't for create_pool
+
+
+class DatabaseUnavailable(Exception):
+    '''
+    Raised by DatabaseConnection while the database can't be reached
+    '''
+
+    pass
+
+
+class DatabaseConnection(object):
+    '''
+    A connection from the shared pool, to be used with `async with`
+
+    The pool is made on first use from `config` - the "database" section of the config
+    file - so anything asyncpg.create_pool takes can go there (eg min_size and max_size),
+    along with health_check_interval. A connection that's sat in the pool for longer
+    than health_check_interval seconds is checked with a `SELECT 1` as it's taken out,
+    and thrown away for another if that fails. The statements in HOT_STATEMENTS (the
+    propose, adopt and customise commands) are put into asyncpg's statement cache on
+    every connection as soon as it's opened, so those commands never wait on parsing
+    and planning them.
+
+    If a connection can't be made, or one drops out part way through, no more are
+    tried for backoff_base seconds, doubling with each failure after that up to
+    backoff_max. Once that's up a single connection is tried to see if it's back, and
+    until then (and while that one's being tried, and if it fails) DatabaseUnavailable
+    is raised straight away rather than every command waiting on its own connection
+    timeout -
+    the family graph is all in memory, so anything that only reads from it carries
+    on as normal, and the database_available check turns away the commands that write.
+    '''
+
+    config = None
+    failures = 0  # Failures in a row
+    retry_at = 0  # When a connection can next be tried (see time.monotonic)
+    probing = False  # Whether a connection's being tried after a failure
+    pool = None
+    pool_lock = None
+    last_used = {}  # backend PID: when its connection was last given back to the pool, while it's open
+    id_time = 0  # The millisecond the last ID was made in
+    id_sequence = 0  # How many IDs have been made in that millisecond
+
+    HOT_STATEMENTS = (
+        'SELECT * FROM marriages WHERE marriage_id=$1',
+        'INSERT INTO marriages VALUES ($1, $2, $3, TRUE), ($1, $3, $2, TRUE)',
+        'UPDATE marriages SET valid=FALSE WHERE valid=TRUE AND (user_id=$1 OR user_id=$2)',
+        'INSERT INTO parents (child_id, parent_id) VALUES ($1, $2)',
+        'DELETE FROM parents WHERE child_id=$1 AND parent_id=$2',
+        *[f'INSERT INTO customisation (user_id, {i}) VALUES ($1, $2)' for i in CUSTOMISATION_COLUMNS],
+        *[f'UPDATE customisation SET {i}=$1 WHERE user_id=$2' for i in CUSTOMISATION_COLUMNS],
+        *[f'UPDATE customisation SET {i}=null WHERE user_id=$1' for i in CUSTOMISATION_COLUMNS],
+    )
+
+    def __init__(self):
+        self.db = None
+        self.pid = None
+
+    @classmethod
+    async def get_pool(cls):
+        '''
+        Gives the shared pool, making it if it's not been made yet
+        '''
+
+        if cls.pool_lock == None:
+            cls.pool_lock = Lock()
+        async with cls.pool_lock:
+            if cls.pool == None:
+                config = {i: o for i, o in cls.config.items() if i not in LOCAL_OPTIONS}
+                cls.pool = await create_pool(init=cls.prepare_connection, **config)
+        return cls.pool
+
+    @classmethod
+    async def close_pool(cls):
+        '''
+        Closes every connection in the shared pool
+        '''
+
+        if cls.pool != None:
+            await cls.pool.close()
+            cls.pool = None
+
+    @classmethod
+    async def prepare_connection(cls, connection):
+        '''
+        Prepares the hot statements on a newly opened connection
+
+        A PreparedStatement can't be kept past the connection going back to the pool,
+        so they go into the connection's own statement cache instead, which `fetch`
+        reads from - running each with no rows prepares it without running it.
+        '''
+
+        # The PID can't be read once it's closed, so it's kept here for forgetting it then
+        pid = connection.get_server_pid()
+        cls.last_used[pid] = monotonic()
+        connection.add_termination_listener(lambda _: cls.last_used.pop(pid, None))
+        for sql in cls.HOT_STATEMENTS:
+            try:
+                await connection.executemany(sql, [])
+            except Exception:
+                pass  # Left to be prepared when it's first run
+
+    @classmethod
+    def available(cls) -> bool:
+        '''
+        Whether the database is worth trying at the moment
+        '''
+
+        if monotonic() < cls.retry_at:
+            return False
+        return cls.failures == 0 or not cls.probing
+
+    @classmethod
+    def record_failure(cls):
+        '''
+        Backs off from the database for a little longer than last time
+        '''
+
+        base = cls.config.get('backoff_base', 1)
+        cls.retry_at = monotonic() + min(base * 2 ** cls.failures, cls.config.get('backoff_max', 60))
+        cls.failures += 1
+
+    async def acquire(self, pool):
+        '''
+        Takes a connection from the pool, checking it first if it's been idle a while
+        '''
+
+        interval = self.config.get('health_check_interval', 30)
+        for _ in range(self.config.get('max_size', 10) + 1):
+            connection = await pool.acquire()
+            if monotonic() - self.last_used.get(connection.get_server_pid(), monotonic()) < interval:
+                return connection
+            try:
+                await connection.fetchval('SELECT 1', timeout=5)
+                return connection
+            except Exception:
+                connection.terminate()
+                await pool.release(connection)
+        raise ConnectionError("Couldn't get a working database connection from the pool.")
+
+    async def __aenter__(self):
+        if not self.available():
+            raise DatabaseUnavailable("The database is unavailable at the moment.")
+        probe = self.failures > 0
+        if probe:
+            DatabaseConnection.probing = True
+        try:
+            self.db = await self.acquire(await self.get_pool())
+            self.pid = self.db.get_server_pid()
+        except Exception as e:
+            self.record_failure()
+            raise DatabaseUnavailable("The database is unavailable at the moment.") from e
+        finally:
+            if probe:
+                DatabaseConnection.probing = False
+        DatabaseConnection.failures = 0
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if isinstance(exc, (OSError, ConnectionDoesNotExistError, PostgresConnectionError)):
+            self.record_failure()
+        if self.pid in self.last_used:  # Otherwise the termination listener has already forgotten it
+            self.last_used[self.pid] = monotonic()
+        try:
+            await self.pool.release(self.db)
+        finally:
+            self.db = None
+
+    async def __call__(self, sql:str, *args):
+        '''
+        Runs a line of SQL using the internal database
+        '''
+
+        # Runs the SQL
+        x = await self.db.fetch(sql, *args)
+
+        # If it got something, return the dict, else None
+        if x:
+            return x
+        if 'select' in sql.lower().split(' ') or 'returning' in sql.lower().split(' '):
+            return []
+        return None
+
+    async def destroy(self, user_id:int):
+        '''
+        Removes a given user ID form all parts of the database
+        '''
+
+        await self('UPDATE marriages SET valid=False WHERE valid=True AND (user_id=$1 OR partner_id=$1)', user_id)
+        await self('DELETE FROM parents WHERE child_id=$1 OR parent_id=$1', user_id)
+
+    async def destroy_many(self, user_ids:list):
+        '''
+        Removes a batch of user IDs from all parts of the database
+        '''
+
+        await self('UPDATE marriages SET valid=False WHERE valid=True AND (user_id=ANY($1::BIGINT[]) OR partner_id=ANY($1::BIGINT[]))', user_ids)
+        await self('DELETE FROM parents WHERE child_id=ANY($1::BIGINT[]) OR parent_id=ANY($1::BIGINT[])', user_ids)
+
+    async def execute(self, sql:str):
+        '''
+        Runs one or more lines of SQL that don't take any arguments, eg a migration
+        '''
+
+        await self.db.execute(sql)
+
+    def transaction(self):
+        '''
+        Gives a transaction on this connection, to be used with `async with`
+        '''
+
+        return self.db.transaction()
+
+    async def copy_records(self, table:str, columns:list, records:list):
+        '''
+        Inserts a lot of rows into a table at once, using COPY
+        '''
+
+        await self.db.copy_records_to_table(table, records=records, columns=columns)
+
+    @classmethod
+    def make_ids(cls, count:int) -> list:
+        '''
+        Makes a batch of 11 character IDs, for marriages, without needing to check the database
+
+        Each is 66 bits - 43 for the millisecond it was made in, 13 counting up within
+        that millisecond, and 10 for the config's id_node (which only needs setting if
+        more than one process writes to the same database) - written out six bits to a
+        character in ID_CHARACTERS. That makes them unique without a lookup, and they
+        sort in the order they were made. If more than 8192 are wanted in a millisecond
+        (eg by importtree) the next millisecond is borrowed, so the clock is never
+        waited on; and if the clock goes backwards, the last time used carries on.
+        '''
+
+        node = cls.config.get('id_node', 0) if cls.config else 0
+        ids = []
+        for _ in range(count):
+            now = int(time() * 1000) - ID_EPOCH
+            if now > cls.id_time:
+                cls.id_time, cls.id_sequence = now, 0
+            elif cls.id_sequence == 0x1fff:
+                cls.id_time, cls.id_sequence = cls.id_time + 1, 0
+            else:
+                cls.id_sequence += 1
+            number = (cls.id_time << 23) | (cls.id_sequence << 10) | (node & 0x3ff)
+            ids.append(''.join(ID_CHARACTERS[(number >> i) & 63] for i in range(60, -1, -6)))
+        return ids
+
+    @classmethod
+    def make_id(cls) -> str:
+        '''
+        Makes a single ID (see make_ids)
+        '''
+
+        return cls.make_ids(1)[0]
+
+    async def marry(self, user_id:int, partner_id:int) -> str:
+        '''
+        Marries two users together, writing both of the marriage's rows in a single
+        statement - Postgres runs it as a transaction of its own, so either both rows
+        are saved or neither is, or it joins the caller's if in `db.transaction()`
+
+        Returns:
+            The new marriage ID
+        '''
+
+        marriage_id = self.make_id()
+        await self('INSERT INTO marriages VALUES ($1, $2, $3, TRUE), ($1, $3, $2, TRUE)', marriage_id, user_id, partner_id)
+        return marriage_id
+
+    async def add_child(self, parent_id:int, child_id:int):
+        '''
+        Makes one user the parent of another, for adopt and makeparent - this fails if
+        the child already has a parent
+        '''
+
+        await self('INSERT INTO parents (child_id, parent_id) VALUES ($1, $2)', child_id, parent_id)
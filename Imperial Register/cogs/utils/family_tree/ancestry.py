@@ -0,0 +1,266 @@
+from array import array
+from collections import deque
+
+from cogs.utils.family_tree.constants import NO_USER
+
+
+class AncestorIndex(object):
+    '''
+    A binary lifting table over the parent links of the family graph, so that
+    "is X an ancestor of Y" can be answered in O(log depth) steps
+
+    `_depth[i]` is how many parents user i has above them, and `_up[k][i]` is
+    their 2**k-th ancestor (or NO_USER). Anyone stuck in a parent loop can't
+    be given a depth, so they get -1 and are answered by walking instead.
+
+    Params:
+        graph: FamilyGraph
+            The graph whose parent links are being indexed
+    '''
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._depth = array('q')
+        self._up = [array('q')]
+
+
+    def _ensure(self, index:int):
+        '''
+        Makes sure the arrays are long enough to hold the given index
+        '''
+
+        missing = index + 1 - len(self._depth)
+        if missing > 0:
+            self._depth.extend([0] * missing)
+            for level in self._up:
+                level.extend([NO_USER] * missing)
+
+
+    def _add_level(self):
+        previous = self._up[-1]
+        self._up.append(array('q', (NO_USER if i == NO_USER else previous[i] for i in previous)))
+
+
+    def _set_row(self, index:int, parent_index:int):
+        '''
+        Fills in the depth and lifting row for a user whose parent's row is already right
+        '''
+
+        if parent_index == NO_USER:
+            self._depth[index] = 0
+        elif self._depth[parent_index] < 0:
+            self._depth[index] = -1
+        else:
+            self._depth[index] = self._depth[parent_index] + 1
+            while self._depth[index] >= 1 << len(self._up):
+                self._add_level()
+        ancestor = parent_index
+        for level in self._up:
+            level[index] = ancestor
+            if ancestor != NO_USER:
+                ancestor = level[ancestor]
+
+
+    def _refresh_subtree(self, index:int):
+        '''
+        Recalculates the rows of a user and everyone below them
+        If the user's new parent is below them then they've all been put in (or under)
+        a loop, and are given the same rows as `rebuild` gives anyone in one
+        '''
+
+        self._ensure(len(self.graph) - 1)
+        order = [index]
+        seen = {index}
+        looped = False
+        position = 0
+        while position < len(order):
+            current = order[position]
+            position += 1
+            for child_index in self.graph.children_indexes(current):
+                if child_index == index:
+                    looped = True
+                if child_index not in seen:
+                    seen.add(child_index)
+                    order.append(child_index)
+        for current in order:
+            if looped:
+                self._depth[current] = -1
+                for level in self._up:
+                    level[current] = NO_USER
+                self._up[0][current] = self.graph.parent_index(current)
+            else:
+                self._set_row(current, self.graph.parent_index(current))
+
+
+    def attached(self, child_index:int):
+        '''
+        Updates the index after a user has been given a new parent
+        '''
+
+        self._refresh_subtree(child_index)
+
+
+    def detached(self, child_index:int):
+        '''
+        Updates the index after a user has lost their parent
+        '''
+
+        self._refresh_subtree(child_index)
+
+
+    def rebuild(self):
+        '''
+        Recalculates every row from scratch, from the roots down
+        '''
+
+        size = len(self.graph)
+        self._depth = array('q', [-1]) * size
+        self._up = [array('q', [NO_USER]) * size]
+        roots = [i for i in range(size) if self.graph.parent_index(i) == NO_USER]
+        queue = deque(roots)
+        while queue:
+            current = queue.popleft()
+            self._set_row(current, self.graph.parent_index(current))
+            queue.extend(self.graph.children_indexes(current))
+
+        # Anyone not reached is in a loop - give them their parent row at least
+        for index in range(size):
+            if self._depth[index] < 0:
+                self._up[0][index] = self.graph.parent_index(index)
+
+
+    def dump(self) -> dict:
+        '''
+        Gives a copy of the index, for FamilyGraph.dump
+        '''
+
+        data = {'depth': array('q', self._depth), 'levels': len(self._up)}
+        for level, row in enumerate(self._up):
+            data[f'up{level}'] = array('q', row)
+        return data
+
+
+    def restore(self, data:dict):
+        '''
+        Puts back an index given by `dump`
+        '''
+
+        self._depth = data['depth']
+        self._up = [data[f'up{level}'] for level in range(data['levels'])]
+
+
+    def depth(self, index:int) -> int:
+        if index >= len(self._depth):
+            return 0
+        return self._depth[index]
+
+
+    def lift(self, index:int, steps:int) -> int:
+        '''
+        Gives the ancestor a number of generations above a user, or NO_USER
+        '''
+
+        if steps >= 1 << len(self._up):
+            return NO_USER  # Further up than anyone's depth goes
+        level = 0
+        while steps and index != NO_USER:
+            if steps & 1:
+                index = self._up[level][index]
+            steps >>= 1
+            level += 1
+        return index
+
+
+    def is_ancestor(self, ancestor_index:int, index:int) -> bool:
+        '''
+        Whether or not one user is a strict ancestor of another
+        '''
+
+        self._ensure(max(ancestor_index, index))
+        depth = self._depth[index]
+        ancestor_depth = self._depth[ancestor_index]
+        if depth < 0 or ancestor_depth < 0:
+            return self._walk_is_ancestor(ancestor_index, index)
+        if ancestor_depth >= depth:
+            return False
+        return self.lift(index, depth - ancestor_depth) == ancestor_index
+
+
+    def lowest_common_ancestor(self, index_a:int, index_b:int) -> int:
+        '''
+        Gives the closest shared ancestor of two users (either of whom may be that
+        ancestor), or NO_USER if they don't have one
+        '''
+
+        self._ensure(max(index_a, index_b))
+        depth_a = self._depth[index_a]
+        depth_b = self._depth[index_b]
+        if depth_a < 0 or depth_b < 0:
+            return NO_USER
+        if depth_a > depth_b:
+            index_a = self.lift(index_a, depth_a - depth_b)
+        elif depth_b > depth_a:
+            index_b = self.lift(index_b, depth_b - depth_a)
+        if index_a == index_b:
+            return index_a
+        for level in reversed(self._up):
+            if level[index_a] != level[index_b]:
+                index_a = level[index_a]
+                index_b = level[index_b]
+        return self._up[0][index_a]
+
+
+    def _walk_is_ancestor(self, ancestor_index:int, index:int) -> bool:
+        '''
+        The slow path for users with no depth, which stops if it loops
+        '''
+
+        seen = {index}
+        current = self.graph.parent_index(index)
+        while current != NO_USER and current not in seen:
+            if current == ancestor_index:
+                return True
+            seen.add(current)
+            current = self.graph.parent_index(current)
+        return False
+
+
+    def would_create_cycle(self, parent_id:int, child_id:int) -> bool:
+        '''
+        Whether or not making one user the parent of another would put a loop in the tree
+        '''
+
+        if parent_id == child_id:
+            return True
+        parent_index = self.graph.index(parent_id)
+        child_index = self.graph.index(child_id)
+        if parent_index is None or child_index is None:
+            return False
+        return self.is_ancestor(child_index, parent_index)
+
+
+def find_cycles(graph) -> list:
+    '''
+    Finds every parent loop in the graph in a single linear pass
+    Since each user has at most one parent, every loop is found by following
+    parent links from each unvisited user until a user is seen twice
+
+    Returns:
+        A list of loops, each a list of user indexes in child-to-parent order
+    '''
+
+    size = len(graph)
+    stamps = array('q', [-1]) * size  # The start index of the walk that first saw each user
+    cycles = []
+    for start in range(size):
+        if stamps[start] != -1:
+            continue
+        path = []
+        current = start
+        while current != NO_USER and stamps[current] == -1:
+            stamps[current] = start
+            path.append(current)
+            current = graph.parent_index(current)
+        if current != NO_USER and stamps[current] == start:
+            cycles.append(path[path.index(current):])
+    return cycles
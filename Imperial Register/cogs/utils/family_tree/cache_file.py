@@ -0,0 +1,108 @@
+from array import array
+from json import dumps, loads
+from mmap import mmap, ACCESS_READ
+from os import replace
+from sys import byteorder
+
+
+MAGIC = b'IRCACHE1'
+NULL = -2 ** 63  # Stands in for a None colour in the customisation rows
+CUSTOMISATION_FIELDS = ('edge', 'node', 'font', 'highlighted_font', 'highlighted_node', 'background')
+
+
+def _aligned(position:int) -> int:
+    return (position + 7) // 8 * 8
+
+
+def write_cache_file(path:str, watermark:int, graph_data:dict, customisations:dict):
+    '''
+    Writes the family graph and everyone's customisations out to a binary cache file,
+    which can be read back by read_cache_file far faster than the database can be
+    loaded from - the arrays go to disk as they are, so nothing needs building on the
+    way back in. The file is written alongside and moved into place, so a crash part
+    way through leaves the last one as it was.
+
+    The layout is MAGIC, an 8 byte header length, a JSON header, and then every array
+    one after the other, aligned to 8 bytes. The header holds the watermark, any plain
+    ints, and the offset and length of each array.
+
+    Params:
+        path: str
+            Where to write the file
+        watermark: int
+            The database transaction watermark the data was taken at (see CustomBot.save_family_cache)
+        graph_data: dict
+            The output of FamilyGraph.dump
+        customisations: dict
+            discord_id: CustomisedTreeUser.colours
+    '''
+
+    # Pack the customisations into a flat array of rows
+    rows = array('q')
+    for user_id, colours in customisations.items():
+        rows.append(user_id)
+        rows.extend(NULL if colours[i] is None else colours[i] for i in CUSTOMISATION_FIELDS)
+    arrays = {i: o for i, o in graph_data.items() if isinstance(o, array)}
+    arrays['customisations'] = rows
+
+    # Work out where everything goes
+    header = {
+        'byteorder': byteorder,
+        'watermark': watermark,
+        'ints': {i: o for i, o in graph_data.items() if not isinstance(o, array)},
+        'arrays': {},
+    }
+    offset = 0
+    for name, data in arrays.items():
+        header['arrays'][name] = (offset, len(data))
+        offset += len(data) * data.itemsize
+    header_bytes = dumps(header).encode('utf-8')
+    start = _aligned(len(MAGIC) + 8 + len(header_bytes))
+
+    with open(path + '.tmp', 'wb') as a:
+        a.write(MAGIC)
+        a.write(len(header_bytes).to_bytes(8, 'little'))
+        a.write(header_bytes)
+        a.write(b'\x00' * (start - len(MAGIC) - 8 - len(header_bytes)))
+        for data in arrays.values():
+            a.write(memoryview(data))
+    replace(path + '.tmp', path)
+
+
+def read_cache_file(path:str) -> tuple:
+    '''
+    Reads a cache file from write_cache_file, memory mapping it so that each array is
+    copied straight out of the page cache
+
+    Returns:
+        (watermark, graph_data, customisations), as they were given to write_cache_file,
+        or None if there's no readable cache file at the path
+    '''
+
+    try:
+        with open(path, 'rb') as a, mmap(a.fileno(), 0, access=ACCESS_READ) as memory:
+            if memory[:len(MAGIC)] != MAGIC:
+                return None
+            header_length = int.from_bytes(memory[len(MAGIC):len(MAGIC) + 8], 'little')
+            header = loads(memory[len(MAGIC) + 8:len(MAGIC) + 8 + header_length].decode('utf-8'))
+            if header['byteorder'] != byteorder:
+                return None
+            start = _aligned(len(MAGIC) + 8 + header_length)
+            graph_data = dict(header['ints'])
+            with memoryview(memory) as view:
+                for name, (offset, length) in header['arrays'].items():
+                    data = array('q')
+                    with view[start + offset:start + offset + length * data.itemsize] as part:
+                        data.frombytes(part)
+                    graph_data[name] = data
+    except (OSError, ValueError, KeyError):
+        return None
+
+    # Unpack the customisation rows
+    rows = graph_data.pop('customisations')
+    width = len(CUSTOMISATION_FIELDS) + 1
+    customisations = {}
+    for position in range(0, len(rows), width):
+        colours = rows[position + 1:position + width]
+        customisations[rows[position]] = {i: None if o == NULL else o for i, o in zip(CUSTOMISATION_FIELDS, colours)}
+    return header['watermark'], graph_data, customisations
@@ -0,0 +1,151 @@
+from asyncio import Lock
+from collections import OrderedDict, deque
+
+
+class ComponentLoader(object):
+    '''
+    Loads families into the graph from the database as they're first needed, and drops
+    the ones that haven't been used in a while, for when the whole graph is too big to
+    keep in memory (the `lazy_families` config option)
+
+    Everything stays synchronous for the cogs - `ensure` is awaited before a command
+    runs (see CustomBot.load_command_families), after which FamilyTreeMember.get reads
+    the graph as it always has. Each call to `ensure` loads the whole family of anyone
+    not yet loaded with a single recursive query, and families are kept in least
+    recently used order until there are more than `size` users loaded, at which point
+    the oldest are dropped from the graph. Anyone with no family at all still counts,
+    so that they aren't looked up every time they run a command.
+
+    Params:
+        bot: CustomBot
+        graph: FamilyGraph
+            The graph that families are loaded into
+        size: int = 1000000
+            The most users to keep loaded
+    '''
+
+    COMPONENT_QUERY = """
+        WITH RECURSIVE family(user_id) AS (
+            SELECT UNNEST($1::BIGINT[])
+            UNION
+            SELECT links.other_id FROM family JOIN (
+                SELECT user_id, partner_id AS other_id FROM marriages WHERE valid=TRUE
+                UNION ALL SELECT child_id, parent_id FROM parents
+                UNION ALL SELECT parent_id, child_id FROM parents
+            ) links ON links.user_id=family.user_id
+        )
+        SELECT user_id FROM family
+    """
+
+
+    def __init__(self, bot, graph, size:int=1000000):
+        self.bot = bot
+        self.graph = graph
+        self.size = size
+        self.families = OrderedDict()  # family key: set of user IDs
+        self.family_of = {}  # discord_id: family key
+        self.next_key = 0
+        self.dropped = 0  # Users dropped since the graph was last compacted
+        self.lock = Lock()
+
+
+    async def ensure(self, user_ids):
+        '''
+        Makes sure the families of all of the given users are loaded
+        '''
+
+        user_ids = set(user_ids)
+        for user_id in user_ids:
+            key = self.family_of.get(user_id)
+            if key is not None:
+                self.families.move_to_end(key)
+        if all(i in self.family_of for i in user_ids):
+            return
+
+        # Only one load at a time, so nobody's links are added twice
+        async with self.lock:
+            missing = [i for i in user_ids if i not in self.family_of]
+            if not missing:
+                return
+            if self.bot.write_journal != None:
+                await self.bot.write_journal.flush()  # So the database has everything the graph does
+            async with self.bot.database() as db:
+                rows = await db(self.COMPONENT_QUERY, missing)
+                family = [i['user_id'] for i in rows]
+                partnerships = await db('SELECT user_id, partner_id FROM marriages WHERE valid=TRUE AND user_id=ANY($1::BIGINT[])', family)
+                parents = await db('SELECT child_id, parent_id FROM parents WHERE child_id=ANY($1::BIGINT[])', family)
+
+            # Anything already in the graph for these users (eg from an import) is replaced
+            self.graph.destroy_many(family)
+            self.graph.add_links(
+                [(i['user_id'], i['partner_id']) for i in partnerships],
+                [(i['child_id'], i['parent_id']) for i in parents],
+            )
+            self._track(family)
+            self._drop_oldest(user_ids)
+
+
+    def _track(self, user_ids:list):
+        '''
+        Adds a newly loaded family to the LRU, taking in any families it's since joined with
+        '''
+
+        members = set(user_ids)
+        for user_id in user_ids:
+            key = self.family_of.get(user_id)
+            if key is not None and key in self.families:
+                members.update(self.families.pop(key))
+        key = self.next_key
+        self.next_key += 1
+        self.families[key] = members
+        for user_id in members:
+            self.family_of[user_id] = key
+
+
+    def _drop_oldest(self, keep:set):
+        '''
+        Drops the least recently used families until there are no more than `size`
+        users loaded, then compacts the graph once enough have gone
+
+        Params:
+            keep: set
+                Users whose families mustn't be dropped, ie the ones just asked for
+        '''
+
+        graph = self.graph
+        while len(self.family_of) > self.size and len(self.families) > 1:
+            _, oldest = self.families.popitem(last=False)
+
+            # Families can have married or adopted into each other since they were
+            # loaded, so anyone still linked to them goes too, along with the rest
+            # of whichever family they were loaded with
+            members = set()
+            queue = deque()
+            pending = [oldest]
+            while pending or queue:
+                for user_id in pending.pop() if pending else ():
+                    if user_id not in members:
+                        members.add(user_id)
+                        index = graph.index(user_id)
+                        if index is not None:
+                            queue.append(index)
+                if not queue:
+                    continue
+                for neighbour in graph.neighbour_indexes(queue.popleft()):
+                    user_id = graph.user_id(neighbour)
+                    if user_id in members:
+                        continue
+                    key = self.family_of.get(user_id)
+                    pending.append(self.families.pop(key) | {user_id} if key in self.families else {user_id})
+            if not members.isdisjoint(keep):
+                self._track(list(members))
+                break
+
+            graph.destroy_many(members)
+            for user_id in members:
+                self.family_of.pop(user_id, None)
+            self.dropped += len(members)
+
+        if self.dropped > max(len(graph) // 2, 10000):
+            graph.compact()
+            self.dropped = 0
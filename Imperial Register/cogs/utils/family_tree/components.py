@@ -0,0 +1,200 @@
+from array import array
+from collections import deque
+
+
+class ComponentIndex(object):
+    '''
+    A union-find index over the family graph, so that "are these two users in
+    the same family" is a near-constant-time comparison rather than a span
+
+    Links are unioned as they're made. When a link is removed the component it
+    was in might have split, so every user reachable from the ends of that link
+    is walked and given a fresh root - this only ever touches the one family.
+
+    Each root also holds a version stamp, taken from a counter that only ever
+    goes up, which is replaced whenever its component changes. Anything
+    generated from a family (eg a rendered tree) can be cached against the
+    stamp and will be missed as soon as that family - and only that family -
+    is changed.
+
+    Params:
+        graph: FamilyGraph
+            The graph whose components are being indexed
+    '''
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._roots = array('q')
+        self._sizes = array('q')
+        self._versions = array('q')
+        self._clock = 0
+
+
+    def _stamp(self, root:int):
+        '''
+        Gives a component root a brand new version
+        '''
+
+        self._clock += 1
+        self._versions[root] = self._clock
+
+
+    def _ensure(self, index:int):
+        '''
+        Makes sure the arrays are long enough to hold the given index
+        '''
+
+        while len(self._roots) <= index:
+            self._roots.append(len(self._roots))
+            self._sizes.append(1)
+            self._versions.append(0)
+
+
+    def find(self, index:int) -> int:
+        '''
+        Gives the root index of the component a user index is in
+        '''
+
+        if index >= len(self._roots):
+            return index
+        roots = self._roots
+        while roots[index] != index:
+            roots[index] = roots[roots[index]]  # Path halving
+            index = roots[index]
+        return index
+
+
+    def union(self, index_a:int, index_b:int):
+        '''
+        Joins the components of two user indexes
+        '''
+
+        self._ensure(max(index_a, index_b))
+        root_a = self.find(index_a)
+        root_b = self.find(index_b)
+        if root_a == root_b:
+            self._stamp(root_a)
+            return
+        if self._sizes[root_a] < self._sizes[root_b]:
+            root_a, root_b = root_b, root_a
+        self._roots[root_b] = root_a
+        self._sizes[root_a] += self._sizes[root_b]
+        self._stamp(root_a)
+
+
+    def relabel(self, *indexes:int):
+        '''
+        Rebuilds the components that the given indexes are in, after a link
+        between them (or a user next to them) has been removed
+        '''
+
+        self._ensure(max(indexes))
+        seen = set()
+        for start in indexes:
+            if start in seen:
+                continue
+            seen.add(start)
+            members = [start]
+            queue = deque(members)
+            while queue:
+                current = queue.popleft()
+                for neighbour in self.graph.neighbour_indexes(current):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        members.append(neighbour)
+                        queue.append(neighbour)
+            for member in members:
+                self._roots[member] = start
+            self._sizes[start] = len(members)
+            self._stamp(start)
+
+
+    def rebuild(self):
+        '''
+        Recalculates every component from scratch
+        '''
+
+        size = len(self.graph)
+        self._roots = array('q', range(size))
+        self._sizes = array('q', [1]) * size
+        self._versions = array('q', range(self._clock + 1, self._clock + 1 + size))
+        self._clock += size
+        for index in range(size):
+            partner_index = self.graph.partner_index(index)
+            if partner_index > index:
+                self.union(index, partner_index)
+            parent_index = self.graph.parent_index(index)
+            if parent_index >= 0:
+                self.union(index, parent_index)
+
+
+    def dump(self) -> dict:
+        '''
+        Gives a copy of the index, for FamilyGraph.dump
+        '''
+
+        return {
+            'roots': array('q', self._roots),
+            'sizes': array('q', self._sizes),
+            'versions': array('q', self._versions),
+            'clock': self._clock,
+        }
+
+
+    def restore(self, data:dict):
+        '''
+        Puts back an index given by `dump`
+        '''
+
+        self._roots = data['roots']
+        self._sizes = data['sizes']
+        self._versions = data['versions']
+        self._clock = data['clock']
+
+
+    def same_family(self, user_a:int, user_b:int) -> bool:
+        '''
+        Whether or not two users are in the same family
+        '''
+
+        if user_a == user_b:
+            return True
+        index_a = self.graph.index(user_a)
+        index_b = self.graph.index(user_b)
+        if index_a is None or index_b is None:
+            return False
+        return self.find(index_a) == self.find(index_b)
+
+
+    def family_size(self, user_id:int) -> int:
+        '''
+        Gives the number of people in a user's family, including themselves
+        '''
+
+        index = self.graph.index(user_id)
+        if index is None or index >= len(self._roots):
+            return 1
+        return self._sizes[self.find(index)]
+
+
+    def touch(self, user_id:int):
+        '''
+        Gives a user's family a new version stamp without changing it, eg when a name
+        that's drawn in its tree has changed
+        '''
+
+        index = self.graph.index(user_id)
+        if index is None or index >= len(self._roots):
+            return
+        self._stamp(self.find(index))
+
+
+    def version(self, user_id:int) -> int:
+        '''
+        Gives the version stamp of a user's family, which changes whenever the family does
+        '''
+
+        index = self.graph.index(user_id)
+        if index is None or index >= len(self._roots):
+            return 0
+        return self._versions[self.find(index)]
@@ -0,0 +1 @@
+NO_USER = -1  # Stored in the family graph's link arrays when there's no parent/partner
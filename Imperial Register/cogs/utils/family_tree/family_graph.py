@@ -0,0 +1,565 @@
+from array import array
+from bisect import bisect_left
+from sys import getsizeof
+
+from cogs.utils.family_tree.constants import NO_USER
+from cogs.utils.family_tree.graph_view import GraphView
+from cogs.utils.family_tree.components import ComponentIndex
+from cogs.utils.family_tree.ancestry import AncestorIndex
+from cogs.utils.family_tree.subtree import SubtreeIndex
+
+
+class FamilyGraph(GraphView):
+    '''
+    A compact store of every parent, partner and child link in the cache
+
+    Every user gets a dense index. The first `base_size` entries of `_ids`
+    are kept sorted so that they can be found with a binary search, and any
+    user added after the last compaction is appended and found through the
+    `_overflow` dict instead. Indexes never move until `load` or `compact`
+    is called, so anything holding an index is safe between the two.
+
+    Parent and partner links are held as int64 indexes in `_parents` and
+    `_partners`. Children are held in a CSR layout - the children of user
+    `i` are `_child_targets[_child_offsets[i]:_child_offsets[i+1]]` - and any
+    user whose children have changed since the last compaction gets a plain
+    list in `_child_overlay` that shadows their CSR row.
+
+    `components`, `ancestry` and `subtrees` are kept in step with every change
+    made through the methods here, so nothing should write to the arrays directly.
+    `version` goes up with every change, and `base_version` whenever the sorted
+    base and CSR layout are rebuilt (ie on `load` and `compact`).
+
+    Readers outside of the event loop (renders, exports, scans in an executor)
+    should `pin` a version and read that instead. Pinning just hands out the
+    current arrays and marks them as shared; the next change copies whatever
+    it's about to write to first (copy-on-write), so a pinned version never
+    changes under its reader and nobody needs a lock. Only the first change
+    after a pin pays for the copy - about 24 bytes per user - and any pins
+    made with no changes in between all share the same version.
+
+    Memory per user (compacted, 64 bit CPython):
+        _ids             8 bytes
+        _parents         8 bytes
+        _partners        8 bytes
+        _child_offsets   8 bytes
+        _child_targets   8 bytes per child, so ~8 bytes per user on average
+        ---------------------------
+        ~40 bytes per user
+
+    Users added or changed after the last compaction also cost a dict entry
+    in `_overflow`, `_child_overlay` and/or `_link_changes`, roughly another
+    100-200 bytes each until the next `compact`.
+
+    Measured with benchmarks/family_graph_memory.py (about half of all users
+    married, half with a parent):
+        1M users     dict of objects 214 bytes/user, FamilyGraph 36 bytes/user
+        10M users    dict of objects ~2.1GB (too big to trace here), FamilyGraph 36 bytes/user
+    '''
+
+    def __init__(self):
+        super().__init__(
+            ids=array('q'),
+            base_size=0,
+            overflow={},  # discord_id: index
+            parents=array('q'),
+            partners=array('q'),
+            child_offsets=array('q', [0]),
+            child_targets=array('q'),
+            child_overlay={},  # index: [child_index, ...]
+        )
+        self._pinned = None  # The last version handed out by pin, while it still shares our arrays
+        self._owned_overlay = set()  # Indexes whose overlay list no pinned version can see
+        self._link_changes = {}  # index: the version their parent or partner last changed at, oldest first
+        self.base_version = 0
+        self.components = ComponentIndex(self)
+        self.ancestry = AncestorIndex(self)
+        self.subtrees = SubtreeIndex(self)
+
+
+    def index(self, user_id:int, create:bool=False) -> int:
+        '''
+        Gives the dense index of a user, or None if they're not stored
+
+        Params:
+            user_id: int
+                The Discord ID of the user
+            create: bool = False
+                Whether or not to give the user a new index if they don't have one
+        '''
+
+        position = super().index(user_id)
+        if position is not None or not create:
+            return position
+
+        # Add them to the end of the arrays
+        self._unshare()
+        position = len(self._ids)
+        self._ids.append(user_id)
+        self._parents.append(NO_USER)
+        self._partners.append(NO_USER)
+        self._overflow[user_id] = position
+        return position
+
+
+    def _writable_children(self, index:int) -> list:
+        '''
+        Gives a list of child indexes for the user that can safely be changed
+        '''
+
+        if index not in self._owned_overlay:
+            self._child_overlay[index] = list(self.children_indexes(index))
+            self._owned_overlay.add(index)
+        return self._child_overlay[index]
+
+
+    def _unshare(self):
+        '''
+        Copies the arrays that a pinned version is sharing, before they're written to
+        '''
+
+        if self._pinned is None:
+            return
+        self._ids = array('q', self._ids)
+        self._parents = array('q', self._parents)
+        self._partners = array('q', self._partners)
+        self._overflow = dict(self._overflow)
+        self._child_overlay = dict(self._child_overlay)  # The lists are copied as they're written to
+        self._owned_overlay = set()
+        self._pinned = None
+
+
+    def _set_parent(self, index:int, parent_index:int):
+        self._parents[index] = parent_index
+        self._link_changes.pop(index, None)
+        self._link_changes[index] = self.version
+
+
+    def _set_partner(self, index:int, partner_index:int):
+        self._partners[index] = partner_index
+        self._link_changes.pop(index, None)
+        self._link_changes[index] = self.version
+
+
+    def links_changed_since(self, version:int) -> list:
+        '''
+        Gives the sorted indexes of everyone whose parent or partner has changed since
+        the given version, going no further back than the last load or compaction
+        '''
+
+        changed = []
+        for index, changed_at in reversed(self._link_changes.items()):
+            if changed_at <= version:
+                break
+            changed.append(index)
+        changed.sort()
+        return changed
+
+
+    def pin(self) -> GraphView:
+        '''
+        Gives a read-only version of the graph as it is right now, which can be read
+        from any thread without it changing underneath
+        '''
+
+        if self._pinned is None:
+            self._pinned = GraphView(
+                self._ids, self._base_size, self._overflow, self._parents, self._partners,
+                self._child_offsets, self._child_targets, self._child_overlay, self.version,
+            )
+        return self._pinned
+
+
+    def marry(self, user_id:int, partner_id:int):
+        '''
+        Sets two users as each other's partner
+        '''
+
+        self._unshare()
+        self.version += 1
+        user_index = self.index(user_id, create=True)
+        partner_index = self.index(partner_id, create=True)
+        self._set_partner(user_index, partner_index)
+        self._set_partner(partner_index, user_index)
+        self.components.union(user_index, partner_index)
+
+
+    def divorce(self, user_id:int):
+        '''
+        Removes the partner of a user (and that user from their partner)
+        '''
+
+        self._unshare()
+        self.version += 1
+        user_index = self.index(user_id)
+        if user_index is None:
+            return
+        partner_index = self._partners[user_index]
+        self._set_partner(user_index, NO_USER)
+        if partner_index != NO_USER and self._partners[partner_index] == user_index:
+            self._set_partner(partner_index, NO_USER)
+        if partner_index != NO_USER:
+            self.components.relabel(user_index, partner_index)
+
+
+    def add_child(self, parent_id:int, child_id:int):
+        '''
+        Sets a user as the parent of another, removing any previous parent
+        '''
+
+        self._unshare()
+        self.version += 1
+        parent_index = self.index(parent_id, create=True)
+        child_index = self.index(child_id, create=True)
+        old_parent = self._parents[child_index]
+        if old_parent != NO_USER:
+            self._writable_children(old_parent).remove(child_index)
+            self._set_parent(child_index, NO_USER)
+            self.components.relabel(old_parent, child_index)
+            self.subtrees.detached(child_index, old_parent)
+        self._set_parent(child_index, parent_index)
+        self._writable_children(parent_index).append(child_index)
+        self.components.union(parent_index, child_index)
+        self.ancestry.attached(child_index)
+        self.subtrees.attached(child_index)
+
+
+    def remove_child(self, parent_id:int, child_id:int):
+        '''
+        Removes the link between a parent and their child
+        '''
+
+        self._unshare()
+        self.version += 1
+        parent_index = self.index(parent_id)
+        child_index = self.index(child_id)
+        if parent_index is None or child_index is None:
+            return
+        if self._parents[child_index] != parent_index:
+            return
+        self._set_parent(child_index, NO_USER)
+        self._writable_children(parent_index).remove(child_index)
+        self.components.relabel(parent_index, child_index)
+        self.subtrees.detached(child_index, parent_index)
+        self.ancestry.detached(child_index)
+
+
+    def destroy(self, user_id:int):
+        '''
+        Removes every link to and from a given user
+        Their index stays reserved until the next compaction
+        '''
+
+        self._unshare()
+        self.version += 1
+        index = self.index(user_id)
+        if index is None:
+            return
+        neighbours = self._cut(index)
+        self.components.relabel(index, *neighbours)
+
+
+    def destroy_many(self, user_ids):
+        '''
+        Removes every link to and from each of the given users, relabelling the
+        components they were in once at the end rather than once per user
+        '''
+
+        self._unshare()
+        self.version += 1
+        touched = []
+        for user_id in user_ids:
+            index = self.index(user_id)
+            if index is None:
+                continue
+            touched.append(index)
+            touched.extend(self._cut(index))
+        if touched:
+            self.components.relabel(*touched)
+
+
+    def _cut(self, index:int) -> list:
+        '''
+        Removes every link to and from a user index, keeping the ancestry and subtree
+        indexes up - the components are left for the caller to relabel
+
+        Returns:
+            The indexes of everyone who was linked to them
+        '''
+
+        neighbours = self.neighbour_indexes(index)
+        partner_index = self._partners[index]
+        self._set_partner(index, NO_USER)
+        if partner_index != NO_USER and self._partners[partner_index] == index:
+            self._set_partner(partner_index, NO_USER)
+        parent_index = self._parents[index]
+        if parent_index != NO_USER:
+            self._set_parent(index, NO_USER)
+            self._writable_children(parent_index).remove(index)
+        children = self.children_indexes(index)
+        for child_index in children:
+            self._set_parent(child_index, NO_USER)
+        self._child_overlay[index] = []
+        self._owned_overlay.add(index)
+        if parent_index != NO_USER:
+            self.subtrees.detached(index, parent_index)
+        for child_index in children:
+            self.subtrees.detached(child_index, index)
+        for child_index in (index, *children):
+            self.ancestry.detached(child_index)
+        return neighbours
+
+
+    def load(self, partnerships, parents):
+        '''
+        Replaces the whole store with the given links
+
+        Params:
+            partnerships: iterable
+                (user_id, partner_id) pairs - each marriage may be given once or in both directions
+            parents: iterable
+                (child_id, parent_id) pairs
+        '''
+
+        partnerships = list(partnerships)
+        parents = list(parents)
+
+        # Give everyone a sorted dense index
+        all_ids = set()
+        for user_id, partner_id in partnerships:
+            all_ids.add(user_id)
+            all_ids.add(partner_id)
+        for child_id, parent_id in parents:
+            all_ids.add(child_id)
+            all_ids.add(parent_id)
+        ids = array('q', sorted(all_ids))
+        del all_ids
+        size = len(ids)
+
+        # Fill in the single-value links
+        partner_array = array('q', [NO_USER]) * size
+        parent_array = array('q', [NO_USER]) * size
+        for user_id, partner_id in partnerships:
+            user_index = bisect_left(ids, user_id)
+            partner_index = bisect_left(ids, partner_id)
+            partner_array[user_index] = partner_index
+            partner_array[partner_index] = user_index
+        parent_pairs = array('q')
+        for child_id, parent_id in parents:
+            child_index = bisect_left(ids, child_id)
+            parent_index = bisect_left(ids, parent_id)
+            parent_array[child_index] = parent_index
+            parent_pairs.append(parent_index)
+            parent_pairs.append(child_index)
+
+        # Build the CSR child layout, keeping the row order for each parent
+        offsets = array('q', [0]) * (size + 1)
+        for position in range(0, len(parent_pairs), 2):
+            offsets[parent_pairs[position] + 1] += 1
+        for position in range(size):
+            offsets[position + 1] += offsets[position]
+        targets = array('q', [NO_USER]) * offsets[size]
+        fill = array('q', offsets)
+        for position in range(0, len(parent_pairs), 2):
+            parent_index = parent_pairs[position]
+            targets[fill[parent_index]] = parent_pairs[position + 1]
+            fill[parent_index] += 1
+
+        self._ids = ids
+        self._base_size = size
+        self._overflow = {}
+        self._parents = parent_array
+        self._partners = partner_array
+        self._child_offsets = offsets
+        self._child_targets = targets
+        self._child_overlay = {}
+        self._pinned = None
+        self._owned_overlay = set()
+        self._link_changes = {}
+        self.version += 1
+        self.base_version += 1
+        self.components.rebuild()
+        self.ancestry.rebuild()
+        self.subtrees.rebuild()
+
+
+    def links(self) -> tuple:
+        '''
+        Gives every link in the store, in the form that `load` takes them
+        Children are kept in the order their parent has them
+
+        Returns:
+            (partnerships, parents) - lists of (user_id, partner_id) and (child_id, parent_id)
+        '''
+
+        partnerships = []
+        parents = []
+        for index, user_id in enumerate(self._ids):
+            partner_index = self._partners[index]
+            if partner_index != NO_USER and index < partner_index:
+                partnerships.append((user_id, self._ids[partner_index]))
+            for child_index in self.children_indexes(index):
+                parents.append((self._ids[child_index], user_id))
+        return partnerships, parents
+
+
+    def compact(self):
+        '''
+        Rebuilds the store from its current links, dropping anyone who's empty
+        This changes every index, so anything holding one needs rebuilding afterwards
+        '''
+
+        self.load(*self.links())
+
+
+    def needs_compacting(self) -> bool:
+        '''
+        Whether or not enough users have been added or had their children changed since
+        the last compaction that they're worth folding back into the sorted base
+        '''
+
+        return len(self._overflow) + len(self._child_overlay) > max(self._base_size // 16, 1000)
+
+
+    def add_links(self, partnerships, parents):
+        '''
+        Adds a batch of links at once (eg from an import)
+        A batch that's small next to the store goes through `marry` and `add_child` so
+        that the indexes are kept up as they go; a bigger one is merged with the current
+        links and loaded in one go, since rebuilding is cheaper than that many updates.
+        Anything that loads changes every index, as with `compact`.
+
+        Params:
+            partnerships: iterable
+                (user_id, partner_id) pairs
+            parents: iterable
+                (child_id, parent_id) pairs
+        '''
+
+        partnerships = list(partnerships)
+        parents = list(parents)
+        if len(partnerships) + len(parents) < max(len(self) // 8, 1000):
+            for user_id, partner_id in partnerships:
+                self.marry(user_id, partner_id)
+            for child_id, parent_id in parents:
+                self.add_child(parent_id, child_id)
+            return
+        current_partnerships, current_parents = self.links()
+        self.load(current_partnerships + partnerships, current_parents + parents)
+
+
+    def replace_links(self, user_ids, partnerships, parents):
+        '''
+        Sets the partner and parent of each of the given users to exactly what's in the
+        given links, eg the database rows of users who've changed since a cache file was
+        written. This goes through `marry`, `add_child` etc so that the indexes are kept up.
+
+        Params:
+            user_ids: iterable
+                Everyone whose links are being replaced
+            partnerships: iterable
+                (user_id, partner_id) pairs for whoever of them has a partner
+            parents: iterable
+                (child_id, parent_id) pairs for whoever of them has a parent
+        '''
+
+        user_ids = set(user_ids)
+        partners = {i: o for i, o in partnerships if i in user_ids}
+        parent_ids = {i: o for i, o in parents if i in user_ids}
+
+        # Divorces first, so that nobody's married to two people part way through
+        for user_id in user_ids:
+            partner_id = self.partner_of(user_id)
+            if partner_id is not None and partner_id != partners.get(user_id):
+                self.divorce(user_id)
+        for user_id, partner_id in partners.items():
+            if self.partner_of(user_id) != partner_id:
+                self.marry(user_id, partner_id)
+        for user_id in user_ids:
+            parent_id = self.parent_of(user_id)
+            if parent_id == parent_ids.get(user_id):
+                continue
+            if user_id in parent_ids:
+                self.add_child(parent_ids[user_id], user_id)
+            else:
+                self.remove_child(parent_id, user_id)
+
+
+    def dump(self) -> dict:
+        '''
+        Gives the whole store as a dict of arrays and ints, which `restore` can put back
+        without recalculating anything. The graph's own arrays are handed out as a pinned
+        version rather than copied (see `pin`) and the indexes are copied, so the dump can
+        be written out from another thread while the store carries on changing.
+        '''
+
+        version = self.pin()
+        overlay_indexes = array('q', sorted(version._child_overlay))
+        overlay_offsets = array('q', [0])
+        overlay_targets = array('q')
+        for index in overlay_indexes:
+            overlay_targets.extend(version._child_overlay[index])
+            overlay_offsets.append(len(overlay_targets))
+        data = {
+            'version': self.version,
+            'base_version': self.base_version,
+            'base_size': version._base_size,
+            'ids': version._ids,
+            'parents': version._parents,
+            'partners': version._partners,
+            'child_offsets': version._child_offsets,
+            'child_targets': version._child_targets,
+            'overlay_indexes': overlay_indexes,
+            'overlay_offsets': overlay_offsets,
+            'overlay_targets': overlay_targets,
+        }
+        for name, index in (('components', self.components), ('ancestry', self.ancestry), ('subtrees', self.subtrees)):
+            data.update({f'{name}.{i}': o for i, o in index.dump().items()})
+        return data
+
+
+    def restore(self, data:dict):
+        '''
+        Replaces the whole store with one given by `dump`
+        The store's compacted afterwards if it needs it, since otherwise anyone added
+        before the dump was taken would carry on in `_overflow` and `_child_overlay`
+        through every restart that restores it
+        '''
+
+        ids = data['ids']
+        base_size = data['base_size']
+        self._ids = ids
+        self._base_size = base_size
+        self._overflow = {ids[i]: i for i in range(base_size, len(ids))}
+        self._parents = data['parents']
+        self._partners = data['partners']
+        self._child_offsets = data['child_offsets']
+        self._child_targets = data['child_targets']
+        offsets, targets = data['overlay_offsets'], data['overlay_targets']
+        self._child_overlay = {o: list(targets[offsets[i]:offsets[i + 1]]) for i, o in enumerate(data['overlay_indexes'])}
+        self._pinned = None
+        self._owned_overlay = set(self._child_overlay)
+        self._link_changes = {}
+        self.version = max(self.version, data['version']) + 1
+        self.base_version = max(self.base_version, data['base_version']) + 1
+        for name, index in (('components', self.components), ('ancestry', self.ancestry), ('subtrees', self.subtrees)):
+            prefix = f'{name}.'
+            index.restore({i[len(prefix):]: o for i, o in data.items() if i.startswith(prefix)})
+        if self.needs_compacting():
+            self.compact()
+
+
+    def memory_usage(self) -> int:
+        '''
+        Gives the approximate number of bytes used by the store
+        '''
+
+        total = sum(getsizeof(i) for i in (
+            self._ids, self._parents, self._partners, self._child_offsets,
+            self._child_targets, self._overflow, self._child_overlay, self._link_changes,
+            self.components._roots, self.components._sizes, self.components._versions,
+            self.ancestry._depth, *self.ancestry._up,
+            self.subtrees._counts, self.subtrees._heights, self.subtrees._roots,
+        ))
+        total += sum(getsizeof(i) for i in self._child_overlay.values())
+        return total
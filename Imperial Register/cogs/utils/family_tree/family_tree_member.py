@@ -1,443 +1,619 @@
-from re import compile
-from random import choice, choices
-from string import ascii_letters
-
-from discord import User, File, Guild
-from unidecode import unidecode
-
-from cogs.utils.customised_tree_user import CustomisedTreeUser
-
-
-def get_random_string(length:int=10):
-    return ''.join(choices(ascii_letters, k=length))
-
-
-class FamilyTreeMember(object):
-    '''
-    A family member to go in the tree
-
-    Params:
-        discord_id: int 
-        children: list[int]
-        parent_id: int
-        partner_id: int
-    '''
-
-    all_users = {None: None}  # id: FamilyTreeMember
-    NAME_SUBSTITUTION = compile(r'[^\x00-\x7F\x80-\xFF\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]|\"|\(|\)')
-    INVISIBLE = '[shape=circle, label="", height=0.001, width=0.001]'  # For the DOT script
-
-    # Set up a bunch of substitutions for the relation generator
-    # CHILD_TO_GRANDCHILD = compile(r"child's child")  # grandchild
-    # GRANDCHILD_TO_GREAT = compile(r"grandchild's child")  # great grandchild
-    # PARENT_TO_GRANDPARENT = compile(r"parent's parent")  # grandparent
-    # GRANDPARENT_TO_GREAT = compile(r"grandparent's parent")  # great grandparent
-    # CHILD_TO_UNCLE
-    # CHILD_TO_COUSIN = compile(r"grandparent's grandchild")  # cousin
-    # CHILD_TO_SIBLING = compile(r"parent's child")  # sibling
-    # CHILD_TO_NEPHEW = compile(r"sibling's child")  # nephew
-    # CHILD_TO_REMOVED_COUSIN
-
-
-    def __init__(self, discord_id:int, children:list, parent_id:int, partner_id:int):
-        self.id = discord_id
-        self._children = children
-        self._parent = parent_id
-        self._partner = partner_id
-        self.all_users[self.id] = self
-
-    
-    def __repr__(self):
-        return f"FamilyTreeMember[{self.id}]"
-
-
-    @property
-    def partner(self):
-        return self.get(self._partner)
-
-
-    @property
-    def parent(self):
-        return self.get(self._parent)
-
-
-    @property
-    def children(self):
-        return [self.get(i) for i in self._children]
-
-
-    @property
-    def is_empty(self):
-        return len(self.children) == 0 and self.parent == None and self.partner == None
-
-
-    def destroy(self):
-        if self.partner:
-            self.partner._partner = None 
-        if self.parent:
-            self.parent._children.remove(self.id)
-        for child in self.children:
-            child._parent = None 
-        del self.all_users[self.id]
-
-
-    def get_name(self, bot):
-        x = self.NAME_SUBSTITUTION.sub("_", unidecode(str(bot.get_user(self.id))))
-        if len(x) <= 5:
-            x = self.NAME_SUBSTITUTION.sub("_", str(bot.get_user(self.id)))
-        return x
-
-
-    @classmethod
-    def remove_blank_profiles(cls):
-        '''
-        Removes blank/useless profiles from the cache
-        '''
-
-        for discord_id, tree_member in cls.all_users.items():
-            if tree_member == None:
-                continue
-            if tree_member.is_empty:
-                del cls.all_users[discord_id]
-
-
-    @classmethod
-    def get(cls, user_id:User):
-        '''
-        Gets a FamilyTreeMember object for the given user
-        '''
-
-        try:
-            return cls.all_users[user_id]
-        except KeyError:
-            x = cls(user_id, [], None, None)
-            cls.all_users[user_id] = x
-            return x
-
-
-    def span(self, people_list:list=None, add_parent:bool=False, expand_upwards:bool=False, guild:Guild=None) -> list:
-        '''
-        Gets a list of every user related to this one
-        If "add_parent" and "expand_upwards" are True, then it should add every user in a given tree,
-        even if they're related through marriage's parents etc
-
-        Params:
-            people_list: list 
-                The list of users who are currently in the tree (so as to avoid recursion)
-            add_parent: bool = False
-                Whether or not to add the parent of this user to the people list
-            expand_upwards: bool = False
-                Whether or not to expand upwards in the tree
-            guild: Guild = None
-                If added, span will return users only if they're in the given guild
-
-        Returns:
-            A list of all people on the family for this user, in no particular order
-        '''
-
-        # Don't add yourself again
-        if people_list == None:
-            people_list = []
-        if self in people_list:
-            return people_list
-
-        # Filter out non-guild members
-        if guild:
-            if not guild.get_member(self.id):
-                return people_list
-
-        people_list.append(self)
-
-        # Add your parent
-        if expand_upwards and add_parent and self.parent:
-            people_list = self.parent.span(people_list, add_parent=True, expand_upwards=expand_upwards, guild=guild)
-
-        # Add your children
-        if self.children:
-            for child in self.children:
-                people_list = child.span(people_list, add_parent=False, expand_upwards=expand_upwards, guild=guild)
-
-        # Add your partner
-        if self.partner:
-            people_list = self.partner.span(people_list, add_parent=True, expand_upwards=expand_upwards, guild=guild)
-
-        # Remove dupes, should they be in there
-        return people_list
-
-
-    def get_root(self, guild:Guild=None):
-        '''
-        Expands backwards into the tree up to a root user
-        Only goes up one line of family so it cannot add your spouse's parents etc
-
-        Params: 
-            guild: Guild = None
-                If you want to get users only from a given guild, supply a guild here
-        '''
-
-        root_user = self
-        while True:
-            if guild:
-                if root_user.parent and guild.get_member(root_user.parent.id):
-                    root_user = root_user.parent
-                elif root_user.partner and guild.get_member(root_user.partner.id) and root_user.partner.parent and guild.get_member(root_user.partner.parent.id):
-                    root_user = root_user.partner.parent
-                else:
-                    break
-            else:
-                if root_user.parent:
-                    root_user = root_user.parent
-                elif root_user.partner and root_user.partner.parent :
-                    root_user = root_user.partner.parent
-                else:
-                    break
-        return root_user
-
-    
-    # def get_relation(self, other, working_relation:list=None, added_already:list=None) -> str:
-    #     '''
-    #     Gets your relation to the other given user or None
-    #     '''
-
-    #     if working_relation == None:
-    #         working_relation = []
-    #     if added_already == None:
-    #         added_already = []
-    #     if self in added_already:
-    #         return None
-    #     if other == self:
-    #         ret_string = "'s ".join(working_relation)
-
-    #     added_already.append(self)
-
-    #     if self.parent and self.parent not in added_already:
-    #         x = self.parent.get_relation(other, working_relation=working_relation+['parent'], added_already=added_already)
-    #         if x: return x 
-    #     if self.partner and self.parent not in added_already:
-    #         x = self.partner.get_relation(other, working_relation=working_relation+['partner'], added_already=added_already)
-    #         if x: return x 
-    #     if self.children:
-    #         for i in [o for o in self.children if i not in added_already]:
-    #             x = self.partner.get_relation(other, working_relation=working_relation+['child'], added_already=added_already)
-    #             if x: return x 
-    #     return None
-
-
-    def generate_gedcom_script(self, bot) -> str:
-        '''
-        Gives you the INDI and FAM gedcom strings for this family tree
-        Includes their spouse, if they have one, and any children
-        Small bit of redundancy: a family will be added twice if they have a spouse. 
-        '''
-
-        '''
-        Example family:
-        0 @I1@ INDI
-            1 NAME John /Smith/
-            1 FAMS @F1@
-        0 @F1@ FAM
-            1 HUSB @I1@
-            1 WIFE @I2@
-            1 CHIL @I3@
-        '''
-
-        gedcom_text = []
-        family_id_cache = {}  # id: family count
-        full_family = self.span(add_parent=True, expand_upwards=True)
-
-        for i in full_family:
-            working_text = [
-                f'0 @I{i.tree_id}@ INDI',
-                f'\t1 NAME {i.get_name(bot)}'
-            ]
-
-            # If you have a parent, get added to their family
-            if i.parent:
-                if i.parent.id in family_id_cache:
-                    working_text.append(f'\t1 FAMC @F{family_id_cache[i.parent.id]}@')
-                elif i.parent.partner and i.parent.partner.id in family_id_cache:
-                    working_text.append(f'\t1 FAMC @F{family_id_cache[i.parent.partner.id]}@')
-                else:
-                    working_text.append(f'\t1 FAMC @F{i.parent.tree_id}@')
-
-            # If you have children or a partner, generate a family
-            if i.children or i.partner:
-                current_text = '\n'.join(gedcom_text)
-
-                # See if you need to make a new family or be added to one already made
-                try:
-                    insert_location = gedcom_text.index(f'\t1 HUSB @I{i.tree_id}@')
-                    # Above will throw error if this user is not in a tree already
-
-                    working_text.append(f'\t1 FAMS @F{family_id_cache[i.partner.id]}@')
-                    family_id_cache[i.id] = i.partner.tree_id
-                    for c in i.children:
-                        gedcom_text.insert(insert_location, f'\t1 CHIL @I{c.tree_id}@')
-                except ValueError:
-                    family_id_cache[i.id] = i.tree_id
-                    working_text.append(f'\t1 FAMS @F{i.tree_id}@')
-                    working_text.append(f'0 @F{i.tree_id}@ FAM')
-                    working_text.append(f'\t1 WIFE @I{i.tree_id}@')
-                    if i.partner:
-                        working_text.append(f'\t1 HUSB @I{i.partner.tree_id}@')
-                    for c in i.children:
-                        working_text.append(f'\t1 CHIL @I{c.tree_id}@')
-
-            gedcom_text.extend(working_text)
-        x = '0 HEAD\n\t1 GEDC\n\t\t2 VERS 5.5\n\t\t2 FORM LINEAGE-LINKED\n\t1 CHAR UNICODE\n' + '\n'.join(gedcom_text) + '\n0 TRLR'
-        return x
-
-
-    def generational_span(self, people_dict:dict=None, depth:int=0, add_parent:bool=False, expand_upwards:bool=False, guild:Guild=None) -> dict:
-        '''
-        Gets a list of every user related to this one
-        If "add_parent" and "expand_upwards" are True, then it should add every user in a given tree,
-        even if they're related through marriage's parents etc
-
-        Params:
-            people_dict: dict 
-                The dict of users who are currently in the tree (so as to avoid recursion)
-            depth: int = 0
-                The current depth of the span
-            add_parent: bool = False
-                Whether or not to add the parent of this user to the people list
-            expand_upwards: bool = False
-                Whether or not to expand upwards in the tree
-            guild: Guild = None
-                If added, span will return users only if they're in the given guild
-
-        Returns:
-            A list of all people on the family for this user, in no particular order
-        '''
-
-        # Don't add yourself again
-        if people_dict == None:
-            people_dict = {}
-        if self in people_dict.get(depth, list()):
-            return people_dict
-
-        # Filter out non-guild members
-        if guild:
-            if not guild.get_member(self.id):
-                return people_dict
-
-        # Add to dict
-        x = people_dict.get(depth, list())
-        x.append(self)
-        people_dict[depth] = x
-
-        # Add your parent
-        if expand_upwards and add_parent and self.parent:
-            people_dict = self.parent.generational_span(people_dict, depth=depth-1, add_parent=True, expand_upwards=expand_upwards, guild=guild)
-
-        # Add your children
-        if self.children:
-            for child in self.children:
-                people_dict = child.generational_span(people_dict, depth=depth+1, add_parent=False, expand_upwards=expand_upwards, guild=guild)
-
-        # Add your partner
-        if self.partner:
-            people_dict = self.partner.generational_span(people_dict, depth=depth, add_parent=True, expand_upwards=expand_upwards, guild=guild)
-
-        # Remove dupes, should they be in there
-        return people_dict
-
-
-    def to_dot_script(self, bot, guild:Guild=None) -> str:
-        '''
-        Gives you a string of the current family tree that will go through Family
-
-        Params:
-            bot: Bot
-                Used solely to get the names of people
-            guild: Guild = None
-                If set to none, does nothing of interest. If set to a guild, will only add
-                members to the tree that are in the given guild
-        '''
-
-        # Get the generation spanning tree
-        ctu = CustomisedTreeUser.get(self.id)
-        root_user = self.get_root(guild=guild)
-        gen_span = root_user.generational_span(guild=guild)
-        my_depth = None
-        for depth, l in gen_span.items():
-            if self in l:
-                my_depth = depth
-                break
-        if self.partner and self.partner not in gen_span.get(my_depth, list()):
-            x = gen_span.get(my_depth, list())
-            x.append(self.partner)
-            gen_span[my_depth] = x
-        if self.parent and self.parent not in gen_span.get(my_depth-1, list()):
-            x = gen_span.get(my_depth-1, list())
-            x.append(self.parent)
-            gen_span[my_depth-1] = x
-
-        # Add the labels for each user
-        all_text = [
-            'digraph {',
-            f"\tnode [shape=box, fontcolor={ctu.hex['font']}, color={ctu.hex['edge']}, fillcolor={ctu.hex['node']}, style=filled];",
-            f"\tedge [dir=none, color={ctu.hex['edge']}];",
-            f"\tbgcolor={ctu.hex['background']}",
-            '',
-        ]
-        all_users = []
-        user_parent_tree = {}  # Parent: random_string
-        for generation in gen_span.values():
-            for i in generation:
-                all_users.append(i)
-                if i == self:
-                    all_text.append(f'\t{i.id}[label="{i.get_name(bot)}", fillcolor={ctu.hex["highlighted_node"]}, fontcolor={ctu.hex["highlighted_font"]}];')
-                else:
-                    all_text.append(f'\t{i.id}[label="{i.get_name(bot)}"];')
-        
-        # Order the generations
-        generation_numbers = sorted(list(gen_span.keys()))
-
-        # Go through each generation's users
-        for generation_number in generation_numbers:
-            generation = gen_span.get(generation_number)
-
-            # Add each user and their spouse
-            added_already = []
-            all_text.append("\t{ rank=same;")
-            previous_person = None
-            for person in generation:
-                if person in added_already:
-                    continue
-                user_parent_tree[person] = person.id
-                added_already.append(person)
-                if previous_person:
-                    all_text.append(f"\t\t{previous_person.id} -> {person.id} [style=invis];")
-                if person.partner and person.partner in generation:
-                    user_parent_tree[person.partner] = user_parent_tree[person] = get_random_string()
-                    all_text.append(f"\t\t{person.id} -> {user_parent_tree[person]} -> {person.partner.id};")
-                    all_text.append(f"\t\t{user_parent_tree[person]} {self.INVISIBLE}")
-                    added_already.append(person.partner)
-                    previous_person = person.partner
-                else:
-                    all_text.append(f"\t\t{person.id};")
-                    previous_person = person
-            all_text.append("\t}")
-
-            # Add the connecting node from parent to child
-            all_text.append("\t{")
-            for person in generation:
-                if person.children and any([i in all_users for i in person.children]):
-                    all_text.append(f"\t\th{user_parent_tree[person]} {self.INVISIBLE};")
-            all_text.append("\t}")
-
-            # Add the lines from parent to node to child
-            added_already.clear()
-            for person in generation:
-                if person.children and any([i in all_users for i in person.children]):
-                    if user_parent_tree[person] in added_already:
-                        pass
-                    else:
-                        all_text.append(f"\t\t{user_parent_tree[person]} -> h{user_parent_tree[person]};")
-                        added_already.append(user_parent_tree[person])
-                    for child in [i for i in person.children if i in all_users]:
-                        all_text.append(f"\t\th{user_parent_tree[person]} -> {child.id};")
-        all_text.append("}")
-
-        return '\n'.join(all_text)
+from threading import Event
+from io import TextIOWrapper
+from gzip import GzipFile
+
+from discord import User, File, Guild
+
+from cogs.utils.customised_tree_user import CustomisedTreeUser
+from cogs.utils.guild_members import GuildMembers
+from cogs.utils.family_tree.constants import NO_USER
+from cogs.utils.family_tree.family_graph import FamilyGraph
+from cogs.utils.family_tree.traversal import depth_first, find_root, check_cancelled
+from cogs.utils.family_tree.relationships import find_relation
+
+
+class FamilyTreeMember(object):
+    '''
+    A view onto a single user in the family graph
+    These are made on demand and hold nothing but the user's ID - every link
+    is read from (and written to) FamilyTreeMember.graph, or read from a pinned
+    version of it if one is given (see `pinned`)
+
+    Params:
+        discord_id: int 
+        view: GraphView = None
+            A pinned version of the graph to read links from instead
+        member_filter: callable = None
+            A guild's "include" function, worked out before the view was handed to another thread
+    '''
+
+    __slots__ = ('id', 'view', 'member_filter')
+
+    graph = FamilyGraph()
+    INVISIBLE = '[shape=circle, label="", height=0.001, width=0.001]'  # For the DOT script
+
+
+    def __init__(self, discord_id:int, view=None, member_filter=None):
+        self.id = discord_id
+        self.view = view
+        self.member_filter = member_filter
+
+    
+    def __repr__(self):
+        return f"FamilyTreeMember[{self.id}]"
+
+
+    def __eq__(self, other):
+        return isinstance(other, FamilyTreeMember) and other.id == self.id
+
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+    @property
+    def _graph(self):
+        '''
+        The graph that this user's links are read from
+        '''
+
+        return self.graph if self.view is None else self.view
+
+
+    def _relative(self, user_id:int):
+        '''
+        Gets a FamilyTreeMember for someone else, reading from the same graph as this one
+        '''
+
+        if user_id == None:
+            return None
+        return FamilyTreeMember(user_id, self.view, self.member_filter)
+
+
+    def pinned(self, guild:Guild=None):
+        '''
+        Gives this user over a pinned version of the graph, which can be walked from
+        another thread without changes made in the meantime showing up part way through
+
+        The guild the walk will be limited to has to be given here, so that its members
+        are picked out of the family now - the component index and the guild membership
+        index are only safe to read on the event loop
+        '''
+
+        return FamilyTreeMember(self.id, self.graph.pin(), self._guild_filter(guild))
+
+
+    @property
+    def _partner(self):
+        return self._graph.partner_of(self.id)
+
+
+    @property
+    def _parent(self):
+        return self._graph.parent_of(self.id)
+
+
+    @property
+    def _children(self):
+        return self._graph.children_of(self.id)
+
+
+    @property
+    def partner(self):
+        return self._relative(self._partner)
+
+
+    @property
+    def parent(self):
+        return self._relative(self._parent)
+
+
+    @property
+    def children(self):
+        return [self._relative(i) for i in self._children]
+
+
+    @property
+    def is_empty(self):
+        index = self._graph.index(self.id)
+        return index is None or self._graph.is_empty(index)
+
+
+    @property
+    def family_size(self):
+        return self.graph.components.family_size(self.id)
+
+
+    @property
+    def descendant_count(self):
+        index = self.graph.index(self.id)
+        return 0 if index is None else self.graph.subtrees.descendant_count(index)
+
+
+    @property
+    def descendant_depth(self):
+        index = self.graph.index(self.id)
+        return 0 if index is None else self.graph.subtrees.descendant_depth(index)
+
+
+    @property
+    def generation(self):
+        index = self.graph.index(self.id)
+        return 0 if index is None else self.graph.subtrees.generation(index)
+
+
+    @property
+    def tree_size_estimate(self):
+        '''
+        Roughly how many people would be put into this user's tree, without walking it
+        The tree is drawn from their eldest ancestor down, so that's everyone below
+        the root plus (at most) a partner for each, capped by the size of the family
+        '''
+
+        index = self.graph.index(self.id)
+        if index is None:
+            return 1
+        root_index = self.graph.subtrees.root(index)
+        below_root = self.graph.subtrees.descendant_count(root_index) + 1
+        return min(self.family_size, below_root * 2 + 2)
+
+
+    @property
+    def render_cost_estimate(self):
+        '''
+        Gives a rough (nodes, edges) count for this user's tree
+        Every partnership and every parent-child link is drawn as two edges through
+        an invisible node, and there's roughly one of those links per user
+        '''
+
+        nodes = self.tree_size_estimate
+        return nodes, nodes * 2
+
+
+    @property
+    def family_version(self):
+        return self.graph.components.version(self.id)
+
+
+    def is_family(self, user_id:int) -> bool:
+        '''
+        Whether or not the given user is anywhere in this user's family
+        '''
+
+        return self.graph.components.same_family(self.id, user_id)
+
+
+    def destroy(self):
+        self.graph.destroy(self.id)
+
+
+    def get_name(self, bot):
+        '''
+        Gives the sanitised label for this user that goes into DOT scripts and GEDCOM files
+        '''
+
+        return bot.name_cache.label(self.id)
+
+
+    @classmethod
+    def remove_blank_profiles(cls):
+        '''
+        Removes blank/useless profiles from the cache
+        '''
+
+        cls.graph.compact()
+
+
+    @classmethod
+    def get(cls, user_id:User):
+        '''
+        Gets a FamilyTreeMember object for the given user
+        '''
+
+        if user_id == None:
+            return None
+        return cls(user_id)
+
+
+    def _walk_indexes(self, guild:Guild=None, **kwargs):
+        '''
+        Walks this user's family with traversal.depth_first, yielding (index, depth) pairs
+        Users who aren't in the graph at all are just yielded on their own, with an index of None
+        '''
+
+        include = self._guild_filter(guild)
+        graph = self._graph
+        index = graph.index(self.id)
+        if index is None:
+            if include is None or include(self.id):
+                yield None, 0
+            return
+        yield from depth_first(graph, index, include=include, **kwargs)
+
+
+    def _walk(self, guild:Guild=None, **kwargs):
+        '''
+        Walks this user's family, yielding (FamilyTreeMember, depth) pairs
+        '''
+
+        graph = self._graph
+        for index, depth in self._walk_indexes(guild, **kwargs):
+            if index is None:
+                yield self, depth
+            else:
+                yield self._relative(graph.user_id(index)), depth
+
+
+    def _guild_filter(self, guild:Guild=None):
+        '''
+        Gives a traversal "include" function for the members of a guild, or None
+        Uses the guild membership index where it can, so that each check is a set lookup
+        rather than a trip through the member cache - but not from a pinned view, which
+        uses whatever was worked out when it was pinned
+        '''
+
+        if guild is None:
+            return None
+        if self.member_filter is not None:
+            return self.member_filter
+        if self.view is None:
+            members = GuildMembers.family_in_guild(self.graph, self.id, guild.id)
+            if members is not None:
+                return members.__contains__
+        return lambda user_id: guild.get_member(user_id) is not None
+
+
+    def span(self, people_list:list=None, add_parent:bool=False, expand_upwards:bool=False, guild:Guild=None, max_depth:int=None, max_nodes:int=None, cancel:Event=None) -> list:
+        '''
+        Gets a list of every user related to this one
+        If "add_parent" and "expand_upwards" are True, then it should add every user in a given tree,
+        even if they're related through marriage's parents etc
+
+        Params:
+            people_list: list 
+                Users who are already in the tree, and who won't be walked again
+            add_parent: bool = False
+                Whether or not to add the parent of this user to the people list
+            expand_upwards: bool = False
+                Whether or not to expand upwards in the tree
+            guild: Guild = None
+                If added, span will return users only if they're in the given guild
+            max_depth: int = None
+                The most generations away from this user that will be added
+            max_nodes: int = None
+                The most users that will be added before TraversalLimitReached is raised
+            cancel: Event = None
+                When set, the span raises TraversalCancelled
+
+        Returns:
+            A list of all people on the family for this user, in no particular order
+        '''
+
+        if people_list == None:
+            people_list = []
+        if self in people_list:
+            return people_list
+        visited = {self._graph.index(i.id) for i in people_list} - {None}
+        for person, _ in self._walk(guild, add_parent=add_parent, expand_upwards=expand_upwards, max_depth=max_depth, max_nodes=max_nodes, cancel=cancel, visited=visited):
+            people_list.append(person)
+        return people_list
+
+
+    def tree_user_ids(self, guild:Guild=None, cancel:Event=None) -> set:
+        '''
+        Gives the Discord IDs of everyone who could be drawn in this user's tree (or
+        written to their GEDCOM file, if no guild is given), so that all of their
+        names can be looked up in one go beforehand
+        '''
+
+        graph = self._graph
+        user_ids = {graph.user_id(i) for i, _ in self._walk_indexes(add_parent=True, expand_upwards=True, cancel=cancel) if i is not None}
+        include = self._guild_filter(guild)
+        if include is not None:
+            user_ids = {i for i in user_ids if include(i)}
+        user_ids.update(i for i in (self.id, self._partner, self._parent) if i is not None)
+        return user_ids
+
+
+    def get_root(self, guild:Guild=None, cancel:Event=None):
+        '''
+        Expands backwards into the tree up to a root user
+        Only goes up one line of family so it cannot add your spouse's parents etc
+
+        Params: 
+            guild: Guild = None
+                If you want to get users only from a given guild, supply a guild here
+            cancel: Event = None
+                When set, the search raises TraversalCancelled
+        '''
+
+        graph = self._graph
+        index = graph.index(self.id)
+        if index is None:
+            return self
+        root_index = find_root(graph, index, include=self._guild_filter(guild), cancel=cancel)
+        return self._relative(graph.user_id(root_index))
+
+    
+    def get_relation(self, other) -> str:
+        '''
+        Gives what the other user is to this one (eg "parent-in-law", "second cousin once removed"),
+        or None if they aren't related at all
+
+        Params:
+            other: FamilyTreeMember
+                The user whose relation to this one should be described
+        '''
+
+        return find_relation(self.graph, self.id, other.id)
+
+
+    def generate_gedcom_script(self, bot, cancel:Event=None):
+        '''
+        Yields the lines of a GEDCOM 5.5.1 file for this user's whole family, in one pass
+        (5.5.1 rather than 5.5, since 5.5 has no UTF-8 and names can be anything)
+
+        Everyone gets an INDI record, and everyone with a partner or children is put into
+        a FAM record along with them. A couple's family is written out when the walk
+        reaches whichever of the two has the lower index, and the @I@/@F@ IDs are given
+        out from dicts as they're first needed, so references can come before the records
+        they point at and nothing already yielded needs going back to.
+
+        Params:
+            bot: Bot
+                Used solely to get the names of people
+            cancel: Event = None
+                When set, the walk stops and raises TraversalCancelled
+        '''
+
+        '''
+        Example family:
+        0 @I1@ INDI
+            1 NAME John /Smith/
+            1 FAMS @F1@
+        0 @F1@ FAM
+            1 WIFE @I1@
+            1 HUSB @I2@
+            1 CHIL @I3@
+        '''
+
+        graph = self._graph
+        individual_ids = {}  # index: INDI number
+        family_ids = {}  # index of the family's head: FAM number
+
+        def individual(index:int) -> str:
+            return f"@I{individual_ids.setdefault(index, len(individual_ids) + 1)}@"
+
+        def family(index:int) -> str:
+            # A couple share the family of whichever of them has the lower index
+            partner_index = graph.partner_index(index)
+            if partner_index != NO_USER and partner_index < index:
+                index = partner_index
+            return f"@F{family_ids.setdefault(index, len(family_ids) + 1)}@"
+
+        yield '0 HEAD'
+        yield '\t1 GEDC'
+        yield '\t\t2 VERS 5.5.1'
+        yield '\t\t2 FORM LINEAGE-LINKED'
+        yield '\t1 CHAR UTF-8'
+        for index, _ in self._walk_indexes(add_parent=True, expand_upwards=True, cancel=cancel):
+            if index is None:
+                yield '0 @I1@ INDI'
+                yield f'\t1 NAME {self.get_name(bot)}'
+                continue
+            yield f'0 {individual(index)} INDI'
+            yield f'\t1 NAME {self._relative(graph.user_id(index)).get_name(bot)}'
+
+            # If you have a parent, get added to their family
+            parent_index = graph.parent_index(index)
+            if parent_index != NO_USER:
+                yield f'\t1 FAMC {family(parent_index)}'
+
+            # If you have children or a partner, you're in a family of your own
+            partner_index = graph.partner_index(index)
+            children = graph.children_indexes(index)
+            if partner_index == NO_USER and len(children) == 0:
+                continue
+            yield f'\t1 FAMS {family(index)}'
+            if partner_index != NO_USER and partner_index < index:
+                continue  # Their partner writes the family out
+            yield f'0 {family(index)} FAM'
+            yield f'\t1 WIFE {individual(index)}'
+            if partner_index != NO_USER:
+                yield f'\t1 HUSB {individual(partner_index)}'
+                children = [*children, *graph.children_indexes(partner_index)]
+            for child_index in children:
+                yield f'\t1 CHIL {individual(child_index)}'
+        yield '0 TRLR'
+
+
+    def to_gedcom_file(self, bot, output, compress:bool=False, cancel:Event=None):
+        '''
+        Writes the lines from generate_gedcom_script into a binary file as they're made,
+        going straight through gzip if it's to be compressed, so the full text is never
+        held in memory
+
+        Params:
+            bot: Bot
+                Used solely to get the names of people
+            output: file
+                A binary file object to write the UTF-8 GEDCOM file to
+            compress: bool = False
+                Whether or not to gzip the file
+            cancel: Event = None
+                When set, the walk stops and raises TraversalCancelled
+        '''
+
+        raw = GzipFile(fileobj=output, mode='wb', compresslevel=6) if compress else output
+        text = TextIOWrapper(raw, encoding='utf-8', newline='\n')
+        for line in self.generate_gedcom_script(bot, cancel):
+            text.write(line)
+            text.write('\n')
+        text.flush()
+        text.detach()
+        if compress:
+            raw.close()  # Writes the gzip trailer, leaving `output` open
+
+
+    def generational_span(self, people_dict:dict=None, depth:int=0, add_parent:bool=False, expand_upwards:bool=False, guild:Guild=None, max_depth:int=None, max_nodes:int=None, cancel:Event=None) -> dict:
+        '''
+        Gets a list of every user related to this one
+        If "add_parent" and "expand_upwards" are True, then it should add every user in a given tree,
+        even if they're related through marriage's parents etc
+
+        Params:
+            people_dict: dict 
+                The dict of users who are currently in the tree, which is added to
+            depth: int = 0
+                The depth that this user sits at
+            add_parent: bool = False
+                Whether or not to add the parent of this user to the people list
+            expand_upwards: bool = False
+                Whether or not to expand upwards in the tree
+            guild: Guild = None
+                If added, span will return users only if they're in the given guild
+            max_depth: int = None
+                The most generations away from this user that will be added
+            max_nodes: int = None
+                The most users that will be added before TraversalLimitReached is raised
+            cancel: Event = None
+                When set, the span raises TraversalCancelled
+
+        Returns:
+            A dict of depth: list of people in that generation
+        '''
+
+        if people_dict == None:
+            people_dict = {}
+        visited = {self._graph.index(i.id) for l in people_dict.values() for i in l} - {None}
+        for person, relative_depth in self._walk(guild, add_parent=add_parent, expand_upwards=expand_upwards, max_depth=max_depth, max_nodes=max_nodes, cancel=cancel, visited=visited):
+            people_dict.setdefault(depth + relative_depth, list()).append(person)
+        return people_dict
+
+
+    def to_dot_script(self, bot, guild:Guild=None, cancel:Event=None) -> str:
+        '''
+        Gives you a string of the current family tree that will go through Family
+
+        Params:
+            bot: Bot
+                Used solely to get the names of people
+            guild: Guild = None
+                If set to none, does nothing of interest. If set to a guild, will only add
+                members to the tree that are in the given guild
+            cancel: Event = None
+                When set, the generation stops and raises TraversalCancelled - this
+                is how a timed out render stops its executor thread
+        '''
+
+        # Get the generation spanning tree, as Discord IDs
+        # Everything from here on works on IDs, sets and dicts so that it stays linear in
+        # the size of the tree (see benchmarks/dot_script.py)
+        ctu = CustomisedTreeUser.get(self.id)
+        graph = self._graph
+        root_user = self.get_root(guild=guild, cancel=cancel)
+        gen_span = {}  # depth: [discord_id, ...]
+        indexes = {}  # discord_id: index
+        for index, depth in root_user._walk_indexes(guild, cancel=cancel):
+            user_id = root_user.id if index is None else graph.user_id(index)
+            gen_span.setdefault(depth, list()).append(user_id)
+            indexes[user_id] = index
+        my_depth = None
+        for depth, l in gen_span.items():
+            if self.id in l:
+                my_depth = depth
+                break
+        partner_id, parent_id = self._partner, self._parent
+        if partner_id is not None and partner_id not in gen_span.get(my_depth, list()):
+            x = gen_span.get(my_depth, list())
+            x.append(partner_id)
+            gen_span[my_depth] = x
+        if parent_id is not None and parent_id not in gen_span.get(my_depth-1, list()):
+            x = gen_span.get(my_depth-1, list())
+            x.append(parent_id)
+            gen_span[my_depth-1] = x
+
+        # Add the labels for each user, looking up everyone's links and name only once
+        all_text = [
+            'digraph {',
+            f"\tnode [shape=box, fontcolor={ctu.hex['font']}, color={ctu.hex['edge']}, fillcolor={ctu.hex['node']}, style=filled];",
+            f"\tedge [dir=none, color={ctu.hex['edge']}];",
+            f"\tbgcolor={ctu.hex['background']}",
+            '',
+        ]
+        links = {}  # discord_id: (index, partner_id)
+        labels = {}  # discord_id: label line
+        for generation in gen_span.values():
+            check_cancelled(cancel)
+            for user_id in generation:
+                if user_id not in links:
+                    index = indexes[user_id] if user_id in indexes else graph.index(user_id)
+                    links[user_id] = (index, None if index is None else graph.user_id(graph.partner_index(index)))
+                    name = self._relative(user_id).get_name(bot)
+                    if user_id == self.id:
+                        labels[user_id] = f'\t{user_id}[label="{name}", fillcolor={ctu.hex["highlighted_node"]}, fontcolor={ctu.hex["highlighted_font"]}];'
+                    else:
+                        labels[user_id] = f'\t{user_id}[label="{name}"];'
+                all_text.append(labels[user_id])
+        in_tree = {i[0] for i in links.values()} - {None}  # Everyone's index, for the child checks
+        user_parent_tree = {}  # Parent ID: the node their children hang from
+
+        # Order the generations
+        generation_numbers = sorted(list(gen_span.keys()))
+
+        # Go through each generation's users
+        for generation_number in generation_numbers:
+            check_cancelled(cancel)
+            generation = gen_span.get(generation_number)
+            generation_ids = set(generation)
+
+            # Add each user and their spouse
+            added_already = set()
+            all_text.append("\t{ rank=same;")
+            previous_id = None
+            for user_id in generation:
+                if user_id in added_already:
+                    continue
+                user_parent_tree[user_id] = user_id
+                added_already.add(user_id)
+                if previous_id is not None:
+                    all_text.append(f"\t\t{previous_id} -> {user_id} [style=invis];")
+                partner_id = links[user_id][1]
+                if partner_id is not None and partner_id in generation_ids:
+                    node = user_parent_tree[partner_id] = user_parent_tree[user_id] = f"p{min(user_id, partner_id)}"
+                    all_text.append(f"\t\t{user_id} -> {node} -> {partner_id};")
+                    all_text.append(f"\t\t{node} {self.INVISIBLE}")
+                    added_already.add(partner_id)
+                    previous_id = partner_id
+                else:
+                    all_text.append(f"\t\t{user_id};")
+                    previous_id = user_id
+            all_text.append("\t}")
+
+            # Work out whose children are in the tree
+            parent_nodes = []  # (node, [child_id, ...])
+            for user_id in generation:
+                index = links[user_id][0]
+                if index is None:
+                    continue
+                children = [graph.user_id(i) for i in graph.children_indexes(index) if i in in_tree]
+                if children:
+                    parent_nodes.append((user_parent_tree[user_id], children))
+
+            # Add the connecting node from parent to child
+            all_text.append("\t{")
+            for node, _ in parent_nodes:
+                all_text.append(f"\t\th{node} {self.INVISIBLE};")
+            all_text.append("\t}")
+
+            # Add the lines from parent to node to child
+            added_already.clear()
+            for node, children in parent_nodes:
+                if node not in added_already:
+                    all_text.append(f"\t\t{node} -> h{node};")
+                    added_already.add(node)
+                for child_id in children:
+                    all_text.append(f"\t\th{node} -> {child_id};")
+        all_text.append("}")
+
+        return '\n'.join(all_text)
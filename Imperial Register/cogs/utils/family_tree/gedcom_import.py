@@ -0,0 +1,217 @@
+from csv import reader as csv_reader
+
+
+def read_gedcom(lines) -> tuple:
+    '''
+    Reads the individuals and families out of a GEDCOM file, a line at a time
+    Anything other than names, REFNs and family members is skipped over
+
+    Params:
+        lines: iterable
+            The lines of the file, as strings
+
+    Returns:
+        (individuals, families) where individuals is a dict of xref: (name, refn)
+        and families is a list of (husband_xref, wife_xref, [child_xref, ...])
+    '''
+
+    individuals = {}  # xref: (name, refn)
+    families = []  # (husband, wife, [child, ...])
+    record = None  # The xref of the level 0 record being read
+    record_type = None
+    name = refn = husband = wife = None
+    children = []
+
+    def finish():
+        if record_type == 'INDI':
+            individuals[record] = (name, refn)
+        elif record_type == 'FAM':
+            families.append((husband, wife, children))
+
+    for line in lines:
+        parts = line.strip().split(' ', 2)
+        if len(parts) < 2:
+            continue
+        level = parts[0]
+        if level == '0':
+            finish()
+            record = record_type = name = refn = husband = wife = None
+            children = []
+            if len(parts) == 3 and parts[1].startswith('@'):
+                record, record_type = parts[1], parts[2].strip()
+            continue
+        if level != '1' or len(parts) < 3:
+            continue
+        tag, value = parts[1], parts[2].strip()
+        if record_type == 'INDI':
+            if tag == 'NAME' and name == None:
+                name = ' '.join(value.replace('/', ' ').split())
+            elif tag == 'REFN' and refn == None:
+                refn = value
+        elif record_type == 'FAM':
+            if tag == 'HUSB':
+                husband = value
+            elif tag == 'WIFE':
+                wife = value
+            elif tag == 'CHIL':
+                children.append(value)
+    finish()
+    return individuals, families
+
+
+def read_mapping(lines) -> dict:
+    '''
+    Reads a mapping table of "xref or name,discord_id" rows
+    Rows that don't end in a Discord ID (eg a header) are skipped
+    '''
+
+    mapping = {}
+    for row in csv_reader(lines):
+        if len(row) < 2:
+            continue
+        key, user_id = row[0].strip(), row[1].strip()
+        if user_id.isdigit():
+            mapping[key] = int(user_id)
+    return mapping
+
+
+def map_links(individuals:dict, families:list, mapping:dict) -> tuple:
+    '''
+    Turns the families from read_gedcom into Discord ID links
+
+    Each individual is looked up in the mapping by their xref, then their REFN, then
+    their name. Links to anyone who can't be mapped are dropped. Children are given to
+    the WIFE of their family where she's mapped, and the HUSB otherwise, since a
+    child only has the one parent here.
+
+    Returns:
+        (partnerships, parents, unmapped) where partnerships is a list of (user_id, partner_id),
+        parents is a list of (child_id, parent_id), and unmapped is the number of
+        individuals without a Discord ID
+    '''
+
+    user_ids = {}  # xref: discord_id
+    for xref, (name, refn) in individuals.items():
+        for key in (xref, refn, name):
+            if key != None and key in mapping:
+                user_ids[xref] = mapping[key]
+                break
+    unmapped = len(individuals) - len(user_ids)
+
+    partnerships = []
+    parents = []
+    for husband, wife, children in families:
+        husband_id, wife_id = user_ids.get(husband), user_ids.get(wife)
+        if husband_id != None and wife_id != None and husband_id != wife_id:
+            partnerships.append((wife_id, husband_id))
+        parent_id = wife_id if wife_id != None else husband_id
+        if parent_id == None:
+            continue
+        for child in children:
+            child_id = user_ids.get(child)
+            if child_id != None and child_id != parent_id:
+                parents.append((child_id, parent_id))
+    return partnerships, parents, unmapped
+
+
+def find_problems(graph, partnerships:list, parents:list) -> tuple:
+    '''
+    Checks a batch of new links against the one partner, one parent and no loop rules,
+    taking the links already in the graph into account
+
+    Links that are already in the graph are dropped rather than counted as problems,
+    so the same file can be imported twice.
+
+    Params:
+        graph: GraphView
+            The current family graph - this only reads from it, so a pinned version
+            can be given and this run in an executor
+        partnerships: list
+            (user_id, partner_id) pairs
+        parents: list
+            (child_id, parent_id) pairs
+
+    Returns:
+        (partnerships, parents, problems) - the links that still need adding, and a list
+        of strings describing anything that breaks the rules
+    '''
+
+    problems = []
+
+    # One partner each
+    new_partners = {}  # discord_id: partner_id
+    new_partnerships = []
+    for user_id, partner_id in partnerships:
+        if graph.partner_of(user_id) == partner_id or new_partners.get(user_id) == partner_id:
+            continue
+        for person, other in ((user_id, partner_id), (partner_id, user_id)):
+            if graph.partner_of(person) != None:
+                problems.append(f"`{person}` is already married, so can't marry `{other}`")
+            elif person in new_partners:
+                problems.append(f"`{person}` would be married to both `{new_partners[person]}` and `{other}`")
+        new_partners.setdefault(user_id, partner_id)
+        new_partners.setdefault(partner_id, user_id)
+        new_partnerships.append((user_id, partner_id))
+
+    # One parent each
+    new_parents = {}  # child_id: parent_id
+    for child_id, parent_id in parents:
+        if graph.parent_of(child_id) == parent_id or new_parents.get(child_id) == parent_id:
+            continue
+        if graph.parent_of(child_id) != None:
+            problems.append(f"`{child_id}` already has a parent, so can't be `{parent_id}`'s child")
+        elif child_id in new_parents:
+            problems.append(f"`{child_id}` would have both `{new_parents[child_id]}` and `{parent_id}` as parents")
+        else:
+            new_parents[child_id] = parent_id
+
+    # No loops - walk up from each new child, remembering everyone already checked
+    def parent_of(user_id:int) -> int:
+        parent_id = new_parents.get(user_id)
+        return graph.parent_of(user_id) if parent_id == None else parent_id
+
+    checked = set()
+    for child_id in new_parents:
+        path = []
+        on_path = set()
+        user_id = child_id
+        while user_id != None and user_id not in checked:
+            if user_id in on_path:
+                problems.append(f"`{user_id}` would be their own ancestor")
+                break
+            path.append(user_id)
+            on_path.add(user_id)
+            user_id = parent_of(user_id)
+        checked.update(path)
+
+    return new_partnerships, [(i, o) for i, o in new_parents.items()], problems
+
+
+def families_changed(graph, user_ids:set, version:int, base_version:int) -> bool:
+    '''
+    Whether or not anyone in the families of the given users has had their parent or
+    partner changed since a version of the graph, so that a find_problems done against
+    that version might not hold any more
+
+    A change anywhere else can't break an import - a loop or a second partner or
+    parent would have to run through someone in one of those families
+
+    Params:
+        graph: FamilyGraph
+            The live family graph
+        user_ids: set
+            Everyone the import links
+        version: int
+            The version of the graph that was checked
+        base_version: int
+            The graph's base_version at that time - if it's been compacted since, the
+            changes before that can't be told apart, so everything counts as changed
+    '''
+
+    if graph.base_version != base_version:
+        return True
+    changed = graph.links_changed_since(version)
+    if not changed:
+        return False
+    families = {graph.components.find(i) for i in map(graph.index, user_ids) if i is not None}
+    return any(graph.components.find(i) in families for i in changed)
@@ -0,0 +1,142 @@
+from bisect import bisect_left
+
+from cogs.utils.family_tree.constants import NO_USER
+
+
+class GraphView(object):
+    '''
+    The read side of the family graph - see FamilyGraph for the layout
+
+    This is what a pinned version of the graph is (see FamilyGraph.pin), and what
+    FamilyGraph and the shared memory SnapshotGraph build on, so anything that only
+    reads the graph can be handed any of the three.
+
+    Params:
+        ids: array
+            Every user's Discord ID, the first `base_size` of them sorted
+        base_size: int
+            How many of `ids` are sorted
+        overflow: dict
+            discord_id: index, for everyone after `base_size`
+        parents: array
+            The parent index of each user, or NO_USER
+        partners: array
+            The partner index of each user, or NO_USER
+        child_offsets: array
+            The CSR row offsets into child_targets
+        child_targets: array
+            The CSR child indexes
+        child_overlay: dict
+            index: [child_index, ...] for anyone whose children have changed since compaction
+        version: int = 0
+            The FamilyGraph.version this was taken at
+    '''
+
+    def __init__(self, ids, base_size:int, overflow:dict, parents, partners, child_offsets, child_targets, child_overlay:dict, version:int=0):
+        self._ids = ids
+        self._base_size = base_size
+        self._overflow = overflow
+        self._parents = parents
+        self._partners = partners
+        self._child_offsets = child_offsets
+        self._child_targets = child_targets
+        self._child_overlay = child_overlay
+        self.version = version
+
+
+    def __len__(self):
+        return len(self._parents)
+
+
+    def __contains__(self, user_id:int):
+        return self.index(user_id) is not None
+
+
+    def index(self, user_id:int) -> int:
+        '''
+        Gives the dense index of a user, or None if they're not stored
+        '''
+
+        position = bisect_left(self._ids, user_id, 0, self._base_size)
+        if position < self._base_size and self._ids[position] == user_id:
+            return position
+        return self._overflow.get(user_id)
+
+
+    def user_id(self, index:int) -> int:
+        '''
+        Gives the Discord ID for a dense index, or None for NO_USER
+        '''
+
+        if index == NO_USER:
+            return None
+        return self._ids[index]
+
+
+    def parent_index(self, index:int) -> int:
+        return self._parents[index]
+
+
+    def partner_index(self, index:int) -> int:
+        return self._partners[index]
+
+
+    def children_indexes(self, index:int):
+        '''
+        Gives a sequence of the child indexes for a given user index
+        '''
+
+        children = self._child_overlay.get(index)
+        if children is not None:
+            return children
+        if index < self._base_size:
+            return self._child_targets[self._child_offsets[index]:self._child_offsets[index + 1]]
+        return ()
+
+
+    def neighbour_indexes(self, index:int) -> list:
+        '''
+        Gives the indexes of everyone directly linked to a user
+        '''
+
+        neighbours = list(self.children_indexes(index))
+        if self._parents[index] != NO_USER:
+            neighbours.append(self._parents[index])
+        if self._partners[index] != NO_USER:
+            neighbours.append(self._partners[index])
+        return neighbours
+
+
+    def parent_of(self, user_id:int) -> int:
+        index = self.index(user_id)
+        if index is None:
+            return None
+        return self.user_id(self._parents[index])
+
+
+    def partner_of(self, user_id:int) -> int:
+        index = self.index(user_id)
+        if index is None:
+            return None
+        return self.user_id(self._partners[index])
+
+
+    def children_of(self, user_id:int) -> list:
+        index = self.index(user_id)
+        if index is None:
+            return []
+        return [self.user_id(i) for i in self.children_indexes(index)]
+
+
+    def is_empty(self, index:int) -> bool:
+        return self._parents[index] == NO_USER and self._partners[index] == NO_USER and len(self.children_indexes(index)) == 0
+
+
+    def users(self):
+        '''
+        Yields the ID of every user who has at least one family link
+        '''
+
+        for index in range(len(self)):
+            if not self.is_empty(index):
+                yield self.user_id(index)
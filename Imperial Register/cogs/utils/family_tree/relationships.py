@@ -0,0 +1,144 @@
+from cogs.utils.family_tree.constants import NO_USER
+
+
+ORDINALS = ['zeroth', 'first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth', 'ninth', 'tenth']
+REMOVALS = ['', 'once', 'twice', 'thrice']
+
+# What "your partner's X" and "your X's partner" are better known as
+PARTNER_OF_RELATION = {
+    'parent': 'step-parent',
+    'child': 'child-in-law',
+    'sibling': 'sibling-in-law',
+}
+RELATION_OF_PARTNER = {
+    'parent': 'parent-in-law',
+    'child': 'step-child',
+    'sibling': 'sibling-in-law',
+}
+
+
+def _greats(count:int) -> str:
+    if count <= 0:
+        return ''
+    if count == 1:
+        return 'great-'
+    return f'{count}x great-'
+
+
+def _ordinal(number:int) -> str:
+    try:
+        return ORDINALS[number]
+    except IndexError:
+        return f'{number}th'
+
+
+def describe_blood_relation(up:int, down:int) -> str:
+    '''
+    Names a relation from how far each user is from their closest shared ancestor
+    The result is what the second user is to the first
+
+    Params:
+        up: int
+            The number of generations from the first user up to the shared ancestor
+        down: int
+            The number of generations from the shared ancestor down to the second user
+    '''
+
+    if up == 0 and down == 0:
+        return 'themselves'
+    if up == 0:
+        if down == 1:
+            return 'child'
+        return _greats(down - 2) + 'grandchild'
+    if down == 0:
+        if up == 1:
+            return 'parent'
+        return _greats(up - 2) + 'grandparent'
+    if up == 1 and down == 1:
+        return 'sibling'
+    if up == 1:
+        if down == 2:
+            return 'niece/nephew'
+        return _greats(down - 3) + 'grand-niece/nephew'
+    if down == 1:
+        if up == 2:
+            return 'aunt/uncle'
+        return _greats(up - 2) + 'aunt/uncle'
+
+    # Everyone else is a cousin of some sort
+    degree = min(up, down) - 1
+    removed = abs(up - down)
+    name = f'{_ordinal(degree)} cousin'
+    if removed == 0:
+        return name
+    try:
+        return f'{name} {REMOVALS[removed]} removed'
+    except IndexError:
+        return f'{name} {removed} times removed'
+
+
+def blood_relation(graph, index_a:int, index_b:int) -> str:
+    '''
+    Gives what user B is to user A by blood, or None if they have no shared ancestor
+    '''
+
+    if index_a == index_b:
+        return 'themselves'
+    ancestry = graph.ancestry
+    shared = ancestry.lowest_common_ancestor(index_a, index_b)
+    if shared == NO_USER:
+        return None
+    shared_depth = ancestry.depth(shared)
+    return describe_blood_relation(ancestry.depth(index_a) - shared_depth, ancestry.depth(index_b) - shared_depth)
+
+
+def find_relation(graph, user_a:int, user_b:int) -> str:
+    '''
+    Gives what user B is to user A, going through at most one partner on each side,
+    or None if they aren't family at all
+
+    Params:
+        graph: FamilyGraph
+            The graph the users are in
+        user_a: int
+            The Discord ID of the user the relation is described from
+        user_b: int
+            The Discord ID of the user whose relation is being described
+    '''
+
+    if user_a == user_b:
+        return 'themselves'
+    index_a = graph.index(user_a)
+    index_b = graph.index(user_b)
+    if index_a is None or index_b is None:
+        return None
+    if not graph.components.same_family(user_a, user_b):
+        return None
+    partner_a = graph.partner_index(index_a)
+    partner_b = graph.partner_index(index_b)
+    if partner_a == index_b:
+        return 'partner'
+
+    # Straight blood relations
+    relation = blood_relation(graph, index_a, index_b)
+    if relation:
+        return relation
+
+    # Through A's partner
+    if partner_a != NO_USER:
+        relation = blood_relation(graph, partner_a, index_b)
+        if relation:
+            return RELATION_OF_PARTNER.get(relation, f"partner's {relation}")
+
+    # Through B's partner
+    if partner_b != NO_USER:
+        relation = blood_relation(graph, index_a, partner_b)
+        if relation:
+            return PARTNER_OF_RELATION.get(relation, f"{relation}'s partner")
+
+    # Through both
+    if partner_a != NO_USER and partner_b != NO_USER:
+        relation = blood_relation(graph, partner_a, partner_b)
+        if relation:
+            return f"partner's {relation}'s partner"
+    return 'distant relation by marriage'
@@ -0,0 +1,450 @@
+from array import array
+from bisect import bisect_left
+from multiprocessing import shared_memory
+
+from cogs.utils.guild_members import GuildMembers
+from cogs.utils.name_cache import FixedNames
+from cogs.utils.family_tree.constants import NO_USER
+from cogs.utils.family_tree.graph_view import GraphView
+
+
+class _Block(object):
+    '''
+    A single published array in shared memory, with a count of the handles using it
+    '''
+
+    def __init__(self, data):
+        raw = memoryview(data).cast('B')
+        self.memory = shared_memory.SharedMemory(create=True, size=max(len(raw), 1))
+        self.memory.buf[:len(raw)] = raw
+        self.length = len(data)
+        self.users = 0
+        self.superseded = False
+
+
+    @property
+    def spec(self) -> tuple:
+        return (self.memory.name, self.length)
+
+
+    def free(self):
+        self.memory.close()
+        self.memory.unlink()
+
+
+class SnapshotPublisher(object):
+    '''
+    Publishes a read-only copy of the family graph into shared memory, so that DOT
+    generation can run in a process pool without a pickled copy of the whole cache
+    being sent with every job - only the labels of the family being drawn are sent
+
+    The graph is split so that republishing after a change stays cheap:
+        base     The sorted IDs and CSR child layout, which only change on
+                 load/compact - published once per `FamilyGraph.base_version`
+        links    The parent and partner arrays - a straight copy of 16 bytes per
+                 user, only republished once the changes since the last copy
+                 come to more than 1/32 of the graph
+        changes  Everyone whose parent or partner has changed since `links` was
+                 copied, anyone added since the last compaction and any changed
+                 child lists, as sorted arrays in a single block - published
+                 whenever `FamilyGraph.version` has moved on
+        guilds   A sorted array of a guild's member IDs, published per guild
+                 whenever GuildMembers gives it a new version
+
+    So a job's handle is the same few names and numbers however much has changed,
+    and a new version costs about as much as what's changed since compaction.
+
+    `acquire` gives a handle for the current graph, which must be given back to
+    `release` once the job using it is done - not before, since its cancel flag
+    (see `cancel`) could be handed to another job. Blocks are only unlinked once
+    they've been superseded and nothing is using them.
+
+    Params:
+        graph: FamilyGraph
+            The graph to publish
+    '''
+
+    CANCEL_SLOTS = 1024  # The most jobs that can have a cancel flag at once
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.base = None  # {field: _Block}
+        self.base_version = None
+        self.links = None  # {field: _Block}
+        self.links_version = None  # The graph version `links` was copied at
+        self.links_base_version = None
+        self.changes = None  # _Block
+        self.changes_layout = None  # field: (start, length) in `changes`
+        self.changes_version = None
+        self.guilds = {}  # guild_id: (version, _Block)
+        self.cancel_flags = None  # _Block, a byte per cancel slot
+        self.free_cancel_slots = list(range(self.CANCEL_SLOTS))
+
+
+    def _supersede(self, blocks:dict):
+        if blocks is None:
+            return
+        for block in blocks.values():
+            block.superseded = True
+            if block.users == 0:
+                block.free()
+
+
+    def _publish_base(self):
+        graph = self.graph
+        self._supersede(self.base)
+        self.base = {
+            'ids': _Block(graph._ids[:graph._base_size]),
+            'child_offsets': _Block(graph._child_offsets),
+            'child_targets': _Block(graph._child_targets),
+        }
+        self.base_version = graph.base_version
+
+
+    def _publish_changes(self):
+        graph = self.graph
+        changed = None
+        if self.links is not None and self.links_base_version == graph.base_version:
+            changed = graph.links_changed_since(self.links_version)
+        if changed is None or len(changed) > len(graph) // 32:
+            self._supersede(self.links)
+            self.links = {
+                'parents': _Block(graph._parents),
+                'partners': _Block(graph._partners),
+            }
+            self.links_version = graph.version
+            self.links_base_version = graph.base_version
+            changed = []
+
+        # Everything else goes in one block, one array after another
+        base_size = graph._base_size
+        overflow = sorted(graph._overflow.items())
+        overlay_indexes = sorted(graph._child_overlay)
+        overlay_offsets = array('q', [0])
+        overlay_targets = array('q')
+        for index in overlay_indexes:
+            overlay_targets.extend(graph._child_overlay[index])
+            overlay_offsets.append(len(overlay_targets))
+        fields = (
+            ('patch_indexes', changed),
+            ('patch_parents', [graph._parents[i] for i in changed]),
+            ('patch_partners', [graph._partners[i] for i in changed]),
+            ('overflow_ids', graph._ids[base_size:]),
+            ('overflow_keys', [i[0] for i in overflow]),
+            ('overflow_values', [i[1] for i in overflow]),
+            ('overlay_indexes', overlay_indexes),
+            ('overlay_offsets', overlay_offsets),
+            ('overlay_targets', overlay_targets),
+        )
+        data = array('q')
+        layout = {}
+        for field, values in fields:
+            layout[field] = (len(data), len(values))
+            data.extend(values)
+        if self.changes is not None:
+            self._supersede({'changes': self.changes})
+        self.changes = _Block(data)
+        self.changes_layout = layout
+        self.changes_version = graph.version
+
+
+    def _guild_block(self, guild_id:int, version:int, members:set):
+        published = self.guilds.get(guild_id)
+        if published is not None and published[0] == version:
+            return published[1]
+        if published is not None:
+            self._supersede({'guild': published[1]})
+        block = _Block(array('q', sorted(members)))
+        self.guilds[guild_id] = (version, block)
+        return block
+
+
+    def acquire(self, guild_id:int=None) -> dict:
+        '''
+        Gives a handle to the current snapshot, publishing whatever's out of date first
+
+        Params:
+            guild_id: int = None
+                A guild whose members should be published with the snapshot - it
+                must already be fully indexed in GuildMembers
+        '''
+
+        graph = self.graph
+        if self.base_version != graph.base_version:
+            self._publish_base()
+        if self.changes_version != graph.version:
+            self._publish_changes()
+
+        blocks = {**self.base, **self.links, 'changes': self.changes}
+        if guild_id is not None:
+            blocks['guild'] = self._guild_block(guild_id, GuildMembers.version(guild_id), GuildMembers.get(guild_id))
+        for block in blocks.values():
+            block.users += 1
+
+        # A byte the job checks now and then, so it can be stopped from here
+        cancel = None
+        if self.free_cancel_slots:
+            if self.cancel_flags is None:
+                self.cancel_flags = _Block(bytes(self.CANCEL_SLOTS))
+            cancel = (self.cancel_flags.spec, self.free_cancel_slots.pop())
+        return {
+            'version': graph.version,
+            'guild_id': guild_id,
+            'base_size': graph._base_size,
+            'size': len(graph),
+            'blocks': {field: block.spec for field, block in blocks.items()},
+            'layout': self.changes_layout,
+            'cancel': cancel,
+            '_blocks': blocks,
+        }
+
+
+    def cancel(self, handle:dict):
+        '''
+        Tells the job using a handle to stop, if it's still going - it raises TraversalCancelled
+        '''
+
+        if handle['cancel'] is not None:
+            self.cancel_flags.memory.buf[handle['cancel'][1]] = 1
+
+
+    def release(self, handle:dict):
+        '''
+        Gives back a handle from `acquire`
+        '''
+
+        for block in handle['_blocks'].values():
+            block.users -= 1
+            if block.superseded and block.users == 0:
+                block.free()
+        if handle['cancel'] is not None:
+            slot = handle['cancel'][1]
+            self.cancel_flags.memory.buf[slot] = 0
+            self.free_cancel_slots.append(slot)
+
+
+    @staticmethod
+    def shareable(handle:dict) -> dict:
+        '''
+        Gives the part of a handle that's sent to a worker process
+        '''
+
+        return {i: o for i, o in handle.items() if i != '_blocks'}
+
+
+_attached = {}  # shared memory name: SharedMemory, for the worker processes
+
+
+def _attach(spec:tuple, format:str='q'):
+    '''
+    Gives a memoryview over a published block, attaching to it if this process hasn't yet
+    '''
+
+    name, length = spec
+    try:
+        memory = _attached[name]
+    except KeyError:
+        memory = _attached[name] = shared_memory.SharedMemory(name=name)
+    view = memory.buf
+    if format != 'B':
+        view = view[:len(view) - len(view) % 8].cast(format)
+    return view[:length]
+
+
+def _detach_unused(handle:dict):
+    '''
+    Closes any attached blocks that the given handle doesn't use
+    '''
+
+    in_use = {i[0] for i in handle['blocks'].values()}
+    if handle['cancel'] is not None:
+        in_use.add(handle['cancel'][0][0])
+    for name in list(_attached):
+        if name in in_use:
+            continue
+        try:
+            _attached[name].close()
+        except BufferError:
+            continue  # Something's still looking at it - try again next time
+        del _attached[name]
+
+
+class _SortedLookup(object):
+    '''
+    Stands in for a dict that's been published as sorted arrays of its keys and values
+    If offsets are given, each value is the slice of `values` between two of them
+    '''
+
+    def __init__(self, keys, values, offsets=None):
+        self.keys = keys
+        self.values = values
+        self.offsets = offsets
+
+
+    def get(self, key:int, default=None):
+        position = bisect_left(self.keys, key)
+        if position == len(self.keys) or self.keys[position] != key:
+            return default
+        if self.offsets is None:
+            return self.values[position]
+        return self.values[self.offsets[position]:self.offsets[position + 1]]
+
+
+class _PatchedLinks(object):
+    '''
+    Stands in for the parent or partner array, over the published copy and the
+    entries that have changed since it was taken
+    '''
+
+    def __init__(self, links, patch:_SortedLookup, size:int):
+        self.links = links
+        self.patch = patch
+        self.size = size
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __getitem__(self, index:int) -> int:
+        value = self.patch.get(index)
+        if value is not None:
+            return value
+        if index < len(self.links):
+            return self.links[index]
+        return NO_USER  # Added since the copy, and hasn't had this link set
+
+
+class SnapshotGraph(GraphView):
+    '''
+    A read-only family graph over a published snapshot
+    This can be set as FamilyTreeMember.graph inside of a worker process
+    '''
+
+    def __init__(self, handle:dict):
+        blocks = handle['blocks']
+        changes = _attach(blocks['changes'])
+        field = {i: changes[o[0]:o[0] + o[1]] for i, o in handle['layout'].items()}
+        parents = _attach(blocks['parents'])
+        partners = _attach(blocks['partners'])
+        if len(field['patch_indexes']) or len(parents) != handle['size']:
+            parents = _PatchedLinks(parents, _SortedLookup(field['patch_indexes'], field['patch_parents']), handle['size'])
+            partners = _PatchedLinks(partners, _SortedLookup(field['patch_indexes'], field['patch_partners']), handle['size'])
+        super().__init__(
+            ids=_attach(blocks['ids']),
+            base_size=handle['base_size'],
+            overflow=_SortedLookup(field['overflow_keys'], field['overflow_values']),
+            parents=parents,
+            partners=partners,
+            child_offsets=_attach(blocks['child_offsets']),
+            child_targets=_attach(blocks['child_targets']),
+            child_overlay=_SortedLookup(field['overlay_indexes'], field['overlay_targets'], field['overlay_offsets']),
+            version=handle['version'],
+        )
+        self._overflow_ids = field['overflow_ids']
+
+
+    def user_id(self, index:int) -> int:
+        if index == NO_USER:
+            return None
+        if index < self._base_size:
+            return self._ids[index]
+        return self._overflow_ids[index - self._base_size]
+
+
+class SnapshotGuild(object):
+    '''
+    Stands in for a guild inside of a worker process, over its published member IDs
+    '''
+
+    def __init__(self, handle:dict):
+        self.id = handle['guild_id']
+        self._members = _attach(handle['blocks']['guild'])
+
+
+    def get_member(self, user_id:int):
+        position = bisect_left(self._members, user_id)
+        if position < len(self._members) and self._members[position] == user_id:
+            return user_id
+        return None
+
+
+class SnapshotCancel(object):
+    '''
+    Stands in for a threading.Event inside of a worker process, over the cancel flag
+    of a job's handle (see SnapshotPublisher.cancel)
+    '''
+
+    def __init__(self, handle:dict):
+        spec, self.slot = handle['cancel']
+        self._flags = _attach(spec, 'B')
+
+
+    def is_set(self) -> bool:
+        return self._flags[self.slot] != 0
+
+
+def _open_snapshot(handle:dict):
+    '''
+    Points FamilyTreeMember at a published snapshot inside of a worker process
+    '''
+
+    from cogs.utils.customised_tree_user import CustomisedTreeUser
+    from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+
+    # Anything copied over from the main process when this one was forked is out of date
+    FamilyTreeMember.graph = SnapshotGraph(handle)
+    GuildMembers.all_guilds.clear()
+    CustomisedTreeUser.all_users.clear()
+    _detach_unused(handle)
+
+
+def dot_script_from_snapshot(handle:dict, user_id:int, theme:dict, labels:dict) -> str:
+    '''
+    Generates a user's DOT script inside of a worker process
+
+    Params:
+        handle: dict
+            The shareable part of a handle from SnapshotPublisher.acquire
+        user_id: int
+            The user whose tree to generate
+        theme: dict
+            The user's CustomisedTreeUser colours, as keyword arguments
+        labels: dict
+            discord_id: label for everyone in the tree, from NameCache.labels
+    '''
+
+    from cogs.utils.customised_tree_user import CustomisedTreeUser
+    from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+
+    _open_snapshot(handle)
+    CustomisedTreeUser(user_id, **theme)
+    guild = None if handle['guild_id'] is None else SnapshotGuild(handle)
+    cancel = None if handle['cancel'] is None else SnapshotCancel(handle)
+    return FamilyTreeMember.get(user_id).to_dot_script(FixedNames(labels), guild, cancel)
+
+
+def gedcom_file_from_snapshot(handle:dict, user_id:int, labels:dict, path:str, compress:bool=False):
+    '''
+    Writes a user's GEDCOM file to disk inside of a worker process, so that the file
+    is streamed out as it's generated rather than sent back through the pool as bytes
+
+    Params:
+        handle: dict
+            The shareable part of a handle from SnapshotPublisher.acquire
+        user_id: int
+            The user whose family to write out
+        labels: dict
+            discord_id: label for everyone in the family, from NameCache.labels
+        path: str
+            Where to write the file
+        compress: bool = False
+            Whether or not to gzip the file
+    '''
+
+    from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+
+    _open_snapshot(handle)
+    cancel = None if handle['cancel'] is None else SnapshotCancel(handle)
+    with open(path, 'wb') as output:
+        FamilyTreeMember.get(user_id).to_gedcom_file(FixedNames(labels), output, compress, cancel)
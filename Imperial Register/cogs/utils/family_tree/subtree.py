@@ -0,0 +1,223 @@
+from array import array
+from collections import deque
+
+from cogs.utils.family_tree.constants import NO_USER
+
+
+class SubtreeIndex(object):
+    '''
+    Per-user aggregates over the parent links of the family graph, kept in step
+    with every parent/child change so that they can be read in constant time
+
+    `_counts[i]` is how many descendants user i has, `_heights[i]` is how many
+    generations sit below them, and `_roots[i]` is the eldest ancestor on their
+    parent line. How many generations sit above a user is already held by the
+    ancestor index, so `generation` just reads it from there.
+
+    Adding or removing a parent link only changes the counts and heights along
+    the one line of ancestors above it, and the roots of the subtree below it.
+    Users stuck in a parent loop (or hanging below one) can't be given sensible
+    values - they keep a count and height of 0 and are their own root until
+    the loop is broken, at which point everything is recalculated.
+
+    Params:
+        graph: FamilyGraph
+            The graph whose parent links are being aggregated
+    '''
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._counts = array('q')
+        self._heights = array('q')
+        self._roots = array('q')
+
+
+    def _ensure(self, index:int):
+        '''
+        Makes sure the arrays are long enough to hold the given index
+        '''
+
+        while len(self._roots) <= index:
+            self._roots.append(len(self._roots))
+            self._counts.append(0)
+            self._heights.append(0)
+
+
+    def _ancestors(self, index:int):
+        '''
+        Yields the given user and everyone above them, or raises ValueError if
+        the line goes round a loop
+        '''
+
+        seen = set()
+        while index != NO_USER:
+            if index in seen:
+                raise ValueError()
+            seen.add(index)
+            yield index
+            index = self.graph.parent_index(index)
+
+
+    def _height_from_children(self, index:int) -> int:
+        heights = [self._heights[i] for i in self.graph.children_indexes(index)]
+        if not heights:
+            return 0
+        return max(heights) + 1
+
+
+    def _set_roots(self, index:int, root_index:int):
+        '''
+        Gives a user and everyone below them a new root
+        '''
+
+        queue = deque([index])
+        seen = {index}
+        while queue:
+            current = queue.popleft()
+            self._roots[current] = root_index
+            for child_index in self.graph.children_indexes(current):
+                if child_index not in seen:
+                    seen.add(child_index)
+                    queue.append(child_index)
+
+
+    def attached(self, child_index:int):
+        '''
+        Updates the aggregates after a user has been given a new parent
+        '''
+
+        self._ensure(len(self.graph) - 1)
+        parent_index = self.graph.parent_index(child_index)
+        try:
+            ancestors = list(self._ancestors(parent_index))
+        except ValueError:
+            return self.rebuild()
+        added = self._counts[child_index] + 1
+        height = self._heights[child_index] + 1
+        for ancestor in ancestors:
+            self._counts[ancestor] += added
+            if self._heights[ancestor] < height:
+                self._heights[ancestor] = height
+            height += 1
+        self._set_roots(child_index, self._roots[parent_index])
+
+
+    def detached(self, child_index:int, old_parent_index:int):
+        '''
+        Updates the aggregates after a user has lost their parent
+
+        Params:
+            child_index: int
+                The user who's lost their parent
+            old_parent_index: int
+                The parent they used to have
+        '''
+
+        self._ensure(len(self.graph) - 1)
+        if self.graph.ancestry.depth(old_parent_index) < 0:
+            # The removed link might have been holding a loop together
+            return self.rebuild()
+        try:
+            ancestors = list(self._ancestors(old_parent_index))
+        except ValueError:
+            return self.rebuild()
+        removed = self._counts[child_index] + 1
+        for ancestor in ancestors:
+            self._counts[ancestor] -= removed
+        for ancestor in ancestors:
+            height = self._height_from_children(ancestor)
+            if height == self._heights[ancestor]:
+                break
+            self._heights[ancestor] = height
+        self._set_roots(child_index, child_index)
+
+
+    def rebuild(self):
+        '''
+        Recalculates every aggregate from scratch, from the roots down
+        '''
+
+        size = len(self.graph)
+        self._counts = array('q', [0]) * size
+        self._heights = array('q', [0]) * size
+        self._roots = array('q', range(size))
+
+        # Get everyone reachable from a root, parents before children
+        order = array('q', (i for i in range(size) if self.graph.parent_index(i) == NO_USER))
+        position = 0
+        while position < len(order):
+            current = order[position]
+            position += 1
+            root_index = self._roots[current]
+            for child_index in self.graph.children_indexes(current):
+                self._roots[child_index] = root_index
+                order.append(child_index)
+
+        # Then add everyone up from the bottom
+        for current in reversed(order):
+            parent_index = self.graph.parent_index(current)
+            if parent_index == NO_USER:
+                continue
+            self._counts[parent_index] += self._counts[current] + 1
+            if self._heights[parent_index] <= self._heights[current]:
+                self._heights[parent_index] = self._heights[current] + 1
+
+
+    def dump(self) -> dict:
+        '''
+        Gives a copy of the index, for FamilyGraph.dump
+        '''
+
+        return {
+            'counts': array('q', self._counts),
+            'heights': array('q', self._heights),
+            'roots': array('q', self._roots),
+        }
+
+
+    def restore(self, data:dict):
+        '''
+        Puts back an index given by `dump`
+        '''
+
+        self._counts = data['counts']
+        self._heights = data['heights']
+        self._roots = data['roots']
+
+
+    def descendant_count(self, index:int) -> int:
+        '''
+        Gives the number of children, grandchildren, etc that a user has
+        '''
+
+        if index >= len(self._counts):
+            return 0
+        return self._counts[index]
+
+
+    def descendant_depth(self, index:int) -> int:
+        '''
+        Gives the number of generations below a user
+        '''
+
+        if index >= len(self._heights):
+            return 0
+        return self._heights[index]
+
+
+    def generation(self, index:int) -> int:
+        '''
+        Gives the number of generations above a user, or -1 if they're in a loop
+        '''
+
+        return self.graph.ancestry.depth(index)
+
+
+    def root(self, index:int) -> int:
+        '''
+        Gives the eldest ancestor on a user's parent line
+        '''
+
+        if index >= len(self._roots):
+            return index
+        return self._roots[index]
@@ -0,0 +1,161 @@
+from collections import deque
+
+from cogs.utils.family_tree.constants import NO_USER
+
+
+class TraversalCancelled(Exception):
+    '''
+    Raised inside a traversal when its cancel event has been set
+    '''
+
+    pass
+
+
+class TraversalLimitReached(Exception):
+    '''
+    Raised inside a traversal when it has walked its node budget
+    '''
+
+    pass
+
+
+def check_cancelled(cancel):
+    '''
+    Raises TraversalCancelled if the given event (which can be None) has been set
+    '''
+
+    if cancel is not None and cancel.is_set():
+        raise TraversalCancelled()
+
+
+def depth_first(graph, start:int, add_parent:bool=False, expand_upwards:bool=False, include=None, max_depth:int=None, max_nodes:int=None, cancel=None, visited:set=None):
+    '''
+    Walks the family of a user depth first, in the same order as the old recursive span
+    Yields (index, depth) pairs, where depth is the generation relative to the start user
+
+    Params:
+        graph: FamilyGraph
+            The graph to walk
+        start: int
+            The index of the user to start from
+        add_parent: bool = False
+            Whether or not to add the parent of the start user
+        expand_upwards: bool = False
+            Whether or not to expand upwards in the tree at all
+        include: callable = None
+            Given a Discord ID, whether or not that user should be walked
+        max_depth: int = None
+            The most generations away from the start user that will be walked
+        max_nodes: int = None
+            The most users that will be walked before TraversalLimitReached is raised
+        cancel: threading.Event = None
+            When set, the walk raises TraversalCancelled at the next user
+        visited: set = None
+            Indexes that should be treated as already walked - this is added to
+    '''
+
+    if visited is None:
+        visited = set()
+    walked = 0
+    stack = [(start, 0, add_parent)]
+    while stack:
+        index, depth, add_parent = stack.pop()
+        if index in visited:
+            continue
+        if max_depth is not None and abs(depth) > max_depth:
+            continue
+        if include is not None and not include(graph.user_id(index)):
+            continue
+        check_cancelled(cancel)
+        if max_nodes is not None and walked >= max_nodes:
+            raise TraversalLimitReached()
+        visited.add(index)
+        walked += 1
+        yield index, depth
+
+        # These are pushed backwards so that they come off as parent, children, partner
+        partner_index = graph.partner_index(index)
+        if partner_index != NO_USER:
+            stack.append((partner_index, depth, True))
+        for child_index in reversed(graph.children_indexes(index)):
+            stack.append((child_index, depth + 1, False))
+        parent_index = graph.parent_index(index)
+        if expand_upwards and add_parent and parent_index != NO_USER:
+            stack.append((parent_index, depth - 1, True))
+
+
+def breadth_first(graph, start:int, include=None, max_depth:int=None, max_nodes:int=None, cancel=None):
+    '''
+    Walks everyone linked to the start user in any way, nearest first
+    Yields (index, distance) pairs, where distance is the number of links from the start user
+
+    Params:
+        graph: FamilyGraph
+            The graph to walk
+        start: int
+            The index of the user to start from
+        include: callable = None
+            Given a Discord ID, whether or not that user should be walked
+        max_depth: int = None
+            The most links away from the start user that will be walked
+        max_nodes: int = None
+            The most users that will be walked before TraversalLimitReached is raised
+        cancel: threading.Event = None
+            When set, the walk raises TraversalCancelled at the next user
+    '''
+
+    visited = {start}
+    queue = deque([(start, 0)])
+    while queue:
+        index, distance = queue.popleft()
+        check_cancelled(cancel)
+        yield index, distance
+        if max_depth is not None and distance >= max_depth:
+            continue
+        for neighbour in graph.neighbour_indexes(index):
+            if neighbour in visited:
+                continue
+            if include is not None and not include(graph.user_id(neighbour)):
+                continue
+            if max_nodes is not None and len(visited) >= max_nodes:
+                raise TraversalLimitReached()
+            visited.add(neighbour)
+            queue.append((neighbour, distance + 1))
+
+
+def find_root(graph, start:int, include=None, cancel=None) -> int:
+    '''
+    Walks up a single line of the family to its eldest member
+    Goes through a partner's parent when a user has no parent of their own, and
+    stops rather than spinning forever if there's a loop in the tree
+
+    Params:
+        graph: FamilyGraph
+            The graph to walk
+        start: int
+            The index of the user to start from
+        include: callable = None
+            Given a Discord ID, whether or not that user can be walked to
+        cancel: threading.Event = None
+            When set, the walk raises TraversalCancelled
+    '''
+
+    def allowed(index):
+        return index != NO_USER and (include is None or include(graph.user_id(index)))
+
+    root = start
+    visited = {start}
+    while True:
+        check_cancelled(cancel)
+        parent_index = graph.parent_index(root)
+        partner_index = graph.partner_index(root)
+        if allowed(parent_index):
+            next_root = parent_index
+        elif allowed(partner_index) and allowed(graph.parent_index(partner_index)):
+            next_root = graph.parent_index(partner_index)
+        else:
+            return root
+        if next_root in visited:
+            return root
+        visited.add(next_root)
+        root = next_root
@@ -0,0 +1,102 @@
+class GuildMembers(object):
+    '''
+    An index of which user IDs are in which guild
+    This is filled from the raw gateway events (see cogs/member_event.py) rather than
+    from the library's member cache, so it still works with that cache turned off
+    '''
+
+    all_guilds = {}  # guild_id: set of user IDs
+    member_counts = {}  # guild_id: the member count Discord last gave
+    versions = {}  # guild_id: a counter that goes up whenever the members change
+
+
+    @classmethod
+    def get(cls, guild_id:int) -> set:
+        '''
+        Gives the set of member IDs for a guild, or None if it hasn't been fully indexed yet
+        '''
+
+        members = cls.all_guilds.get(guild_id)
+        if members is None or len(members) < cls.member_counts.get(guild_id, 0):
+            return None
+        return members
+
+
+    @classmethod
+    def start(cls, guild_id:int, member_count:int, *user_ids:int):
+        '''
+        Starts a fresh index for a guild, which is complete once it has member_count users
+        '''
+
+        cls.all_guilds[guild_id] = set(user_ids)
+        cls.member_counts[guild_id] = member_count
+        cls.versions[guild_id] = cls.versions.get(guild_id, 0) + 1
+
+
+    @classmethod
+    def add(cls, guild_id:int, *user_ids:int, joined:bool=False):
+        '''
+        Adds users to a guild's index - joined should be set for new members, rather
+        than existing members being sent in chunks, so that the member count goes up
+        '''
+
+        cls.all_guilds.setdefault(guild_id, set()).update(user_ids)
+        cls.versions[guild_id] = cls.versions.get(guild_id, 0) + 1
+        if joined and guild_id in cls.member_counts:
+            cls.member_counts[guild_id] += len(user_ids)
+
+
+    @classmethod
+    def remove(cls, guild_id:int, user_id:int):
+        try:
+            cls.all_guilds[guild_id].discard(user_id)
+            cls.member_counts[guild_id] -= 1
+            cls.versions[guild_id] += 1
+        except KeyError:
+            pass
+
+
+    @classmethod
+    def clear(cls, guild_id:int):
+        cls.all_guilds.pop(guild_id, None)
+        cls.member_counts.pop(guild_id, None)
+        cls.versions[guild_id] = cls.versions.get(guild_id, 0) + 1  # Kept rather than reset so that old versions are never reused
+
+
+    @classmethod
+    def version(cls, guild_id:int) -> int:
+        '''
+        Gives a number that changes whenever a guild's members do, or None if
+        the guild hasn't been fully indexed yet
+        '''
+
+        if cls.get(guild_id) is None:
+            return None
+        return cls.versions.get(guild_id, 0)
+
+
+    @classmethod
+    def family_in_guild(cls, graph, user_id:int, guild_id:int) -> set:
+        '''
+        Gives a set holding everyone in a user's family who's also in a given guild,
+        or None if the guild hasn't been indexed
+        When the guild is bigger than the family its own set is given back as it is,
+        since a walk of the family can't reach anyone outside of the family anyway
+        This reads the live component index, so it has to be called from the event loop -
+        a walk on another thread should be handed the result (see FamilyTreeMember.pinned)
+
+        Params:
+            graph: FamilyGraph
+                The graph the user's family is in
+            user_id: int
+                The Discord ID of the user whose family to intersect
+            guild_id: int
+                The ID of the guild to intersect with
+        '''
+
+        members = cls.get(guild_id)
+        if members is None:
+            return None
+        if len(members) <= graph.components.family_size(user_id):
+            return {i for i in list(members) if graph.components.same_family(user_id, i)}  # Listed first as events can change the set mid-loop
+        return members
@@ -0,0 +1,106 @@
+from asyncio import sleep
+from os import listdir
+from os.path import join
+from re import compile, findall, IGNORECASE
+
+from asyncpg.exceptions import LockNotAvailableError
+
+
+MIGRATION_FILE = compile(r'^(\d+)_(\w+)\.sql$')
+CONCURRENT_INDEX = compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)', IGNORECASE)
+ADVISORY_LOCK = 8126375601  # Held while migrating, so only one process does it at a time
+LOCK_TIMEOUT = '5s'  # How long a migration waits on a table lock before giving up and trying again
+LOCK_RETRIES = 5
+
+
+def find_migrations(directory:str) -> list:
+    '''
+    Gives every migration in a directory, in the order they're applied
+
+    Migrations are files named like `0002_family_indexes.sql` - the number is the
+    version, and has to be unique.
+
+    Returns:
+        [(version, name, sql)]
+    '''
+
+    migrations = []
+    for filename in listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if match is None:
+            continue
+        with open(join(directory, filename)) as a:
+            migrations.append((int(match.group(1)), match.group(2), a.read()))
+    migrations.sort()
+    versions = [i[0] for i in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Two migrations in {directory} have the same version.")
+    return migrations
+
+
+async def run_migrations(database, directory:str) -> list:
+    '''
+    Brings the database up to date with the migrations in a directory, recording each
+    as it's applied in the schema_migrations table
+
+    A migration runs in a single transaction unless it builds an index CONCURRENTLY,
+    which can't be done in one - those are run a statement at a time, and since a
+    CONCURRENTLY build that fails leaves an invalid index behind that IF NOT EXISTS
+    would then skip, any such index the migration makes is dropped first. Everything
+    waits at most LOCK_TIMEOUT for a table lock, then backs off and tries again, so a
+    long-running query elsewhere can't leave a migration queued in front of every
+    other query on the table. Whatever's running the old version of the bot can keep
+    on going throughout.
+
+    Params:
+        database: DatabaseConnection
+        directory: str
+
+    Returns:
+        The (version, name) of each migration that was applied
+    '''
+
+    applied = []
+    async with database() as db:
+        await db('SELECT pg_advisory_lock($1)', ADVISORY_LOCK)
+        try:
+            await db('CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER NOT NULL, name VARCHAR(100) NOT NULL, applied_at TIMESTAMP NOT NULL DEFAULT now(), PRIMARY KEY (version))')
+            done = {i['version'] for i in await db('SELECT version FROM schema_migrations')}
+            for version, name, sql in find_migrations(directory):
+                if version in done:
+                    continue
+                for attempt in range(LOCK_RETRIES):
+                    try:
+                        if CONCURRENT_INDEX.search(sql):
+                            await _run_concurrently(db, version, name, sql)
+                        else:
+                            async with db.transaction():
+                                await db.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+                                await db.execute(sql)
+                                await db('INSERT INTO schema_migrations (version, name) VALUES ($1, $2)', version, name)
+                        break
+                    except LockNotAvailableError:
+                        if attempt == LOCK_RETRIES - 1:
+                            raise
+                        await sleep(2 ** attempt)
+                applied.append((version, name))
+        finally:
+            await db('SELECT pg_advisory_unlock($1)', ADVISORY_LOCK)
+    return applied
+
+
+async def _run_concurrently(db, version:int, name:str, sql:str):
+    invalid = await db(
+        'SELECT indexrelid::regclass::text AS name FROM pg_index WHERE NOT indisvalid AND indexrelid::regclass::text=ANY($1::TEXT[])',
+        findall(CONCURRENT_INDEX, sql)
+    )
+    await db.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+    try:
+        for index in invalid:
+            await db.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index["name"]}')
+        for statement in sql.split(';'):
+            if any(line.strip() and not line.strip().startswith('--') for line in statement.splitlines()):
+                await db.execute(statement)
+        await db('INSERT INTO schema_migrations (version, name) VALUES ($1, $2)', version, name)
+    finally:
+        await db.execute('RESET lock_timeout')
@@ -0,0 +1,208 @@
+from asyncio import sleep
+from collections import OrderedDict
+from re import compile
+
+from unidecode import unidecode
+
+from cogs.utils.database import DatabaseUnavailable
+
+
+class NameCache(object):
+    '''
+    A directory of everyone's display name and sanitised tree label, keyed by Discord ID
+
+    Names are kept in the `usernames` table, so the bot doesn't need every member of
+    every guild in its cache to label a tree. An LRU sits in front of the table, and
+    anyone who misses it is looked up in the member cache (if there is one), then in
+    the table - all in one query - and then fetched from Discord, up to `fetch_limit`
+    users per lookup so that a big family of unknowns can't run into the rate limits.
+    Anyone still unknown is labelled with their ID. New and changed names, whether
+    they're from lookups or from gateway events (see UserEvent), are written back to
+    the table in batches by `flush_loop`.
+
+    The label is what goes into DOT scripts and GEDCOM files - the name run through
+    unidecode and NAME_SUBSTITUTION - so it's worked out once per user rather than
+    once per node of every render. Lookups are async, so trees are generated from a
+    FixedNames of the labels they need rather than from this directly.
+
+    Params:
+        bot: CustomBot
+        size: int = 100000
+            The most users to keep in memory
+        fetch_limit: int = 20
+            The most users to fetch from Discord in one lookup
+        flush_interval: float = 30
+            How often to write queued names to the database, in seconds
+    '''
+
+    NAME_SUBSTITUTION = compile(r'[^\x00-\x7F\x80-\xFF\u0100-\u017F\u0180-\u024F\u1E00-\u1EFF]|\"|\(|\)')
+
+
+    def __init__(self, bot, size:int=100000, fetch_limit:int=20, flush_interval:float=30):
+        self.bot = bot
+        self.size = size
+        self.fetch_limit = fetch_limit
+        self.flush_interval = flush_interval
+        self.entries = OrderedDict()  # discord_id: (name, label)
+        self.pending = {}  # discord_id: name, waiting to be written to the database
+
+
+    @classmethod
+    def sanitise(cls, name:str) -> str:
+        '''
+        Gives the tree label for a name
+        '''
+
+        x = cls.NAME_SUBSTITUTION.sub("_", unidecode(name))
+        if len(x) <= 5:
+            x = cls.NAME_SUBSTITUTION.sub("_", name)
+        return x
+
+
+    def _remember(self, user_id:int, name:str) -> tuple:
+        entry = (name, self.sanitise(name))
+        self.entries[user_id] = entry
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return entry
+
+
+    def update(self, user_id:int, name:str) -> bool:
+        '''
+        Stores a user's current name, queueing it to be written to the database if it's new
+
+        Returns:
+            bool
+                Whether or not the user had a different name in memory before this
+        '''
+
+        entry = self.entries.get(user_id)
+        if entry != None and entry[0] == name:
+            return False
+        self._remember(user_id, name)
+        self.pending[user_id] = name
+        return entry != None
+
+
+    def invalidate(self, user_id:int):
+        '''
+        Drops a user's name from memory, so that it's looked up again next time
+        '''
+
+        self.entries.pop(user_id, None)
+
+
+    async def _lookup(self, user_ids) -> dict:
+        found = {}  # discord_id: (name, label)
+        missing = []
+
+        # Memory, then the member cache
+        for user_id in set(user_ids):
+            entry = self.entries.get(user_id)
+            if entry != None:
+                self.entries.move_to_end(user_id)
+                found[user_id] = entry
+                continue
+            user = self.bot.get_user(user_id)
+            if user == None:
+                missing.append(user_id)
+                continue
+            self.update(user_id, str(user))
+            found[user_id] = self.entries[user_id]
+
+        # Then the database, in one go
+        if missing:
+            try:
+                async with self.bot.database() as db:
+                    rows = await db('SELECT user_id, name FROM usernames WHERE user_id=ANY($1::BIGINT[])', missing)
+            except DatabaseUnavailable:
+                rows = []
+            for row in rows:
+                found[row['user_id']] = self._remember(row['user_id'], row['name'])
+            missing = [i for i in missing if i not in found]
+
+        # Then Discord, for a few of whoever's left
+        for user_id in missing[:self.fetch_limit]:
+            try:
+                user = await self.bot.get_user_info(user_id)
+            except Exception:
+                continue
+            self.update(user_id, str(user))
+            found[user_id] = self.entries[user_id]
+        return found
+
+
+    async def names(self, user_ids) -> dict:
+        '''
+        Gives a dict of discord_id: display name (ie name#discriminator) for the given users
+        '''
+
+        found = await self._lookup(user_ids)
+        return {i: found[i][0] if i in found else str(i) for i in user_ids}
+
+
+    async def labels(self, user_ids) -> dict:
+        '''
+        Gives a dict of discord_id: tree label for the given users
+        '''
+
+        found = await self._lookup(user_ids)
+        return {i: found[i][1] if i in found else str(i) for i in user_ids}
+
+
+    async def flush(self):
+        '''
+        Writes any queued names to the database in a single upsert
+        '''
+
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        try:
+            async with self.bot.database() as db:
+                await db(
+                    'INSERT INTO usernames (user_id, name) SELECT * FROM UNNEST($1::BIGINT[], $2::VARCHAR[]) ON CONFLICT (user_id) DO UPDATE SET name=excluded.name',
+                    list(pending.keys()), list(pending.values())
+                )
+        except Exception:
+            # Put them back for next time, without overwriting anything newer
+            pending.update(self.pending)
+            self.pending = pending
+            raise
+
+
+    async def flush_loop(self):
+        '''
+        Flushes queued names every `flush_interval` seconds until the bot closes
+        '''
+
+        while not self.bot.is_closed():
+            await sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                pass
+
+
+class FixedNames(object):
+    '''
+    Gives labels out of a dict from NameCache.labels - this stands in for the bot (and
+    its name_cache) in FamilyTreeMember.get_name, so that trees can be generated in an
+    executor thread or worker process without looking anything up
+
+    Params:
+        labels: dict
+            discord_id: label
+    '''
+
+    def __init__(self, labels:dict):
+        self.labels = labels
+        self.name_cache = self
+
+
+    def label(self, user_id:int) -> str:
+        try:
+            return self.labels[user_id]
+        except KeyError:
+            return str(user_id)
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from hashlib import sha256
+from os import listdir, makedirs, remove, stat
+from os.path import join
+from threading import Lock
+
+
+class RenderCache(object):
+    '''
+    A two tier cache of rendered family tree images
+
+    The memory tier is a small LRU of image bytes, keyed by whatever identifies
+    a render without having to generate it (family version, theme, guild scope,
+    highlighted user - see Information.treemaker).
+
+    The disk tier is content addressed - each image is stored under a hash of
+    the DOT script it was rendered from - so it's still valid after a restart,
+    and it's kept under a byte limit by removing the least recently used files.
+    It owns every file in its directory, and replaces the hourly `rm` that used
+    to clear that directory out. Reads and writes to it are made through
+    `get_content` and `store`, which are safe to run in an executor so that the
+    disk stays off of the event loop.
+
+    Params:
+        location: str
+            The directory to keep the disk tier in
+        memory_size: int = 128
+            The most images to keep in memory
+        disk_size: int = 536870912
+            The most bytes to keep on disk
+    '''
+
+    def __init__(self, location:str, memory_size:int=128, disk_size:int=512*1024*1024):
+        self.location = location
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.memory = OrderedDict()  # key: image bytes
+        self.disk = OrderedDict()  # filename: size in bytes, oldest first
+        self.disk_used = 0
+        self.disk_lock = Lock()
+        self._load_disk()
+
+
+    def _load_disk(self):
+        '''
+        Picks up whatever's already in the disk tier, oldest first, and trims it to size
+        Anything that isn't one of our images is removed
+        '''
+
+        makedirs(self.location, exist_ok=True)
+        files = []
+        for filename in listdir(self.location):
+            path = join(self.location, filename)
+            if not filename.endswith('.png') or len(filename) != 68:
+                try:
+                    remove(path)
+                except OSError:
+                    pass
+                continue
+            info = stat(path)
+            files.append((info.st_mtime, filename, info.st_size))
+        for _, filename, size in sorted(files):
+            self.disk[filename] = size
+            self.disk_used += size
+        self._trim_disk()
+
+
+    def _trim_disk(self):
+        while self.disk_used > self.disk_size and self.disk:
+            filename, size = self.disk.popitem(last=False)
+            self.disk_used -= size
+            try:
+                remove(join(self.location, filename))
+            except OSError:
+                pass
+
+
+    @staticmethod
+    def content_key(dot_script:str, *render_args:str) -> str:
+        '''
+        Gives the disk tier filename for a DOT script and the arguments it's rendered with
+        '''
+
+        digest = sha256(dot_script.encode('utf-8'))
+        for i in render_args:
+            digest.update(b'\x00' + i.encode('utf-8'))
+        return digest.hexdigest() + '.png'
+
+
+    def get(self, key) -> bytes:
+        '''
+        Gives the image for a memory tier key, or None
+        '''
+
+        if key is None:
+            return None
+        try:
+            self.memory.move_to_end(key)
+        except KeyError:
+            return None
+        return self.memory[key]
+
+
+    def get_content(self, filename:str) -> bytes:
+        '''
+        Gives the image for a disk tier filename, or None
+        '''
+
+        with self.disk_lock:
+            if filename not in self.disk:
+                return None
+            try:
+                with open(join(self.location, filename), 'rb') as a:
+                    data = a.read()
+            except OSError:
+                self.disk_used -= self.disk.pop(filename, 0)
+                return None
+            self.disk.move_to_end(filename)
+            return data
+
+
+    def put(self, key, data:bytes):
+        '''
+        Stores an image in the memory tier - a key of None is ignored
+        '''
+
+        if key is None:
+            return
+        self.memory[key] = data
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+
+    def store(self, filename:str, data:bytes):
+        '''
+        Stores an image in the disk tier, under a filename given by content_key
+        '''
+
+        with self.disk_lock:
+            if filename in self.disk or len(data) > self.disk_size:
+                return
+            try:
+                with open(join(self.location, filename), 'wb') as a:
+                    a.write(data)
+            except OSError:
+                return
+            self.disk[filename] = len(data)
+            self.disk_used += len(data)
+            self._trim_disk()
+
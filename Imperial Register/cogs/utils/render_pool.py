@@ -0,0 +1,94 @@
+from asyncio import Semaphore, create_subprocess_exec, wait_for, TimeoutError
+from asyncio.subprocess import PIPE
+from os import killpg
+from signal import SIGKILL
+
+
+class RenderFailed(Exception):
+    '''
+    Raised when Graphviz exits without giving back an image
+    '''
+
+    pass
+
+
+class RenderTimedOut(RenderFailed):
+    '''
+    Raised when Graphviz takes longer than its timeout, after it's been killed
+    '''
+
+    pass
+
+
+class RenderPool(object):
+    '''
+    A bounded pool of Graphviz workers
+    DOT scripts are piped into `dot` over stdin and the image is read straight off of
+    stdout, so nothing touches the disk, and at most `max_workers` processes run at once
+
+    Params:
+        loop: AbstractEventLoop
+            The loop to run the subprocesses on
+        max_workers: int = 4
+            The most `dot` processes that can be running at the same time
+        executable: str = 'dot'
+            The Graphviz executable to run
+    '''
+
+    def __init__(self, loop, max_workers:int=4, executable:str='dot'):
+        self.loop = loop
+        self.max_workers = max_workers
+        self.executable = executable
+        self.semaphore = Semaphore(max_workers)
+        self.running = 0
+        self.waiting = 0
+
+
+    async def render(self, dot_script:str, *args:str, timeout:float=10.0) -> bytes:
+        '''
+        Renders a DOT script, waiting for a free worker first
+
+        Params:
+            dot_script: str
+                The script to render
+            *args: str
+                Any arguments to give to Graphviz, eg '-Tpng'
+            timeout: float = 10.0
+                The most seconds the render itself can take - the process is
+                killed and RenderTimedOut is raised if it goes over
+        '''
+
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            return await self._run(dot_script, args, timeout)
+        finally:
+            self.running -= 1
+            self.semaphore.release()
+
+
+    async def _run(self, dot_script:str, args:tuple, timeout:float) -> bytes:
+        process = await create_subprocess_exec(
+            self.executable, *args,
+            stdin=PIPE, stdout=PIPE, stderr=PIPE, start_new_session=True
+        )
+        try:
+            stdout, stderr = await wait_for(process.communicate(dot_script.encode('utf-8')), timeout)
+        except TimeoutError:
+            raise RenderTimedOut()
+        finally:
+            # Make sure nothing is left running whatever happened above (eg the command was cancelled)
+            # It's in its own session, so this gets anything it started as well
+            if process.returncode is None:
+                try:
+                    killpg(process.pid, SIGKILL)
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+        if process.returncode != 0 or not stdout:
+            raise RenderFailed(stderr.decode('utf-8', 'replace'))
+        return stdout
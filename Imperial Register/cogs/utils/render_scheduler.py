@@ -0,0 +1,131 @@
+from asyncio import Future, Event as AsyncEvent, shield
+from collections import OrderedDict, deque
+
+
+class RenderShed(Exception):
+    '''
+    Raised when a render isn't let into a saturated queue because of its cost
+    '''
+
+    def __init__(self, cost:int):
+        super().__init__(cost)
+        self.cost = cost
+
+
+class RenderScheduler(object):
+    '''
+    Admission control for tree renders
+
+    Identical renders that are already queued or running are shared rather
+    than being run again. Everything else goes into a queue for its shard and
+    guild, and the workers take from those queues in turn - shards round robin,
+    then the guilds inside each shard round robin - so one busy guild can't
+    hold everyone else up. Once `queue_size` jobs are waiting, anything costing
+    more than `shed_cost` is turned away with RenderShed instead of being left
+    to time out.
+
+    Params:
+        loop: AbstractEventLoop
+            The loop to run the workers on
+        workers: int = 4
+            The number of jobs that can run at once
+        queue_size: int = 50
+            The number of waiting jobs at which the queue counts as saturated
+        shed_cost: int = 3000
+            The cost (nodes plus edges) above which jobs are shed while saturated
+    '''
+
+    def __init__(self, loop, workers:int=4, queue_size:int=50, shed_cost:int=3000):
+        self.loop = loop
+        self.workers = workers
+        self.queue_size = queue_size
+        self.shed_cost = shed_cost
+        self.queues = OrderedDict()  # shard_id: OrderedDict(guild_id: deque of (key, job))
+        self.in_flight = {}  # key: Future
+        self.queued = 0
+        self.wakeup = AsyncEvent()
+        self.worker_tasks = []
+
+
+    def _start(self):
+        self.worker_tasks = [i for i in self.worker_tasks if not i.done()]
+        while len(self.worker_tasks) < self.workers:
+            self.worker_tasks.append(self.loop.create_task(self._worker()))
+
+
+    def _next_job(self):
+        '''
+        Takes the next job fairly from the queues, or gives None if they're empty
+        '''
+
+        while self.queues:
+            shard_id, guilds = next(iter(self.queues.items()))
+            self.queues.move_to_end(shard_id)
+            guild_id, jobs = next(iter(guilds.items()))
+            guilds.move_to_end(guild_id)
+            job = jobs.popleft()
+            if not jobs:
+                del guilds[guild_id]
+            if not guilds:
+                del self.queues[shard_id]
+            self.queued -= 1
+            return job
+        return None
+
+
+    async def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            key, coroutine_function = job
+            future = self.in_flight[key]
+            try:
+                future.set_result(await coroutine_function())
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                del self.in_flight[key]
+
+
+    def is_saturated(self) -> bool:
+        return self.queued >= self.queue_size
+
+
+    async def submit(self, key, coroutine_function, cost:int=0, shard_id:int=None, guild_id:int=None):
+        '''
+        Runs a render through the scheduler, giving back whatever it returns
+
+        Params:
+            key
+                Identifies the render - anything submitted with the same key while
+                it's still queued or running gets the same result
+            coroutine_function: callable
+                Called with no arguments to give the coroutine that does the render
+            cost: int = 0
+                The estimated cost of the render
+            shard_id: int = None
+                The shard the render was asked for on
+            guild_id: int = None
+                The guild the render was asked for in
+
+        Raises:
+            RenderShed
+                If the queue is saturated and the render costs too much to let in
+        '''
+
+        future = self.in_flight.get(key)
+        if future is None:
+            if self.is_saturated() and cost > self.shed_cost:
+                raise RenderShed(cost)
+            future = self.in_flight[key] = self.loop.create_future()
+            guilds = self.queues.setdefault(shard_id, OrderedDict())
+            guilds.setdefault(guild_id, deque()).append((key, coroutine_function))
+            self.queued += 1
+            self._start()
+            self.wakeup.set()
+
+        # Shielded so that one caller giving up doesn't cancel it for everyone else
+        return await shield(future)
@@ -0,0 +1,293 @@
+from asyncio import Event, Lock, TimeoutError, gather, sleep, wait_for
+from json import dumps, loads
+from os import fsync, truncate
+
+from cogs.utils.database import DatabaseUnavailable
+
+
+class WriteJournal(object):
+    '''
+    A write-behind layer for family changes (the `write_behind` config option)
+
+    The family graph is changed as soon as a command's accepted, and the change is
+    appended to a journal file rather than written to the database. Everything appended
+    while the last journal write was going on goes to the journal in a single write and
+    fsync, after which the commands waiting on it can reply. Separately, once there's
+    something in the journal (and at most every `interval` seconds), whatever's in the
+    journal but not yet in the database is written over in one transaction, with one statement per kind of change rather than
+    one per command. Once it's all in the database the journal's emptied. If the bot
+    stops with anything left in the journal it's written over at the next startup,
+    before anything's loaded from the database.
+
+    Every change is written so that running it twice leaves things as running it once
+    did, since a crash between committing and emptying the journal means it'll be run
+    again - so marriages are upserted by marriage_id, and a parent link that's already
+    there is left as it is. A marriage for someone who already has a different valid
+    one, or a parent for someone who already has a different parent, is never written
+    over the top - it's left out, and printed (see `dropped`).
+
+    Params:
+        bot: CustomBot
+        path: str
+            Where to keep the journal
+        interval: float = 0.005
+            The least time between group commits to the database
+        batch_size: int = 1000
+            The most changes to write in a single transaction
+    '''
+
+    STATEMENTS = {
+        'marry': 'INSERT INTO marriages (marriage_id, user_id, partner_id, valid) SELECT new.*, TRUE FROM UNNEST($1::VARCHAR[], $2::BIGINT[], $3::BIGINT[]) AS new(marriage_id, user_id, partner_id) WHERE NOT EXISTS (SELECT 1 FROM marriages WHERE valid=TRUE AND user_id IN (new.user_id, new.partner_id) AND marriage_id<>new.marriage_id) ON CONFLICT (marriage_id, user_id) DO UPDATE SET valid=TRUE RETURNING marriage_id',
+        'divorce': 'UPDATE marriages SET valid=FALSE WHERE valid=TRUE AND user_id=ANY($1::BIGINT[])',
+        'add_child': 'INSERT INTO parents (child_id, parent_id) SELECT * FROM UNNEST($1::BIGINT[], $2::BIGINT[]) ON CONFLICT (child_id) DO UPDATE SET parent_id=excluded.parent_id WHERE parents.parent_id=excluded.parent_id RETURNING child_id',
+        'remove_child': 'DELETE FROM parents USING UNNEST($1::BIGINT[], $2::BIGINT[]) AS removed(child_id, parent_id) WHERE parents.child_id=removed.child_id AND parents.parent_id=removed.parent_id',
+    }
+
+
+    def __init__(self, bot, path:str, interval:float=0.005, batch_size:int=1000):
+        self.bot = bot
+        self.path = path
+        self.interval = interval
+        self.batch_size = batch_size
+        self.file = None
+        self.appended = []  # Changes waiting to be written to the journal
+        self.waiters = []  # Futures for the commands waiting on them
+        self.unsaved = []  # Changes in the journal that aren't in the database yet
+        self.file_lock = Lock()
+        self.commit_lock = Lock()
+        self.wakeup = Event()  # Set when there's something to write to the journal
+        self.saved = Event()  # Set when there's something in the journal to commit
+
+
+    def open(self):
+        '''
+        Opens the journal, picking up anything left in it from last time
+
+        A crash part way through a write leaves a torn line at the end - nobody was
+        told that was saved, so it's cut off rather than left for the next write to be
+        appended onto.
+        '''
+
+        good = 0  # The byte offset of the end of the last whole line
+        try:
+            with open(self.path, 'rb') as a:
+                for line in a:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        self.unsaved.append(loads(line))
+                    except ValueError:
+                        break
+                    good += len(line)
+                end = a.seek(0, 2)
+            if end > good:
+                truncate(self.path, good)
+        except FileNotFoundError:
+            pass
+        self.file = open(self.path, 'a')
+
+
+    async def append(self, kind:str, *args):
+        '''
+        Adds a change to the journal, returning once it's safely on disk
+
+        Params:
+            kind: str
+                One of the keys of STATEMENTS
+            *args
+                marry: marriage_id, user_id, partner_id
+                divorce: user_id, partner_id
+                add_child / remove_child: child_id, parent_id
+        '''
+
+        waiter = self.bot.loop.create_future()
+        self.appended.append([kind, *args])
+        self.waiters.append(waiter)
+        self.wakeup.set()
+        await waiter
+
+
+    def _write(self, changes:list):
+        self.file.write(''.join(dumps(i) + '\n' for i in changes))
+        self.file.flush()
+        fsync(self.file.fileno())
+
+
+    async def sync(self):
+        '''
+        Writes everything appended so far to the journal, and lets its commands carry on
+        '''
+
+        async with self.file_lock:
+            if not self.appended:
+                return
+            changes, self.appended = self.appended, []
+            waiters, self.waiters = self.waiters, []
+            try:
+                await self.bot.loop.run_in_executor(None, self._write, changes)
+            except Exception as e:
+                for waiter in waiters:
+                    waiter.set_exception(e)
+                return
+            self.unsaved.extend(changes)
+            self.saved.set()
+        for waiter in waiters:
+            waiter.set_result(None)
+
+
+    async def commit(self):
+        '''
+        Writes everything in the journal to the database, then empties the journal
+        '''
+
+        async with self.commit_lock:
+            while self.unsaved:
+                batch = self.unsaved[:self.batch_size]
+                try:
+                    async with self.bot.database() as db:
+                        async with db.transaction():
+                            dropped = []
+                            for sql, args in self.statements(batch):
+                                dropped.extend(self.dropped(sql, args, await db(sql, *args)))
+                    for change in dropped:
+                        print(f"Dropped {change} from the journal: they already have a partner or parent in the database")
+                except DatabaseUnavailable:
+                    raise
+                except Exception as e:
+                    # Something in the batch won't go in - save the rest one at a time
+                    print("Error with writing the journal to the database: ", e)
+                    await self._save_singly(batch)
+                del self.unsaved[:len(batch)]
+
+            # Nothing can be written while it's emptied, and anything written since is still to commit
+            async with self.file_lock:
+                if not self.unsaved and self.file.tell():
+                    self.file.truncate(0)
+
+
+    async def _save_singly(self, batch:list):
+        async with self.bot.database() as db:
+            for change in batch:
+                try:
+                    async with db.transaction():
+                        for sql, args in self.statements([change]):
+                            if self.dropped(sql, args, await db(sql, *args)):
+                                print(f"Dropped {change} from the journal: they already have a partner or parent in the database")
+                except DatabaseUnavailable:
+                    raise
+                except Exception as e:
+                    print(f"Dropped {change} from the journal: ", e)
+
+
+    async def flush(self):
+        '''
+        Writes anything appended to the journal, then everything in the journal to the database
+        '''
+
+        await self.sync()
+        await self.commit()
+
+
+    @classmethod
+    def statements(cls, changes:list):
+        '''
+        Turns a list of changes into as few statements as will keep them in order
+
+        Changes are only out of order if they share a user, so each change goes in the
+        level after the last one to touch any of its users, and each level runs as a
+        single statement per kind of change.
+
+        Yields:
+            (sql, args)
+        '''
+
+        levels = []  # [{kind: [change]}]
+        level_of = {}  # discord_id: the level of the last change to touch them
+        for change in changes:
+            user_ids = [i for i in change[1:] if isinstance(i, int)]
+            level = max([level_of.get(i, -1) for i in user_ids]) + 1
+            if level == len(levels):
+                levels.append({})
+            levels[level].setdefault(change[0], []).append(change[1:])
+            for user_id in user_ids:
+                level_of[user_id] = level
+
+        for level in levels:
+            for kind, rows in level.items():
+                if kind == 'marry':
+                    args = (
+                        [i[0] for i in rows] * 2,
+                        [i[1] for i in rows] + [i[2] for i in rows],
+                        [i[2] for i in rows] + [i[1] for i in rows],
+                    )
+                elif kind == 'divorce':
+                    args = ([i[0] for i in rows] + [i[1] for i in rows],)
+                else:
+                    args = ([i[0] for i in rows], [i[1] for i in rows])
+                yield cls.STATEMENTS[kind], args
+
+
+    @classmethod
+    def dropped(cls, sql:str, args:tuple, rows:list) -> list:
+        '''
+        Gives the changes that a statement from `statements` left out, going by the rows
+        it returned - only marriages and parents can be left out
+
+        Returns:
+            A list of changes, as they were given to `append`
+        '''
+
+        if sql == cls.STATEMENTS['marry']:
+            saved = {i['marriage_id'] for i in rows}
+            count = len(args[0]) // 2
+            return [['marry', *i] for i in zip(args[0][:count], args[1][:count], args[2][:count]) if i[0] not in saved]
+        if sql == cls.STATEMENTS['add_child']:
+            saved = {i['child_id'] for i in rows}
+            return [['add_child', *i] for i in zip(*args) if i[0] not in saved]
+        return []
+
+
+    async def flush_loop(self):
+        '''
+        Writes to the journal whenever something's appended, and from the journal to
+        the database whenever there's something in it, until the bot closes
+        '''
+
+        await gather(self._sync_loop(), self._commit_loop())
+
+
+    async def _sync_loop(self):
+        while not self.bot.is_closed():
+            try:
+                await wait_for(self.wakeup.wait(), 1)
+            except TimeoutError:
+                continue
+            self.wakeup.clear()
+            await self.sync()
+
+
+    async def _commit_loop(self):
+        while not self.bot.is_closed():
+            try:
+                await wait_for(self.saved.wait(), 1)
+            except TimeoutError:
+                continue
+            self.saved.clear()
+            try:
+                await self.commit()
+            except Exception:
+                self.saved.set()  # Left in the journal for next time
+                await sleep(1)
+                continue
+            await sleep(self.interval)  # So more can build up for the next group
+
+
+    async def close(self):
+        '''
+        Makes a last try at flushing the journal, then closes it
+        '''
+
+        try:
+            await self.flush()
+        finally:
+            self.file.close()
@@ -0,0 +1,51 @@
+-- Everything from before there were migrations - this is a no-op on a database made from the old
+-- database.sql, and makes the tables on a new one
+
+
+CREATE TABLE IF NOT EXISTS marriages(
+    marriage_id VARCHAR(11) NOT NULL,
+    user_id BIGINT NOT NULL,
+    partner_id BIGINT NOT NULL,
+    valid BOOLEAN NOT NULL,
+    PRIMARY KEY (marriage_id, user_id)
+);
+-- This table will hold marraiges both in date and divorced pairs
+-- marriage_id will be an 11-character string that sorts by when it was made (see DatabaseConnection.make_ids)
+-- user_id will be one of the users involved (the other user will get an entry with an identical marriage_id)
+
+
+CREATE TABLE IF NOT EXISTS parents(
+    child_id BIGINT NOT NULL,
+    parent_id BIGINT NOT NULL,
+    PRIMARY KEY (child_id)
+);
+-- Since a child will only appear once, you can set child_id to the primary key
+-- A parent can have many children, a child will have only one parent
+
+
+CREATE TABLE IF NOT EXISTS blacklisted_guilds(
+    guild_id BIGINT NOT NULL,
+    PRIMARY KEY (guild_id)
+);
+-- Basically a big ol' list of blacklisted guild IDs
+
+
+CREATE TABLE IF NOT EXISTS guild_settings(
+    guild_id BIGINT NOT NULL,
+    prefix VARCHAR(30),
+    PRIMARY KEY (guild_id)
+);
+-- A config for a guild to change their prefix
+
+
+CREATE TABLE IF NOT EXISTS customisation(
+    user_id BIGINT NOT NULL,
+    edge INTEGER DEFAULT NULL,
+    node INTEGER DEFAULT NULL,
+    font INTEGER DEFAULT NULL,
+    highlighted_font INTEGER DEFAULT NULL,
+    highlighted_node INTEGER DEFAULT NULL,
+    background INTEGER DEFAULT NULL,
+    PRIMARY KEY (user_id)
+);
+-- A table for user tree customisations
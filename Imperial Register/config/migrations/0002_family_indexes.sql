@@ -0,0 +1,12 @@
+-- Indexes for finding someone's children and whoever they're married to from the other side of the
+-- link (DatabaseConnection.destroy, GuildEvent.on_guild_remove, Parentage.disown and the lazy family
+-- loader), and for reading only the marriages that are still in place
+-- These are built CONCURRENTLY so that the tables can still be written to while they're made, which
+-- means this file's run a statement at a time rather than in a transaction
+
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS parents_parent_id ON parents (parent_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS marriages_partner_id ON marriages (partner_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS marriages_valid_user_id ON marriages (user_id) WHERE valid;
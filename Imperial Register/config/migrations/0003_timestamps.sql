@@ -0,0 +1,10 @@
+-- When each marriage and parent link was made
+-- Rows from before this are left NULL, since it isn't known - adding the column without a default and
+-- then setting one means neither statement has to rewrite the table
+
+
+ALTER TABLE marriages ADD COLUMN IF NOT EXISTS created_at TIMESTAMP;
+ALTER TABLE marriages ALTER COLUMN created_at SET DEFAULT now();
+
+ALTER TABLE parents ADD COLUMN IF NOT EXISTS created_at TIMESTAMP;
+ALTER TABLE parents ALTER COLUMN created_at SET DEFAULT now();
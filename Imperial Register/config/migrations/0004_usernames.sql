@@ -0,0 +1,8 @@
+-- Everyone's last known name#discriminator, so trees can be labelled without the member cache
+
+
+CREATE TABLE IF NOT EXISTS usernames(
+    user_id BIGINT NOT NULL,
+    name VARCHAR(40) NOT NULL,
+    PRIMARY KEY (user_id)
+);
@@ -0,0 +1,32 @@
+-- Everyone whose marriages, parent or customisation have changed, filled by the triggers below
+-- The bot's family cache file only replays the users changed at or after the transaction it was written at
+-- Keys are logged from both the old and new rows, so a row moving from one user to another marks both
+
+
+CREATE TABLE IF NOT EXISTS family_changes(
+    change_id BIGSERIAL NOT NULL,
+    txid BIGINT NOT NULL DEFAULT txid_current(),
+    user_id BIGINT NOT NULL,
+    PRIMARY KEY (change_id)
+);
+CREATE INDEX IF NOT EXISTS family_changes_txid ON family_changes (txid);
+
+
+
+CREATE OR REPLACE FUNCTION log_family_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        INSERT INTO family_changes (user_id) VALUES ((to_jsonb(OLD) ->> TG_ARGV[0])::BIGINT);
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        INSERT INTO family_changes (user_id) VALUES ((to_jsonb(NEW) ->> TG_ARGV[0])::BIGINT);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS marriages_changed ON marriages;
+CREATE TRIGGER marriages_changed AFTER INSERT OR UPDATE OR DELETE ON marriages FOR EACH ROW EXECUTE PROCEDURE log_family_change('user_id');
+DROP TRIGGER IF EXISTS parents_changed ON parents;
+CREATE TRIGGER parents_changed AFTER INSERT OR UPDATE OR DELETE ON parents FOR EACH ROW EXECUTE PROCEDURE log_family_change('child_id');
+DROP TRIGGER IF EXISTS customisation_changed ON customisation;
+CREATE TRIGGER customisation_changed AFTER INSERT OR UPDATE OR DELETE ON customisation FOR EACH ROW EXECUTE PROCEDURE log_family_change('user_id');
@@ -0,0 +1,129 @@
+from random import Random
+
+from cogs.utils.family_tree.ancestry import find_cycles
+from cogs.utils.family_tree.constants import NO_USER
+from cogs.utils.family_tree.family_graph import FamilyGraph
+
+
+def line_of(graph:FamilyGraph, index:int) -> list:
+    '''
+    Gives a user's parent line the slow way, or None if it goes round a loop
+    '''
+
+    line = [index]
+    while graph.parent_index(line[-1]) != NO_USER:
+        if graph.parent_index(line[-1]) in line:
+            return None
+        line.append(graph.parent_index(line[-1]))
+    return line
+
+
+def check_ancestry(graph:FamilyGraph):
+    ancestry = graph.ancestry
+    for index in range(len(graph)):
+        line = line_of(graph, index)
+        if line is None:
+            assert ancestry.depth(index) == -1
+            continue
+        assert ancestry.depth(index) == len(line) - 1
+        for steps, ancestor in enumerate(line):
+            assert ancestry.lift(index, steps) == ancestor
+        assert ancestry.lift(index, len(line)) == NO_USER
+
+
+def test_depth_and_lift():
+    graph = FamilyGraph()
+    graph.load([], [(i + 1, i) for i in range(1, 40)])
+    assert graph.ancestry.depth(graph.index(40)) == 39
+    assert graph.user_id(graph.ancestry.lift(graph.index(40), 13)) == 27
+    assert graph.ancestry.is_ancestor(graph.index(1), graph.index(40))
+    assert not graph.ancestry.is_ancestor(graph.index(40), graph.index(1))
+    assert not graph.ancestry.is_ancestor(graph.index(5), graph.index(5))
+    check_ancestry(graph)
+
+
+def test_would_create_cycle():
+    graph = FamilyGraph()
+    graph.add_child(1, 2)
+    graph.add_child(2, 3)
+    graph.add_child(1, 4)
+    assert graph.ancestry.would_create_cycle(3, 1)
+    assert graph.ancestry.would_create_cycle(2, 1)
+    assert graph.ancestry.would_create_cycle(5, 5)
+    assert not graph.ancestry.would_create_cycle(4, 3)
+    assert not graph.ancestry.would_create_cycle(3, 4)
+    assert not graph.ancestry.would_create_cycle(5, 1)
+    assert not graph.ancestry.would_create_cycle(1, 5)
+
+
+def test_loop_from_load():
+    graph = FamilyGraph()
+    graph.load([], [(2, 1), (3, 2), (1, 3), (4, 3), (6, 5)])
+    for user_id in (1, 2, 3, 4):
+        assert graph.ancestry.depth(graph.index(user_id)) == -1
+    assert graph.ancestry.is_ancestor(graph.index(1), graph.index(4))
+    assert graph.ancestry.would_create_cycle(4, 1)
+    assert not graph.ancestry.is_ancestor(graph.index(5), graph.index(4))
+    check_ancestry(graph)
+    cycles = find_cycles(graph)
+    assert [sorted(graph.user_id(i) for i in cycle) for cycle in cycles] == [[1, 2, 3]]
+
+
+def test_loop_from_add_child():
+    graph = FamilyGraph()
+    graph.add_child(1, 2)
+    graph.add_child(2, 3)
+    graph.add_child(3, 4)
+
+    # add_child doesn't check for loops itself (the commands do), so one can be made
+    graph.add_child(3, 1)
+    for user_id in (1, 2, 3, 4):
+        assert graph.ancestry.depth(graph.index(user_id)) == -1
+    check_ancestry(graph)
+
+    # Breaking it gives everyone their depth back
+    graph.remove_child(2, 3)
+    assert graph.ancestry.depth(graph.index(2)) == 2
+    assert graph.ancestry.depth(graph.index(4)) == 1
+    assert find_cycles(graph) == []
+    check_ancestry(graph)
+
+
+def test_updates_match_rebuild():
+    rng = Random(4)
+    for _ in range(30):
+        graph = FamilyGraph()
+        user_count = rng.randrange(5, 30)
+        graph.load([], [(i, rng.randrange(i)) for i in range(1, user_count) if rng.random() < 0.7])
+        for _ in range(60):
+            parent_id, child_id = rng.randrange(user_count + 5), rng.randrange(user_count + 5)
+            kind = rng.random()
+            if kind < 0.5 and parent_id != child_id:
+                graph.add_child(parent_id, child_id)  # Loops and all
+            elif kind < 0.8 and graph.parent_of(child_id) is not None:
+                graph.remove_child(graph.parent_of(child_id), child_id)
+            elif kind < 0.9:
+                graph.destroy(parent_id)
+            check_ancestry(graph)
+            looped = {i for i in range(len(graph)) if line_of(graph, i) is None}
+            in_cycles = {i for cycle in find_cycles(graph) for i in cycle}
+            assert in_cycles <= looped
+
+
+def test_lowest_common_ancestor():
+    rng = Random(5)
+    graph = FamilyGraph()
+    graph.load([], [(i, rng.randrange(max(i - 5, 1), i)) for i in range(2, 300)] + [(1001, 1000)])
+    for _ in range(500):
+        index_a, index_b = rng.randrange(len(graph)), rng.randrange(len(graph))
+        line_a, line_b = line_of(graph, index_a), line_of(graph, index_b)
+        expected = next((i for i in line_a if i in line_b), NO_USER)
+        assert graph.ancestry.lowest_common_ancestor(index_a, index_b) == expected
+    assert graph.ancestry.lowest_common_ancestor(graph.index(1001), graph.index(5)) == NO_USER
+    assert graph.ancestry.lowest_common_ancestor(graph.index(1001), graph.index(1000)) == graph.index(1000)
+
+
+def test_lowest_common_ancestor_in_a_loop():
+    graph = FamilyGraph()
+    graph.load([], [(2, 1), (3, 2), (1, 3), (4, 1)])
+    assert graph.ancestry.lowest_common_ancestor(graph.index(4), graph.index(2)) == NO_USER
@@ -0,0 +1,156 @@
+from collections import deque
+from random import Random
+
+from cogs.utils.family_tree.family_graph import FamilyGraph
+
+
+def families(graph:FamilyGraph) -> dict:
+    '''
+    Works out every user's family the slow way, as {discord_id: frozenset(discord_id)}
+    '''
+
+    family_of = {}
+    for start in range(len(graph)):
+        if graph.user_id(start) in family_of:
+            continue
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for neighbour in graph.neighbour_indexes(queue.popleft()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        family = frozenset(graph.user_id(i) for i in seen)
+        for user_id in family:
+            family_of[user_id] = family
+    return family_of
+
+
+def check_components(graph:FamilyGraph):
+    family_of = families(graph)
+    for user_id, family in family_of.items():
+        assert graph.components.family_size(user_id) == len(family)
+        for other_id in family:
+            assert graph.components.same_family(user_id, other_id)
+            assert graph.components.version(user_id) == graph.components.version(other_id)
+    for user_id in family_of:
+        for other_id in family_of:
+            if family_of[user_id] is not family_of[other_id]:
+                assert not graph.components.same_family(user_id, other_id)
+
+
+def test_merge():
+    graph = FamilyGraph()
+    graph.marry(1, 2)
+    graph.add_child(1, 3)
+    graph.add_child(4, 5)
+    assert graph.components.same_family(2, 3)
+    assert not graph.components.same_family(3, 5)
+    assert graph.components.family_size(1) == 3
+
+    graph.add_child(3, 4)
+    assert graph.components.same_family(2, 5)
+    assert graph.components.family_size(5) == 5
+    check_components(graph)
+
+
+def test_split():
+    graph = FamilyGraph()
+    graph.marry(1, 2)
+    graph.add_child(1, 3)
+    graph.add_child(3, 4)
+
+    graph.remove_child(1, 3)
+    assert graph.components.same_family(1, 2)
+    assert graph.components.same_family(3, 4)
+    assert not graph.components.same_family(2, 4)
+    assert graph.components.family_size(1) == 2
+
+    graph.divorce(1)
+    assert not graph.components.same_family(1, 2)
+    assert graph.components.family_size(2) == 1
+    check_components(graph)
+
+
+def test_unknown_users():
+    graph = FamilyGraph()
+    graph.marry(1, 2)
+    assert graph.components.same_family(9, 9)
+    assert not graph.components.same_family(1, 9)
+    assert graph.components.family_size(9) == 1
+    assert graph.components.version(9) == 0
+
+
+def test_version_changes_with_family():
+    graph = FamilyGraph()
+    graph.marry(1, 2)
+    graph.marry(3, 4)
+    first, other = graph.components.version(1), graph.components.version(3)
+
+    graph.add_child(1, 5)
+    assert graph.components.version(1) > first
+    assert graph.components.version(3) == other
+
+
+def test_version_changes_on_split():
+    graph = FamilyGraph()
+    graph.marry(1, 2)
+    graph.add_child(2, 3)
+    graph.marry(4, 5)
+    before, other = graph.components.version(1), graph.components.version(4)
+
+    graph.remove_child(2, 3)
+    assert graph.components.version(1) > before
+    assert graph.components.version(3) > before
+    assert graph.components.version(1) != graph.components.version(3)
+    assert graph.components.version(4) == other
+
+
+def test_version_never_reused():
+    graph = FamilyGraph()
+    graph.marry(1, 2)
+    seen = {graph.components.version(1)}
+    for _ in range(5):
+        graph.divorce(1)
+        seen.add(graph.components.version(1))
+        seen.add(graph.components.version(2))
+        graph.marry(1, 2)
+        assert graph.components.version(1) not in seen
+        seen.add(graph.components.version(1))
+
+
+def test_touch():
+    graph = FamilyGraph()
+    graph.marry(1, 2)
+    graph.marry(3, 4)
+    before, other = graph.components.version(2), graph.components.version(3)
+    graph.components.touch(1)
+    assert graph.components.version(2) > before
+    assert graph.components.version(3) == other
+
+
+def test_rebuild_matches_updates():
+    rng = Random(1)
+    graph = FamilyGraph()
+    for _ in range(300):
+        user_id, other_id = rng.randrange(40), rng.randrange(40)
+        kind = rng.random()
+        if user_id == other_id:
+            continue
+        if kind < 0.3 and graph.partner_of(user_id) is None and graph.partner_of(other_id) is None:
+            graph.marry(user_id, other_id)
+        elif kind < 0.45:
+            graph.divorce(user_id)
+        elif kind < 0.8 and not graph.ancestry.would_create_cycle(user_id, other_id):
+            graph.add_child(user_id, other_id)
+        elif kind < 0.95 and graph.parent_of(other_id) is not None:
+            graph.remove_child(graph.parent_of(other_id), other_id)
+        elif kind >= 0.95:
+            graph.destroy(user_id)
+        check_components(graph)
+
+    versions = {i: graph.components.version(i) for i in graph.users()}
+    graph.components.rebuild()
+    check_components(graph)
+    for user_id, version in versions.items():
+        assert graph.components.version(user_id) > version
@@ -0,0 +1,51 @@
+'''
+These need a PostgreSQL database to run against, given as a DSN in the
+TEST_DATABASE_DSN environment variable. They're skipped without one.
+'''
+
+from asyncio import new_event_loop, sleep
+from os import environ
+
+import pytest
+
+from cogs.utils.database import DatabaseConnection
+
+
+DSN = environ.get('TEST_DATABASE_DSN')
+
+
+@pytest.fixture
+def loop():
+    if DSN is None:
+        pytest.skip("TEST_DATABASE_DSN isn't set")
+    loop = new_event_loop()
+    old_config = DatabaseConnection.config
+    DatabaseConnection.config = {'dsn': DSN, 'min_size': 1, 'max_size': 2}
+    yield loop
+    loop.run_until_complete(DatabaseConnection.close_pool())
+    DatabaseConnection.config = old_config
+    DatabaseConnection.last_used.clear()
+    DatabaseConnection.pool_lock = None
+    loop.close()
+
+
+def test_hot_statements_are_prepared(loop):
+    async def main():
+        async with DatabaseConnection() as db:
+            return len(db.db._con._stmt_cache)
+
+    assert loop.run_until_complete(main()) >= len(DatabaseConnection.HOT_STATEMENTS)
+
+
+def test_closed_connections_are_forgotten(loop):
+    async def main():
+        async with DatabaseConnection() as db:
+            pid = db.db.get_server_pid()
+            assert pid in DatabaseConnection.last_used
+            db.db.terminate()
+            await sleep(0)
+        await sleep(0.1)
+        return pid
+
+    pid = loop.run_until_complete(main())
+    assert pid not in DatabaseConnection.last_used
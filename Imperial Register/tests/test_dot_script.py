@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+from re import sub
+
+import pytest
+
+from cogs.utils.family_tree.family_graph import FamilyGraph
+from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+from cogs.utils.name_cache import FixedNames
+
+
+# The output of the emitter from before it was made linear, on a set of fixed families
+# Its couple nodes were random strings, so they're named N0, N1... in order of appearance
+GOLDEN = json.loads((Path(__file__).parent / 'golden' / 'dot_script.json').read_text())
+
+
+class Guild(object):
+
+    def __init__(self, members:list):
+        self.id = -1  # Never indexed, so the filter goes through get_member
+        self.members = set(members)
+
+    def get_member(self, user_id:int):
+        return user_id if user_id in self.members else None
+
+
+def normalise(dot:str) -> str:
+    '''
+    Names the couple nodes (and the h-prefixed nodes their children hang from) in order of appearance
+    '''
+
+    names = {}
+    return sub(r'\b(h?)(p\d+)\b', lambda m: m.group(1) + names.setdefault(m.group(2), f"N{len(names)}"), dot)
+
+
+@pytest.fixture(autouse=True)
+def graph():
+    old_graph = FamilyTreeMember.graph
+    FamilyTreeMember.graph = FamilyGraph()
+    yield FamilyTreeMember.graph
+    FamilyTreeMember.graph = old_graph
+
+
+@pytest.mark.parametrize('case', GOLDEN, ids=[f"{i['name']}-{i['user']}" for i in GOLDEN])
+def test_matches_the_old_emitter(graph, case):
+    graph.load([tuple(i) for i in case['marriages']], [tuple(i) for i in case['parents']])
+    guild = None if case['guild'] is None else Guild(case['guild'])
+    dot = FamilyTreeMember.get(case['user']).to_dot_script(FixedNames({}), guild)
+    assert normalise(dot) == case['dot']
+
+
+def test_pinned_matches_live(graph):
+    case = next(i for i in GOLDEN if i['name'] == 'in_laws')
+    graph.load([tuple(i) for i in case['marriages']], [tuple(i) for i in case['parents']])
+    user = FamilyTreeMember.get(case['user'])
+    pinned = user.pinned()
+    graph.destroy(case['user'])
+    assert normalise(pinned.to_dot_script(FixedNames({}))) == case['dot']
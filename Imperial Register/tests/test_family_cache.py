@@ -0,0 +1,85 @@
+from asyncio import new_event_loop, set_event_loop, sleep
+
+import pytest
+
+from cogs.utils.custom_bot import CustomBot
+from cogs.utils.family_tree.cache_file import read_cache_file
+from cogs.utils.family_tree.family_graph import FamilyGraph
+from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+
+
+class Bot(object):
+    '''
+    Just the parts of CustomBot that save_family_cache uses
+    '''
+
+    family_write = CustomBot.family_write
+    save_family_cache = CustomBot.save_family_cache
+
+    def __init__(self, loop, path:str):
+        self.config = {'family_cache_file': path}
+        self.family_cache_loaded = True
+        self.family_writes = set()
+        self.loop = loop
+        self.queries = []
+
+    def database(self):
+        return self
+
+    async def __aenter__(self):
+        return self.query
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def query(self, sql:str, *args):
+        self.queries.append(sql)
+        return [{'watermark': 100}]
+
+
+@pytest.fixture
+def loop():
+    loop = new_event_loop()
+    set_event_loop(loop)
+    old_graph = FamilyTreeMember.graph
+    FamilyTreeMember.graph = FamilyGraph()
+    yield loop
+    FamilyTreeMember.graph = old_graph
+    loop.close()
+
+
+def test_save_waits_for_writes_in_flight(loop, tmp_path):
+    path = str(tmp_path / 'family.cache')
+    bot = Bot(loop, path)
+
+    async def marry():
+        async with bot.family_write():
+            await sleep(0.05)  # The database write, committed before the watermark
+            FamilyTreeMember.graph.marry(1, 2)
+
+    async def main():
+        write = loop.create_task(marry())
+        await sleep(0)
+        await bot.save_family_cache()
+        await write
+
+    loop.run_until_complete(main())
+    assert not bot.family_writes
+    watermark, graph_data, _ = read_cache_file(path)
+    assert watermark == 100
+    graph = FamilyGraph()
+    graph.restore(graph_data)
+    assert graph.partner_of(1) == 2
+    assert bot.queries[-1] == 'DELETE FROM family_changes WHERE txid < $1'
+
+
+def test_family_write_finishes_when_it_fails(loop):
+    bot = Bot(loop, None)
+
+    async def main():
+        with pytest.raises(ValueError):
+            async with bot.family_write():
+                raise ValueError()
+
+    loop.run_until_complete(main())
+    assert not bot.family_writes
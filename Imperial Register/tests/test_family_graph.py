@@ -0,0 +1,248 @@
+from random import Random
+
+from cogs.utils.family_tree.cache_file import read_cache_file, write_cache_file
+from cogs.utils.family_tree.family_graph import FamilyGraph
+
+
+def test_marry_and_divorce():
+    graph = FamilyGraph()
+    graph.marry(1, 2)
+    assert graph.partner_of(1) == 2
+    assert graph.partner_of(2) == 1
+    graph.divorce(2)
+    assert graph.partner_of(1) is None
+    assert graph.partner_of(2) is None
+    assert graph.partner_of(3) is None
+
+
+def test_add_child_replaces_parent():
+    graph = FamilyGraph()
+    graph.add_child(1, 3)
+    graph.add_child(1, 4)
+    assert graph.children_of(1) == [3, 4]
+    graph.add_child(2, 3)
+    assert graph.parent_of(3) == 2
+    assert graph.children_of(1) == [4]
+    assert graph.children_of(2) == [3]
+
+
+def test_remove_child_needs_the_right_parent():
+    graph = FamilyGraph()
+    graph.add_child(1, 3)
+    graph.remove_child(2, 3)
+    assert graph.parent_of(3) == 1
+    graph.remove_child(1, 3)
+    assert graph.parent_of(3) is None
+    assert graph.children_of(1) == []
+
+
+def test_destroy():
+    graph = FamilyGraph()
+    graph.marry(1, 2)
+    graph.add_child(5, 1)
+    graph.add_child(1, 3)
+    graph.add_child(1, 4)
+    graph.destroy(1)
+    assert graph.partner_of(2) is None
+    assert graph.children_of(5) == []
+    assert graph.parent_of(3) is None
+    assert graph.parent_of(4) is None
+    assert 1 not in set(graph.users())
+
+
+def test_load_keeps_child_order():
+    graph = FamilyGraph()
+    graph.load([(1, 2)], [(30, 1), (10, 1), (20, 1), (40, 2)])
+    assert graph.partner_of(2) == 1
+    assert graph.children_of(1) == [30, 10, 20]
+    assert graph.parent_of(40) == 2
+    assert graph.links() == ([(1, 2)], [(30, 1), (10, 1), (20, 1), (40, 2)])
+
+
+def test_compact_drops_empty_users():
+    graph = FamilyGraph()
+    graph.load([(1, 2)], [(3, 1)])
+    graph.add_child(1, 9)
+    graph.marry(7, 8)
+    graph.destroy(2)
+    links = graph.links()
+    assert graph._overflow and graph._child_overlay
+    graph.compact()
+    assert not graph._overflow and not graph._child_overlay
+    assert graph.links() == links
+    assert graph.index(2) is None
+    assert sorted(graph.users()) == [1, 3, 7, 8, 9]
+
+
+def test_pinned_version_doesnt_change():
+    graph = FamilyGraph()
+    graph.load([(1, 2)], [(3, 1)])
+    graph.add_child(1, 4)
+    pinned = graph.pin()
+    assert graph.pin() is pinned
+
+    graph.divorce(1)
+    graph.add_child(2, 3)
+    graph.add_child(4, 5)
+    graph.destroy(4)
+    assert pinned.partner_of(1) == 2
+    assert pinned.parent_of(3) == 1
+    assert pinned.children_of(1) == [3, 4]
+    assert pinned.index(5) is None
+    assert graph.pin() is not pinned
+    assert graph.parent_of(3) == 2
+
+
+def test_links_changed_since():
+    graph = FamilyGraph()
+    graph.load([(1, 2)], [(3, 1)])
+    version = graph.version
+    graph.add_child(2, 3)
+    graph.marry(4, 5)
+    changed = graph.links_changed_since(version)
+    assert [graph.user_id(i) for i in changed] == sorted([3, 4, 5], key=graph.index)
+    assert graph.links_changed_since(graph.version) == []
+
+
+def make_graph(seed:int, user_count:int=200, extra:int=50) -> FamilyGraph:
+    '''
+    Makes a graph that's been loaded and then changed, so that it has users in the
+    sorted base as well as in the overflow and child overlay
+    '''
+
+    rng = Random(seed)
+    user_ids = rng.sample(range(10 ** 17, 10 ** 18), user_count + extra)
+    partnerships = [(user_ids[i], user_ids[i + 1]) for i in range(0, user_count // 2, 2)]
+    parents = [(user_ids[i], user_ids[rng.randrange(i)]) for i in range(1, user_count) if rng.random() < 0.6]
+    graph = FamilyGraph()
+    graph.load(partnerships, parents)
+    for user_id in user_ids[user_count:]:
+        other_id = rng.choice(user_ids[:user_count])
+        if rng.random() < 0.5 and graph.partner_of(other_id) is None:
+            graph.marry(user_id, other_id)
+        elif not graph.ancestry.would_create_cycle(other_id, user_id):
+            graph.add_child(other_id, user_id)
+    child_id = next(i for i in reversed(user_ids) if graph.parent_of(i) is not None)
+    graph.remove_child(graph.parent_of(child_id), child_id)
+    graph.destroy(user_ids[5])
+    return graph
+
+
+def state(graph:FamilyGraph) -> dict:
+    '''
+    Gives everything about each user that should survive a dump and restore
+    '''
+
+    users = {}
+    for user_id in graph.users():
+        index = graph.index(user_id)
+        users[user_id] = (
+            graph.partner_of(user_id),
+            graph.parent_of(user_id),
+            sorted(graph.children_of(user_id)),
+            graph.components.family_size(user_id),
+            graph.ancestry.depth(index),
+            graph.subtrees.descendant_count(index),
+            graph.subtrees.descendant_depth(index),
+            graph.user_id(graph.subtrees.root(index)),
+        )
+    return users
+
+
+def families(graph:FamilyGraph) -> set:
+    by_root = {}
+    for user_id in graph.users():
+        by_root.setdefault(graph.components.find(graph.index(user_id)), set()).add(user_id)
+    return {frozenset(i) for i in by_root.values()}
+
+
+def test_round_trip():
+    graph = make_graph(1)
+    assert graph._overflow and graph._child_overlay
+    restored = FamilyGraph()
+    restored.restore(graph.dump())
+    assert state(restored) == state(graph)
+    assert families(restored) == families(graph)
+    assert restored.links() == graph.links()
+    assert restored.version > graph.version
+    assert restored.base_version > graph.base_version
+
+
+def test_round_trip_keeps_versions():
+    graph = make_graph(2)
+    restored = FamilyGraph()
+    restored.restore(graph.dump())
+    for user_id in graph.users():
+        assert restored.components.version(user_id) == graph.components.version(user_id)
+
+    # And they still only go up afterwards
+    user_id = next(iter(graph.users()))
+    before = restored.components.version(user_id)
+    restored.components.touch(user_id)
+    assert restored.components.version(user_id) > before
+
+
+def test_restored_graph_keeps_working():
+    graph = make_graph(3)
+    restored = FamilyGraph()
+    restored.restore(graph.dump())
+    for changed in (graph, restored):
+        changed.marry(1, 2)
+        changed.add_child(1, 3)
+        changed.add_child(3, 4)
+        changed.divorce(next(iter(changed.users())))
+    assert state(restored) == state(graph)
+    restored.compact()
+    assert state(restored) == state(graph)
+
+
+def test_dump_is_a_snapshot():
+    graph = make_graph(4)
+    data = graph.dump()
+    expected = state(graph)
+    graph.add_child(1, 2)
+    graph.divorce(next(iter(graph.users())))
+    restored = FamilyGraph()
+    restored.restore(data)
+    assert state(restored) == expected
+
+
+def test_restore_compacts():
+    graph = FamilyGraph()
+    graph.load([], [(2, 1)])
+    for user_id in range(10, 2010, 2):
+        graph.marry(user_id, user_id + 1)
+    assert graph.needs_compacting()
+    expected = state(graph)
+    restored = FamilyGraph()
+    restored.restore(graph.dump())
+    assert not restored.needs_compacting()
+    assert not restored._overflow
+    assert state(restored) == expected
+
+
+def test_empty_round_trip():
+    restored = FamilyGraph()
+    restored.restore(FamilyGraph().dump())
+    assert len(restored) == 0
+    assert list(restored.users()) == []
+
+
+def test_cache_file_round_trip(tmp_path):
+    graph = make_graph(5)
+    customisations = {1: {'edge': 255, 'node': None, 'font': 0, 'highlighted_font': None, 'highlighted_node': 7, 'background': None}}
+    path = str(tmp_path / 'family.cache')
+    write_cache_file(path, 42, graph.dump(), customisations)
+    watermark, data, read_customisations = read_cache_file(path)
+    assert watermark == 42
+    assert read_customisations == customisations
+    restored = FamilyGraph()
+    restored.restore(data)
+    assert state(restored) == state(graph)
+
+
+def test_cache_file_unreadable(tmp_path):
+    path = tmp_path / 'family.cache'
+    assert read_cache_file(str(path)) is None
+    path.write_bytes(b'not a cache file')
+    assert read_cache_file(str(path)) is None
@@ -0,0 +1,138 @@
+from gzip import decompress
+from io import BytesIO
+from random import Random
+from re import match, findall
+from threading import Event
+
+import pytest
+
+from cogs.utils.family_tree.family_graph import FamilyGraph
+from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+from cogs.utils.family_tree.traversal import TraversalCancelled
+from cogs.utils.name_cache import FixedNames
+
+
+@pytest.fixture(autouse=True)
+def graph():
+    old_graph = FamilyTreeMember.graph
+    FamilyTreeMember.graph = FamilyGraph()
+    yield FamilyTreeMember.graph
+    FamilyTreeMember.graph = old_graph
+
+
+def write(user_id:int, compress:bool=False, cancel:Event=None) -> str:
+    output = BytesIO()
+    FamilyTreeMember.get(user_id).to_gedcom_file(FixedNames({}), output, compress, cancel)
+    data = output.getvalue()
+    return (decompress(data) if compress else data).decode('utf-8')
+
+
+def records(text:str) -> dict:
+    '''
+    Splits a file into {xref: [line, ...]}, checking that every reference has a record
+    '''
+
+    lines = text.split('\n')
+    assert lines[-2:] == ['0 TRLR', '']
+    found = {}
+    current = None
+    for line in lines[:-1]:
+        record = match(r'0 (@[IF]\d+@) (INDI|FAM)$', line)
+        if record:
+            assert record.group(1) not in found
+            current = found[record.group(1)] = []
+        elif line.startswith('0 '):
+            current = None
+        elif current is not None:
+            current.append(line.strip())
+    assert set(findall(r'@[IF]\d+@', text)) == set(found)
+    return found
+
+
+def random_family(rng:Random, size:int) -> tuple:
+    '''
+    Gives (marriages, parents) for a family that keeps to the bot's rules - nobody marries
+    or adopts someone they're already related to
+    '''
+
+    families = list(range(size))
+
+    def find(user_id):
+        while families[user_id] != user_id:
+            user_id = families[user_id]
+        return user_id
+
+    marriages, parents = [], []
+    partnered, parented = set(), set()
+    for _ in range(size * 3):
+        a, b = rng.randrange(size), rng.randrange(size)
+        if a == b or find(a) == find(b):
+            continue
+        if rng.random() < 0.4:
+            if a in partnered or b in partnered:
+                continue
+            partnered.update((a, b))
+            marriages.append((a, b))
+        else:
+            if b in parented:
+                continue
+            parented.add(b)
+            parents.append((b, a))
+        families[find(a)] = find(b)
+    return marriages, parents
+
+
+def test_header():
+    text = write(1)
+    assert text.split('\n')[:5] == ['0 HEAD', '\t1 GEDC', '\t\t2 VERS 5.5.1', '\t\t2 FORM LINEAGE-LINKED', '\t1 CHAR UTF-8']
+    assert records(text) == {'@I1@': ['1 NAME 1']}
+
+
+def test_couple_and_children(graph):
+    graph.load([(1, 2)], [(3, 1), (4, 2), (1, 5)])
+    found = records(write(3))
+    names = {int(lines[0].split()[2]): xref for xref, lines in found.items() if xref.startswith('@I')}
+    assert set(names) == {1, 2, 3, 4, 5}
+
+    # 1 and 2 share one family, holding both of their children
+    family = found[found[names[3]][1].split()[2]]
+    assert found[names[4]][1] == f'1 FAMC {found[names[3]][1].split()[2]}'
+    assert sorted(family) == sorted([f'1 WIFE {names[1]}', f'1 HUSB {names[2]}', f'1 CHIL {names[3]}', f'1 CHIL {names[4]}'])
+    assert f'1 FAMS {found[names[3]][1].split()[2]}' in found[names[1]]
+    assert f'1 FAMS {found[names[3]][1].split()[2]}' in found[names[2]]
+
+    # 5 is in a family of their own with 1
+    assert found[found[names[5]][1].split()[2]] == [f'1 WIFE {names[5]}', f'1 CHIL {names[1]}']
+
+
+def test_random_families(graph):
+    rng = Random(14)
+    for _ in range(40):
+        size = rng.randrange(1, 40)
+        marriages, parents = random_family(rng, size)
+        graph.load(marriages, parents)
+        user_id = rng.randrange(size)
+        compress = rng.random() < 0.5
+        found = records(write(user_id, compress))
+        names = {int(lines[0].split()[2]): xref for xref, lines in found.items() if xref.startswith('@I')}
+        tree = FamilyTreeMember.get(user_id)
+        assert set(names) == {i.id for i in tree.span(add_parent=True, expand_upwards=True)}
+        for person_id, xref in names.items():
+            person = FamilyTreeMember.get(person_id)
+            child_of = [i.split()[2] for i in found[xref] if i.startswith('1 FAMC')]
+            assert child_of == ([] if person.parent is None else [next(i.split()[2] for i in found[names[person.parent.id]] if i.startswith('1 FAMS'))])
+            spouse_of = [i.split()[2] for i in found[xref] if i.startswith('1 FAMS')]
+            if person.partner is None and not person.children:
+                assert spouse_of == []
+                continue
+            family = found[spouse_of[0]]
+            children = person.children + (person.partner.children if person.partner else [])
+            assert sorted(i for i in family if i.startswith('1 CHIL')) == sorted(f'1 CHIL {names[i.id]}' for i in children)
+
+
+def test_cancelled(graph):
+    graph.load([], [(i + 1, i) for i in range(1, 50)])
+    cancel = Event()
+    cancel.set()
+    with pytest.raises(TraversalCancelled):
+        write(1, cancel=cancel)
@@ -0,0 +1,133 @@
+from io import BytesIO
+
+from cogs.utils.family_tree.family_graph import FamilyGraph
+from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+from cogs.utils.family_tree.gedcom_import import read_gedcom, read_mapping, map_links, find_problems, families_changed
+from cogs.utils.name_cache import FixedNames
+
+
+GEDCOM = '''0 HEAD
+1 CHAR UTF-8
+0 @I1@ INDI
+1 NAME Ann /Smith/
+1 REFN 1001
+1 NAME Annie /Smith/
+0 @I2@ INDI
+1 NAME Bob /Jones/
+0 @I3@ INDI
+1 NAME Cat /Jones/
+2 GIVN Cat
+0 @I4@ INDI
+1 NAME Dan
+0 @F1@ FAM
+1 HUSB @I2@
+1 WIFE @I1@
+1 CHIL @I3@
+1 CHIL @I4@
+0 @F2@ FAM
+1 HUSB @I4@
+1 CHIL @I1@
+0 TRLR
+'''
+
+
+def test_read_gedcom():
+    individuals, families = read_gedcom(GEDCOM.splitlines())
+    assert individuals == {
+        '@I1@': ('Ann Smith', '1001'),
+        '@I2@': ('Bob Jones', None),
+        '@I3@': ('Cat Jones', None),
+        '@I4@': ('Dan', None),
+    }
+    assert families == [('@I2@', '@I1@', ['@I3@', '@I4@']), ('@I4@', None, ['@I1@'])]
+
+
+def test_read_mapping():
+    assert read_mapping(['xref,discord id', '@I1@,123', 'Bob#0001, 456', 'bad,row', 'short']) == {'@I1@': 123, 'Bob#0001': 456}
+
+
+def test_map_links():
+    individuals, families = read_gedcom(GEDCOM.splitlines())
+
+    # The xref wins over the REFN, which wins over the name
+    mapping = {'@I1@': 1, '1001': 99, 'Ann Smith': 98, 'Bob Jones': 2, 'Cat Jones': 3}
+    assert map_links(individuals, families, mapping) == ([(1, 2)], [(3, 1)], 1)
+
+    # Children go to the husband when there's no wife, or she isn't mapped
+    mapping = {'1001': 1, 'Bob Jones': 2, 'Dan': 4}
+    assert map_links(individuals, families, mapping) == ([(1, 2)], [(4, 1), (1, 4)], 1)
+    mapping = {'Bob Jones': 2, 'Cat Jones': 3, 'Dan': 4}
+    assert map_links(individuals, families, mapping) == ([], [(3, 2), (4, 2)], 1)
+
+
+def test_find_problems():
+    graph = FamilyGraph()
+    graph.load([(1, 2)], [(3, 1), (4, 3)])
+    partnerships, parents, problems = find_problems(
+        graph.pin(),
+        [(1, 2), (1, 5), (6, 7), (7, 8)],
+        [(3, 1), (3, 9), (1, 4), (10, 11), (10, 12), (13, 14), (14, 13)],
+    )
+    assert partnerships == [(1, 5), (6, 7), (7, 8)]
+    assert parents == [(1, 4), (10, 11), (13, 14), (14, 13)]
+    assert sorted(problems) == sorted([
+        "`1` is already married, so can't marry `5`",
+        "`7` would be married to both `6` and `8`",
+        "`3` already has a parent, so can't be `9`'s child",
+        "`10` would have both `11` and `12` as parents",
+        "`1` would be their own ancestor",
+        "`13` would be their own ancestor",
+    ])
+
+
+def test_find_problems_drops_links_already_there():
+    graph = FamilyGraph()
+    graph.load([(1, 2)], [(3, 1)])
+    assert find_problems(graph.pin(), [(2, 1), (1, 2)], [(3, 1), (3, 1)]) == ([], [], [])
+    assert find_problems(graph.pin(), [(4, 5), (5, 4)], [(6, 4), (6, 4)]) == ([(4, 5)], [(6, 4)], [])
+
+
+def test_families_changed():
+    graph = FamilyGraph()
+    graph.load([(1, 2), (5, 6)], [(3, 1)])
+    version, base_version = graph.version, graph.base_version
+    assert not families_changed(graph, {3, 4}, version, base_version)
+
+    # A change to another family doesn't matter
+    graph.add_child(5, 7)
+    assert not families_changed(graph, {3, 4}, version, base_version)
+
+    # One that joins up with someone being imported does
+    graph.add_child(7, 4)
+    assert families_changed(graph, {3, 4}, version, base_version)
+    graph.remove_child(7, 4)
+    graph.add_child(2, 8)
+    assert families_changed(graph, {3, 4}, version, base_version)
+
+    # After a compaction anything could have changed
+    version, base_version = graph.version, graph.base_version
+    graph.compact()
+    assert families_changed(graph, {3, 4}, version, base_version)
+
+
+def test_round_trip():
+    source = FamilyGraph()
+    source.load([(1, 2), (3, 5), (9, 10)], [(3, 1), (4, 1), (6, 3), (8, 7), (7, 6), (11, 9)])
+    old_graph = FamilyTreeMember.graph
+    FamilyTreeMember.graph = source
+    try:
+        output = BytesIO()
+        FamilyTreeMember.get(4).to_gedcom_file(FixedNames({i: f'User {i}' for i in range(1, 12)}), output)
+    finally:
+        FamilyTreeMember.graph = old_graph
+    individuals, families = read_gedcom(output.getvalue().decode('utf-8').splitlines())
+    partnerships, parents, unmapped = map_links(individuals, families, {f'User {i}': i for i in range(1, 12)})
+    assert unmapped == 0
+
+    graph = FamilyGraph()
+    partnerships, parents, problems = find_problems(graph.pin(), partnerships, parents)
+    assert problems == []
+    graph.add_links(partnerships, parents)
+    assert sorted(map(sorted, graph.links()[0])) == [[1, 2], [3, 5]]
+    assert sorted(graph.links()[1]) == [(3, 1), (4, 1), (6, 3), (7, 6), (8, 7)]
+    assert find_problems(graph.pin(), partnerships, parents) == ([], [], [])
@@ -0,0 +1,112 @@
+from asyncio import new_event_loop
+
+import pytest
+
+from cogs.utils.checks.database_available import DatabaseDown
+from cogs.utils.custom_bot import CustomBot
+from cogs.utils.database import DatabaseUnavailable
+from cogs.utils.family_tree.family_graph import FamilyGraph
+from cogs.utils.family_tree.family_tree_member import FamilyTreeMember
+
+
+class Loader(object):
+    '''
+    A ComponentLoader with the database down
+    '''
+
+    def __init__(self, loaded:set):
+        self.family_of = {i: i for i in loaded}
+
+    async def ensure(self, user_ids):
+        if any(i not in self.family_of for i in user_ids):
+            raise DatabaseUnavailable()
+
+
+class Journal(object):
+
+    def __init__(self):
+        self.appended = []
+
+    async def append(self, kind:str, *args):
+        self.appended.append([kind, *args])
+
+
+class Database(object):
+
+    @staticmethod
+    def make_id():
+        return 'x'
+
+
+class Bot(object):
+    '''
+    Just the parts of CustomBot that load and change families
+    '''
+
+    load_families = CustomBot.load_families
+    load_command_families = CustomBot.load_command_families
+    marry = CustomBot.marry
+    add_child = CustomBot.add_child
+
+    def __init__(self, loaded:set):
+        self.family_loader = Loader(loaded)
+        self.write_journal = Journal()
+        self.database = Database()
+
+
+class User(object):
+    pass
+
+
+class Context(object):
+
+    def __init__(self, author_id:int, changes_families:bool):
+        self.author = User()
+        self.author.id = author_id
+        self.args = []
+        self.kwargs = {}
+        if changes_families:
+            self.changes_families = True
+
+
+@pytest.fixture
+def loop():
+    loop = new_event_loop()
+    old_graph = FamilyTreeMember.graph
+    FamilyTreeMember.graph = FamilyGraph()
+    yield loop
+    FamilyTreeMember.graph = old_graph
+    loop.close()
+
+
+def test_reading_makes_do_with_whats_loaded(loop):
+    bot = Bot({1})
+    loop.run_until_complete(bot.load_families([1, 2]))
+    loop.run_until_complete(bot.load_families([1], required=True))
+    with pytest.raises(DatabaseUnavailable):
+        loop.run_until_complete(bot.load_families([1, 2], required=True))
+
+
+def test_commands_that_change_families_need_them_loaded(loop, monkeypatch):
+    monkeypatch.setattr('cogs.utils.custom_bot.User', User)
+    bot = Bot({1})
+    loop.run_until_complete(bot.load_command_families(Context(2, False)))
+    loop.run_until_complete(bot.load_command_families(Context(1, True)))
+    with pytest.raises(DatabaseDown):
+        loop.run_until_complete(bot.load_command_families(Context(2, True)))
+
+
+def test_journal_turns_away_second_partners_and_parents(loop):
+    bot = Bot(set())
+    graph = FamilyTreeMember.graph
+    graph.marry(1, 2)
+    graph.add_child(3, 4)
+    with pytest.raises(ValueError):
+        loop.run_until_complete(bot.marry(2, 5))
+    with pytest.raises(ValueError):
+        loop.run_until_complete(bot.add_child(6, 4))
+    assert graph.partner_of(2) == 1
+    assert graph.parent_of(4) == 3
+    loop.run_until_complete(bot.marry(5, 6))
+    loop.run_until_complete(bot.add_child(5, 7))
+    assert bot.write_journal.appended == [['marry', 'x', 5, 6], ['add_child', 7, 5]]
@@ -0,0 +1,142 @@
+'''
+The database tests need a PostgreSQL database to run against, given as a DSN in the
+TEST_DATABASE_DSN environment variable - everything's made in a scratch schema that's
+dropped afterwards. They're skipped without one.
+'''
+
+from asyncio import new_event_loop
+from os import environ
+
+import pytest
+
+from cogs.utils.database import DatabaseConnection
+from cogs.utils.migrations import find_migrations, run_migrations
+
+
+MIGRATIONS_DIRECTORY = 'config/migrations'
+SCHEMA = 'migrations_test'
+DSN = environ.get('TEST_DATABASE_DSN')
+
+
+def test_find_migrations_order(tmp_path):
+    for filename in ('0010_later.sql', '0002_second.sql', '0001_first.sql', 'README.md', '3_short.sql'):
+        (tmp_path / filename).write_text(f'-- {filename}')
+    migrations = find_migrations(str(tmp_path))
+    assert [(i[0], i[1]) for i in migrations] == [(1, 'first'), (2, 'second'), (3, 'short'), (10, 'later')]
+    assert migrations[0][2] == '-- 0001_first.sql'
+
+
+def test_find_migrations_duplicate_versions(tmp_path):
+    (tmp_path / '0001_first.sql').write_text('')
+    (tmp_path / '001_also_first.sql').write_text('')
+    with pytest.raises(ValueError):
+        find_migrations(str(tmp_path))
+
+
+def test_shipped_migrations():
+    versions = [i[0] for i in find_migrations(MIGRATIONS_DIRECTORY)]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+@pytest.fixture
+def database():
+    if DSN is None:
+        pytest.skip("TEST_DATABASE_DSN isn't set")
+    loop = new_event_loop()
+    old_config = DatabaseConnection.config
+
+    async def reset_schema():
+        async with DatabaseConnection() as db:
+            await db(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE')
+            await db(f'CREATE SCHEMA {SCHEMA}')
+        await DatabaseConnection.close_pool()
+
+    DatabaseConnection.config = {'dsn': DSN, 'min_size': 1, 'max_size': 2}
+    loop.run_until_complete(reset_schema())
+    DatabaseConnection.config = {'dsn': DSN, 'min_size': 1, 'max_size': 2, 'server_settings': {'search_path': SCHEMA}}
+    yield loop
+
+    async def drop_schema():
+        await DatabaseConnection.close_pool()
+        async with DatabaseConnection() as db:
+            await db(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE')
+        await DatabaseConnection.close_pool()
+
+    loop.run_until_complete(drop_schema())
+    DatabaseConnection.config = old_config
+    loop.close()
+
+
+async def schema_state() -> tuple:
+    async with DatabaseConnection() as db:
+        indexes = await db('SELECT indexname, indexdef FROM pg_indexes WHERE schemaname=$1 ORDER BY indexname', SCHEMA)
+        columns = await db('SELECT table_name, column_name, column_default FROM information_schema.columns WHERE table_schema=$1 ORDER BY 1, 2', SCHEMA)
+        triggers = await db('SELECT tgname FROM pg_trigger JOIN pg_class ON pg_class.oid=tgrelid JOIN pg_namespace ON pg_namespace.oid=relnamespace WHERE nspname=$1 AND NOT tgisinternal ORDER BY 1', SCHEMA)
+        invalid = await db('SELECT indexrelid FROM pg_index WHERE NOT indisvalid')
+    return [tuple(i) for i in indexes], [tuple(i) for i in columns], [tuple(i) for i in triggers], len(invalid)
+
+
+def test_run_migrations_twice(database):
+    migrations = [(i[0], i[1]) for i in find_migrations(MIGRATIONS_DIRECTORY)]
+    assert database.run_until_complete(run_migrations(DatabaseConnection, MIGRATIONS_DIRECTORY)) == migrations
+    state = database.run_until_complete(schema_state())
+    assert state[3] == 0
+    assert database.run_until_complete(run_migrations(DatabaseConnection, MIGRATIONS_DIRECTORY)) == []
+    assert database.run_until_complete(schema_state()) == state
+
+
+def test_rerun_applied_migrations(database):
+    # A crash between a migration's changes and its schema_migrations row means it's run again
+    async def forget_migrations():
+        async with DatabaseConnection() as db:
+            await db('DELETE FROM schema_migrations WHERE version > 1')
+
+    migrations = [(i[0], i[1]) for i in find_migrations(MIGRATIONS_DIRECTORY)]
+    database.run_until_complete(run_migrations(DatabaseConnection, MIGRATIONS_DIRECTORY))
+    state = database.run_until_complete(schema_state())
+    database.run_until_complete(forget_migrations())
+    assert database.run_until_complete(run_migrations(DatabaseConnection, MIGRATIONS_DIRECTORY)) == migrations[1:]
+    assert database.run_until_complete(schema_state()) == state
+
+
+def test_migrate_existing_tables(database):
+    # A database made from the old database.sql, before there were migrations
+    async def make_old_tables():
+        async with DatabaseConnection() as db:
+            await db('CREATE TABLE marriages (marriage_id VARCHAR(11), user_id BIGINT NOT NULL, partner_id BIGINT NOT NULL, valid BOOLEAN NOT NULL, PRIMARY KEY (marriage_id, user_id))')
+            await db('CREATE TABLE parents (child_id BIGINT NOT NULL, parent_id BIGINT NOT NULL, PRIMARY KEY (child_id))')
+            await db("INSERT INTO marriages VALUES ('a', 1, 2, TRUE), ('a', 2, 1, TRUE)")
+            await db('INSERT INTO parents VALUES (3, 1)')
+
+    async def count_rows():
+        async with DatabaseConnection() as db:
+            marriages = await db('SELECT COUNT(*) FROM marriages')
+            parents = await db('SELECT COUNT(*) FROM parents')
+        return marriages[0][0], parents[0][0]
+
+    database.run_until_complete(make_old_tables())
+    database.run_until_complete(run_migrations(DatabaseConnection, MIGRATIONS_DIRECTORY))
+    assert database.run_until_complete(count_rows()) == (2, 1)
+    assert database.run_until_complete(run_migrations(DatabaseConnection, MIGRATIONS_DIRECTORY)) == []
+
+
+async def table_names() -> list:
+    async with DatabaseConnection() as db:
+        tables = await db('SELECT tablename FROM pg_tables WHERE schemaname=$1 ORDER BY 1', SCHEMA)
+    return [i['tablename'] for i in tables]
+
+
+def test_baseline_is_the_old_schema(database, tmp_path):
+    (tmp_path / '0001_baseline.sql').write_text(find_migrations(MIGRATIONS_DIRECTORY)[0][2])
+    database.run_until_complete(run_migrations(DatabaseConnection, str(tmp_path)))
+    assert database.run_until_complete(table_names()) == ['blacklisted_guilds', 'customisation', 'guild_settings', 'marriages', 'parents', 'schema_migrations']
+    assert database.run_until_complete(schema_state())[2] == []
+
+
+def test_every_migration(database):
+    database.run_until_complete(run_migrations(DatabaseConnection, MIGRATIONS_DIRECTORY))
+    assert database.run_until_complete(table_names()) == [
+        'blacklisted_guilds', 'customisation', 'family_changes', 'guild_settings', 'marriages',
+        'parents', 'schema_migrations', 'usernames',
+    ]
+    assert database.run_until_complete(schema_state())[2] == [('customisation_changed',), ('marriages_changed',), ('parents_changed',)]
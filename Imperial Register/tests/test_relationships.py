@@ -0,0 +1,76 @@
+import pytest
+
+from cogs.utils.family_tree.family_graph import FamilyGraph
+from cogs.utils.family_tree.relationships import describe_blood_relation, find_relation
+
+
+@pytest.mark.parametrize('up, down, name', [
+    (0, 0, 'themselves'),
+    (1, 0, 'parent'),
+    (2, 0, 'grandparent'),
+    (3, 0, 'great-grandparent'),
+    (5, 0, '3x great-grandparent'),
+    (0, 1, 'child'),
+    (0, 2, 'grandchild'),
+    (0, 4, '2x great-grandchild'),
+    (1, 1, 'sibling'),
+    (1, 2, 'niece/nephew'),
+    (1, 3, 'grand-niece/nephew'),
+    (1, 4, 'great-grand-niece/nephew'),
+    (2, 1, 'aunt/uncle'),
+    (3, 1, 'great-aunt/uncle'),
+    (2, 2, 'first cousin'),
+    (3, 3, 'second cousin'),
+    (2, 3, 'first cousin once removed'),
+    (4, 2, 'first cousin twice removed'),
+    (2, 6, 'first cousin 4 times removed'),
+    (12, 12, '11th cousin'),
+])
+def test_describe_blood_relation(up, down, name):
+    assert describe_blood_relation(up, down) == name
+
+
+def make_graph() -> FamilyGraph:
+    '''
+    1 + 2 married, with children 3 and 4
+    3 + 5 married, with child 6
+    4 has child 7, who has child 8
+    5's parent is 9, whose partner is 10
+    11 + 12 are unrelated
+    '''
+
+    graph = FamilyGraph()
+    graph.load(
+        [(1, 2), (3, 5), (9, 10), (11, 12)],
+        [(3, 1), (4, 1), (6, 3), (7, 4), (8, 7), (5, 9)],
+    )
+    return graph
+
+
+@pytest.mark.parametrize('user_a, user_b, name', [
+    (6, 6, 'themselves'),
+    (3, 5, 'partner'),
+    (6, 3, 'parent'),
+    (3, 6, 'child'),
+    (6, 1, 'grandparent'),
+    (1, 8, 'great-grandchild'),
+    (3, 4, 'sibling'),
+    (3, 7, 'niece/nephew'),
+    (8, 3, 'great-aunt/uncle'),
+    (6, 7, 'first cousin'),
+    (6, 8, 'first cousin once removed'),
+    (5, 1, 'parent-in-law'),  # Their partner's parent
+    (3, 9, 'parent-in-law'),
+    (1, 5, 'child-in-law'),  # Their child's partner
+    (6, 2, "grandparent's partner"),  # 2 has no parent links of their own
+    (2, 6, "partner's grandchild"),
+    (4, 5, 'sibling-in-law'),
+    (5, 4, 'sibling-in-law'),
+    (2, 5, "partner's child's partner"),
+    (1, 9, 'distant relation by marriage'),  # Only one partner is gone through on each side
+    (6, 11, None),
+    (6, 404, None),
+])
+def test_find_relation(user_a, user_b, name):
+    graph = make_graph()
+    assert find_relation(graph, user_a, user_b) == name
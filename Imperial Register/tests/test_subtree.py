@@ -0,0 +1,131 @@
+from random import Random
+
+from cogs.utils.family_tree.constants import NO_USER
+from cogs.utils.family_tree.family_graph import FamilyGraph
+
+
+def expected(graph:FamilyGraph, index:int) -> tuple:
+    '''
+    Works out a user's (descendant count, descendant depth, root, generation) the slow way
+    Anyone in or below a parent loop is (0, 0, themselves, -1)
+    '''
+
+    line = [index]
+    while graph.parent_index(line[-1]) != NO_USER:
+        if graph.parent_index(line[-1]) in line:
+            return 0, 0, index, -1
+        line.append(graph.parent_index(line[-1]))
+    count, depth = 0, 0
+    stack = [(index, 0)]
+    while stack:
+        current, generation = stack.pop()
+        for child_index in graph.children_indexes(current):
+            count += 1
+            depth = max(depth, generation + 1)
+            stack.append((child_index, generation + 1))
+    return count, depth, line[-1], len(line) - 1
+
+
+def check_subtrees(graph:FamilyGraph):
+    subtrees = graph.subtrees
+    for index in range(len(graph)):
+        got = (
+            subtrees.descendant_count(index), subtrees.descendant_depth(index),
+            subtrees.root(index), subtrees.generation(index),
+        )
+        assert got == expected(graph, index), graph.user_id(index)
+
+
+def test_attach_detach():
+    graph = FamilyGraph()
+    graph.add_child(1, 2)
+    graph.add_child(2, 3)
+    graph.add_child(2, 4)
+    graph.add_child(5, 6)
+    assert graph.subtrees.descendant_count(graph.index(1)) == 3
+    assert graph.subtrees.descendant_depth(graph.index(1)) == 2
+    assert graph.subtrees.root(graph.index(4)) == graph.index(1)
+
+    graph.add_child(4, 5)
+    assert graph.subtrees.descendant_count(graph.index(1)) == 5
+    assert graph.subtrees.descendant_depth(graph.index(1)) == 4
+    assert graph.subtrees.root(graph.index(6)) == graph.index(1)
+    check_subtrees(graph)
+
+    graph.remove_child(2, 4)
+    assert graph.subtrees.descendant_count(graph.index(1)) == 2
+    assert graph.subtrees.descendant_depth(graph.index(1)) == 2
+    assert graph.subtrees.root(graph.index(6)) == graph.index(4)
+    check_subtrees(graph)
+
+
+def test_loop_from_load():
+    graph = FamilyGraph()
+    # 1 -> 2 -> 3 -> 1 is a loop, 4 and 5 hang below it, 10 -> 11 is fine
+    graph.load([], [(2, 1), (3, 2), (1, 3), (4, 3), (5, 4), (11, 10)])
+    for user_id in (1, 2, 3, 4, 5):
+        index = graph.index(user_id)
+        assert graph.subtrees.descendant_count(index) == 0
+        assert graph.subtrees.root(index) == index
+    assert graph.subtrees.generation(graph.index(1)) == -1
+    assert graph.subtrees.descendant_count(graph.index(10)) == 1
+    check_subtrees(graph)
+
+    # Breaking the loop recalculates everything that was stuck in it
+    graph.remove_child(3, 1)
+    assert graph.subtrees.descendant_count(graph.index(1)) == 4
+    assert graph.subtrees.descendant_depth(graph.index(1)) == 4
+    assert graph.subtrees.root(graph.index(5)) == graph.index(1)
+    check_subtrees(graph)
+
+
+def test_loop_from_attach():
+    graph = FamilyGraph()
+    graph.add_child(1, 2)
+    graph.add_child(2, 3)
+    graph.add_child(3, 4)
+
+    # add_child doesn't check for loops itself, so one can be made
+    graph.add_child(3, 1)
+    check_subtrees(graph)
+
+    # Attaching to a user in the loop, and below it
+    graph.add_child(2, 7)
+    graph.add_child(4, 8)
+    assert graph.subtrees.descendant_count(graph.index(7)) == 0
+    check_subtrees(graph)
+
+    # Detaching from it without breaking it
+    graph.remove_child(2, 7)
+    assert graph.subtrees.root(graph.index(7)) == graph.index(7)
+    check_subtrees(graph)
+
+    # And moving a loop member elsewhere, which does break it
+    graph.add_child(9, 2)
+    assert graph.subtrees.root(graph.index(8)) == graph.index(9)
+    assert graph.subtrees.descendant_count(graph.index(9)) == 5
+    check_subtrees(graph)
+
+
+def test_rebuild_matches_updates():
+    rng = Random(2)
+    for _ in range(30):
+        graph = FamilyGraph()
+        user_count = rng.randrange(5, 30)
+        graph.load([], [(i, rng.randrange(i)) for i in range(1, user_count) if rng.random() < 0.7])
+        for _ in range(60):
+            parent_id, child_id = rng.randrange(user_count + 5), rng.randrange(user_count + 5)
+            kind = rng.random()
+            if kind < 0.5 and parent_id != child_id:
+                graph.add_child(parent_id, child_id)  # Loops and all
+            elif kind < 0.8 and graph.parent_of(child_id) is not None:
+                graph.remove_child(graph.parent_of(child_id), child_id)
+            elif kind < 0.9:
+                graph.destroy(parent_id)
+            elif kind < 0.95:
+                graph.compact()
+            check_subtrees(graph)
+
+        counts = [graph.subtrees.descendant_count(i) for i in range(len(graph))]
+        graph.subtrees.rebuild()
+        assert counts == [graph.subtrees.descendant_count(i) for i in range(len(graph))]
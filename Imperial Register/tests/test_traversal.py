@@ -0,0 +1,99 @@
+from threading import Event
+
+import pytest
+
+from cogs.utils.family_tree.family_graph import FamilyGraph
+from cogs.utils.family_tree.traversal import (
+    breadth_first, depth_first, find_root, TraversalCancelled, TraversalLimitReached,
+)
+
+
+def make_graph() -> FamilyGraph:
+    '''
+    1 + 2 married, with children 3 and 4
+    3 + 5 married, 3 has child 6, 5's parent is 7
+    8 is unrelated
+    '''
+
+    graph = FamilyGraph()
+    graph.load([(1, 2), (3, 5), (8, 9)], [(3, 1), (4, 1), (6, 3), (5, 7)])
+    return graph
+
+
+def walk(graph:FamilyGraph, walker, start_id:int, **kwargs) -> list:
+    return [(graph.user_id(i), o) for i, o in walker(graph, graph.index(start_id), **kwargs)]
+
+
+def test_depth_first_order():
+    graph = make_graph()
+    # Parent (when asked for), then children, then the partner, as the old recursive span did
+    assert walk(graph, depth_first, 1) == [(1, 0), (3, 1), (6, 2), (5, 1), (4, 1), (2, 0)]
+
+
+def test_depth_first_upwards():
+    graph = make_graph()
+    assert walk(graph, depth_first, 6) == [(6, 0)]
+    assert walk(graph, depth_first, 6, add_parent=True, expand_upwards=True) == [
+        (6, 0), (3, -1), (1, -2), (4, -1), (2, -2), (5, -1), (7, -2),
+    ]
+
+
+def test_depth_first_limits():
+    graph = make_graph()
+    assert walk(graph, depth_first, 1, max_depth=1) == [(1, 0), (3, 1), (5, 1), (4, 1), (2, 0)]
+    assert walk(graph, depth_first, 1, include=lambda user_id: user_id != 3) == [(1, 0), (4, 1), (2, 0)]
+    with pytest.raises(TraversalLimitReached):
+        walk(graph, depth_first, 1, max_nodes=3)
+    assert len(walk(graph, depth_first, 1, max_nodes=6)) == 6
+
+
+def test_depth_first_visited():
+    graph = make_graph()
+    visited = {graph.index(3)}
+    assert walk(graph, depth_first, 1, visited=visited) == [(1, 0), (4, 1), (2, 0)]
+    assert graph.index(4) in visited
+
+
+def test_breadth_first():
+    graph = make_graph()
+    distances = dict(walk(graph, breadth_first, 6))
+    assert distances == {6: 0, 3: 1, 1: 2, 5: 2, 2: 3, 4: 3, 7: 3}
+    assert 8 not in distances
+    assert dict(walk(graph, breadth_first, 6, max_depth=1)) == {6: 0, 3: 1}
+    assert dict(walk(graph, breadth_first, 6, include=lambda user_id: user_id != 1)) == {6: 0, 3: 1, 5: 2, 7: 3}
+    with pytest.raises(TraversalLimitReached):
+        walk(graph, breadth_first, 6, max_nodes=3)
+
+
+def test_cancelled():
+    graph = make_graph()
+    cancel = Event()
+    walker = depth_first(graph, graph.index(1), cancel=cancel)
+    next(walker)
+    cancel.set()
+    with pytest.raises(TraversalCancelled):
+        next(walker)
+    with pytest.raises(TraversalCancelled):
+        walk(graph, breadth_first, 1, cancel=cancel)
+    with pytest.raises(TraversalCancelled):
+        find_root(graph, graph.index(6), cancel=cancel)
+
+
+def test_find_root():
+    graph = make_graph()
+    assert graph.user_id(find_root(graph, graph.index(6))) == 1
+    # 5 has a parent of their own
+    assert graph.user_id(find_root(graph, graph.index(5))) == 7
+    # 2 goes through their partner's parent, and has none
+    assert graph.user_id(find_root(graph, graph.index(2))) == 2
+    graph.add_child(10, 1)
+    assert graph.user_id(find_root(graph, graph.index(2))) == 10
+    # Without 1, the line goes up through 3's partner instead
+    assert graph.user_id(find_root(graph, graph.index(6), include=lambda user_id: user_id != 1)) == 7
+    assert graph.user_id(find_root(graph, graph.index(6), include=lambda user_id: user_id not in (1, 7))) == 3
+
+
+def test_find_root_stops_in_a_loop():
+    graph = FamilyGraph()
+    graph.load([], [(2, 1), (3, 2), (1, 3)])
+    assert find_root(graph, graph.index(1)) in {graph.index(i) for i in (1, 2, 3)}
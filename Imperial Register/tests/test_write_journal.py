@@ -0,0 +1,239 @@
+from asyncio import new_event_loop, sleep
+from json import dumps
+from os import environ
+
+import pytest
+
+from cogs.utils.database import DatabaseConnection
+from cogs.utils.write_journal import WriteJournal
+
+
+# The commit test needs a PostgreSQL database, given as a DSN in TEST_DATABASE_DSN
+DSN = environ.get('TEST_DATABASE_DSN')
+SCHEMA = 'write_journal_test'
+
+
+class JournalBot(object):
+    '''
+    Just enough of CustomBot for a WriteJournal
+    '''
+
+    def __init__(self):
+        self.loop = new_event_loop()
+
+    def is_closed(self):
+        return False
+
+
+@pytest.fixture
+def bot():
+    bot = JournalBot()
+    yield bot
+    bot.loop.close()
+
+
+def kinds(changes:list) -> list:
+    return [sql.split()[0] for sql, _ in WriteJournal.statements(changes)]
+
+
+def test_statements_group_unrelated_changes():
+    changes = [
+        ['marry', 'a', 1, 2],
+        ['marry', 'b', 3, 4],
+        ['add_child', 5, 6],
+        ['add_child', 7, 8],
+    ]
+    statements = list(WriteJournal.statements(changes))
+    assert len(statements) == 2
+    (marry_sql, marry_args), (child_sql, child_args) = statements
+    assert marry_sql == WriteJournal.STATEMENTS['marry']
+    assert marry_args == (['a', 'b', 'a', 'b'], [1, 3, 2, 4], [2, 4, 1, 3])
+    assert child_sql == WriteJournal.STATEMENTS['add_child']
+    assert child_args == ([5, 7], [6, 8])
+
+
+def test_statements_keep_shared_users_in_order():
+    changes = [
+        ['add_child', 2, 1],
+        ['remove_child', 2, 1],
+        ['add_child', 2, 3],
+        ['marry', 'a', 1, 3],
+        ['divorce', 1, 3],
+    ]
+    assert kinds(changes) == ['INSERT', 'DELETE', 'INSERT', 'INSERT', 'UPDATE']
+    statements = list(WriteJournal.statements(changes))
+    assert statements[2][1] == ([2], [3])
+    assert statements[4][1] == ([1, 3],)
+
+
+def test_statements_only_wait_on_their_own_users():
+    changes = [
+        ['marry', 'a', 1, 2],
+        ['divorce', 1, 2],
+        ['marry', 'b', 3, 4],  # Goes in with the first marriage
+        ['marry', 'c', 1, 2],
+    ]
+    statements = list(WriteJournal.statements(changes))
+    assert [args for _, args in statements] == [
+        (['a', 'b', 'a', 'b'], [1, 3, 2, 4], [2, 4, 1, 3]),
+        ([1, 2],),
+        (['c', 'c'], [1, 2], [2, 1]),
+    ]
+
+
+def test_statements_marriage_ids_arent_users():
+    # Two marriages with the same ID string can't share a level on account of it
+    changes = [['marry', 'x', 1, 2], ['marry', 'x', 3, 4]]
+    assert len(list(WriteJournal.statements(changes))) == 1
+
+
+def test_open_missing_file(tmp_path, bot):
+    path = tmp_path / 'journal.log'
+    journal = WriteJournal(bot, str(path))
+    journal.open()
+    assert journal.unsaved == []
+    journal.file.close()
+    assert path.exists()
+
+
+def test_open_picks_up_unsaved(tmp_path, bot):
+    path = tmp_path / 'journal.log'
+    changes = [['marry', 'a', 1, 2], ['add_child', 3, 1]]
+    path.write_text(''.join(dumps(i) + '\n' for i in changes))
+    journal = WriteJournal(bot, str(path))
+    journal.open()
+    assert journal.unsaved == changes
+    journal.file.close()
+
+
+def test_open_cuts_off_torn_line(tmp_path, bot):
+    path = tmp_path / 'journal.log'
+    whole = dumps(['marry', 'a', 1, 2]) + '\n'
+    path.write_text(whole + '["add_child", 3')
+    journal = WriteJournal(bot, str(path))
+    journal.open()
+    assert journal.unsaved == [['marry', 'a', 1, 2]]
+    assert path.read_text() == whole
+
+    # The next write starts on a line of its own, so it's read back
+    journal._write([['divorce', 1, 2]])
+    journal.file.close()
+    reopened = WriteJournal(bot, str(path))
+    reopened.open()
+    assert reopened.unsaved == [['marry', 'a', 1, 2], ['divorce', 1, 2]]
+    reopened.file.close()
+
+
+def test_open_stops_at_garbled_line(tmp_path, bot):
+    path = tmp_path / 'journal.log'
+    whole = dumps(['marry', 'a', 1, 2]) + '\n'
+    path.write_text(whole + 'not json\n' + dumps(['divorce', 1, 2]) + '\n')
+    journal = WriteJournal(bot, str(path))
+    journal.open()
+    assert journal.unsaved == [['marry', 'a', 1, 2]]
+    assert path.read_text() == whole
+    journal.file.close()
+
+
+def test_sync_writes_and_releases_waiters(tmp_path, bot):
+    path = tmp_path / 'journal.log'
+    journal = WriteJournal(bot, str(path))
+    journal.open()
+
+    async def run():
+        appends = [bot.loop.create_task(journal.append('add_child', i, 1)) for i in range(2, 5)]
+        await sleep(0)  # So they've all been appended
+        assert not any(i.done() for i in appends)
+        await journal.sync()
+        for task in appends:
+            await task
+
+    bot.loop.run_until_complete(run())
+    assert journal.unsaved == [['add_child', i, 1] for i in range(2, 5)]
+    assert journal.saved.is_set()
+    journal.file.close()
+    reopened = WriteJournal(bot, str(path))
+    reopened.open()
+    assert reopened.unsaved == journal.unsaved
+    reopened.file.close()
+
+
+def test_dropped():
+    (marry_sql, marry_args), = WriteJournal.statements([['marry', 'a', 1, 2], ['marry', 'b', 3, 4]])
+    assert WriteJournal.dropped(marry_sql, marry_args, [{'marriage_id': 'a'}, {'marriage_id': 'a'}]) == [['marry', 'b', 3, 4]]
+    (child_sql, child_args), = WriteJournal.statements([['add_child', 5, 6], ['add_child', 7, 8]])
+    assert WriteJournal.dropped(child_sql, child_args, [{'child_id': 7}]) == [['add_child', 5, 6]]
+    assert WriteJournal.dropped(child_sql, child_args, [{'child_id': 5}, {'child_id': 7}]) == []
+    (divorce_sql, divorce_args), = WriteJournal.statements([['divorce', 1, 2]])
+    assert WriteJournal.dropped(divorce_sql, divorce_args, None) == []
+
+
+class DatabaseBot(JournalBot):
+    '''
+    A JournalBot with a database, for committing
+    '''
+
+    def database(self):
+        return DatabaseConnection()
+
+
+@pytest.fixture
+def database_bot():
+    if DSN is None:
+        pytest.skip("TEST_DATABASE_DSN isn't set")
+    bot = DatabaseBot()
+    old_config = DatabaseConnection.config
+
+    async def run(*statements):
+        async with DatabaseConnection() as db:
+            for sql in statements:
+                await db(sql)
+
+    DatabaseConnection.config = {'dsn': DSN, 'min_size': 1, 'max_size': 2}
+    bot.loop.run_until_complete(run(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE', f'CREATE SCHEMA {SCHEMA}'))
+    bot.loop.run_until_complete(DatabaseConnection.close_pool())
+    DatabaseConnection.config = {'dsn': DSN, 'min_size': 1, 'max_size': 2, 'server_settings': {'search_path': SCHEMA}}
+    bot.loop.run_until_complete(run(
+        'CREATE TABLE marriages(marriage_id VARCHAR(11) NOT NULL, user_id BIGINT NOT NULL, partner_id BIGINT NOT NULL, valid BOOLEAN NOT NULL, PRIMARY KEY (marriage_id, user_id))',
+        'CREATE TABLE parents(child_id BIGINT NOT NULL, parent_id BIGINT NOT NULL, PRIMARY KEY (child_id))',
+    ))
+    yield bot
+    bot.loop.run_until_complete(run(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+    bot.loop.run_until_complete(DatabaseConnection.close_pool())
+    DatabaseConnection.config = old_config
+    DatabaseConnection.pool_lock = None
+    bot.loop.close()
+
+
+def test_commit_doesnt_write_over_partners_or_parents(tmp_path, database_bot, capsys):
+    bot = database_bot
+    journal = WriteJournal(bot, str(tmp_path / 'journal.log'))
+    journal.open()
+    journal.unsaved = [['marry', 'a', 1, 2], ['add_child', 3, 1], ['marry', 'b', 4, 5]]
+
+    async def rows():
+        async with DatabaseConnection() as db:
+            marriages = await db('SELECT marriage_id, user_id, partner_id FROM marriages WHERE valid=TRUE ORDER BY marriage_id, user_id')
+            parents = await db('SELECT child_id, parent_id FROM parents ORDER BY child_id')
+        return [tuple(i) for i in marriages], [tuple(i) for i in parents]
+
+    bot.loop.run_until_complete(journal.commit())
+    expected = ([('a', 1, 2), ('a', 2, 1), ('b', 4, 5), ('b', 5, 4)], [(3, 1)])
+    assert bot.loop.run_until_complete(rows()) == expected
+    assert 'Dropped' not in capsys.readouterr().out
+
+    # Running it all again (as after a crash before the journal was emptied) is fine
+    journal.unsaved = [['marry', 'a', 1, 2], ['add_child', 3, 1]]
+    bot.loop.run_until_complete(journal.commit())
+    assert bot.loop.run_until_complete(rows()) == expected
+    assert 'Dropped' not in capsys.readouterr().out
+
+    # But a second marriage or parent is left out, and said so
+    journal.unsaved = [['marry', 'c', 2, 6], ['add_child', 3, 7], ['add_child', 8, 7]]
+    bot.loop.run_until_complete(journal.commit())
+    assert bot.loop.run_until_complete(rows()) == (expected[0], [(3, 1), (8, 7)])
+    out = capsys.readouterr().out
+    assert "Dropped ['marry', 'c', 2, 6]" in out
+    assert "Dropped ['add_child', 3, 7]" in out
+    assert "Dropped ['add_child', 8, 7]" not in out
+    journal.file.close()